@@ -55,6 +55,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "network.middleware.ReplicaRoutingMiddleware",
 ]
 
 ROOT_URLCONF = "huvtsp_alumni.urls"
@@ -88,9 +89,124 @@ DATABASES = {
         "PORT": os.getenv("DB_PORT"),
         "USER": os.getenv("DB_USER"),
         "PASSWORD": os.getenv("DB_PASSWORD"),
+        # Keep connections open between requests, checking them before reuse
+        "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", "60")),
+        "CONN_HEALTH_CHECKS": os.getenv("DB_CONN_HEALTH_CHECKS", "true").lower() == "true",
+        "OPTIONS": {},
     }
 }
 
+# Optional psycopg connection pool (PostgreSQL only). With CONN_HEALTH_CHECKS
+# the pool pings each connection before handing it out, and it recycles
+# connections after DB_POOL_MAX_LIFETIME seconds; Django requires
+# CONN_MAX_AGE = 0 alongside it.
+if os.getenv("DB_POOL", "false").lower() == "true" and "postgresql" in (DATABASES["default"]["ENGINE"] or ""):
+    DATABASES["default"]["OPTIONS"]["pool"] = {
+        "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+        "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+        "max_lifetime": float(os.getenv("DB_POOL_MAX_LIFETIME", "1800")),
+        "timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+    }
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+
+# Optional read replica for search, stats and listing traffic. For local
+# testing, point DB_REPLICA_NAME at a second SQLite file or database.
+if os.getenv("DB_REPLICA_NAME"):
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "OPTIONS": {**DATABASES["default"]["OPTIONS"]},
+        "NAME": os.getenv("DB_REPLICA_NAME"),
+        "HOST": os.getenv("DB_REPLICA_HOST", ""),
+        "PORT": os.getenv("DB_REPLICA_PORT", os.getenv("DB_PORT")),
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["network.routers.PrimaryReplicaRouter"]
+
+# Directory the member and project search snapshots are published to, so every
+# worker on the host maps one copy instead of building its own. Needs a cache
+# backend shared by the workers to hold the build lock.
+SEARCH_SNAPSHOT_DIR = os.getenv("SEARCH_SNAPSHOT_DIR") or None
+# Load the search snapshots at startup instead of on the first search
+SEARCH_SNAPSHOT_PRELOAD = os.getenv("SEARCH_SNAPSHOT_PRELOAD", "false").lower() == "true"
+
+# Seconds between each server process's polls of the change log outbox, which
+# keep its in-memory indexes and caches current; 0 disables the consumer
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", "0"))
+
+# Offline gazetteer member locations are resolved against (defaults to
+# network/data/gazetteer.tsv), and the radius used for near= searches and
+# place names in queries when none is given
+GAZETTEER_PATH = os.getenv("GAZETTEER_PATH") or None
+GEO_DEFAULT_RADIUS_KM = float(os.getenv("GEO_DEFAULT_RADIUS_KM", "50"))
+# Cell size of the member location grid index
+GEO_CELL_DEGREES = float(os.getenv("GEO_CELL_DEGREES", "0.5"))
+
+# Threads (or processes) member searches are split across once the member
+# snapshot has SEARCH_PARALLEL_MIN_ROWS rows; 0 or 1 scores in the request.
+# Process mode needs SEARCH_SNAPSHOT_DIR
+SEARCH_PARALLEL_WORKERS = int(os.getenv("SEARCH_PARALLEL_WORKERS", "0"))
+SEARCH_PARALLEL_MODE = os.getenv("SEARCH_PARALLEL_MODE", "thread")
+SEARCH_PARALLEL_MIN_ROWS = int(os.getenv("SEARCH_PARALLEL_MIN_ROWS", "50000"))
+# Seconds a search waits for its shards before scoring in the request instead
+SEARCH_PARALLEL_TIMEOUT = float(os.getenv("SEARCH_PARALLEL_TIMEOUT", "2"))
+
+# Smart searches each worker runs at once, how many more may wait and for how
+# many seconds, before they are degraded (or rejected with a 503 and this
+# Retry-After when SMART_SEARCH_DEGRADE is off)
+SMART_SEARCH_MAX_IN_FLIGHT = int(os.getenv("SMART_SEARCH_MAX_IN_FLIGHT", "4"))
+SMART_SEARCH_MAX_QUEUE = int(os.getenv("SMART_SEARCH_MAX_QUEUE", "8"))
+SMART_SEARCH_QUEUE_TIMEOUT = float(os.getenv("SMART_SEARCH_QUEUE_TIMEOUT", "0.5"))
+SMART_SEARCH_DEGRADE = os.getenv("SMART_SEARCH_DEGRADE", "true").lower() == "true"
+SMART_SEARCH_RETRY_AFTER = int(os.getenv("SMART_SEARCH_RETRY_AFTER", "1"))
+# Smart searches a client may burst, and searches per second it earns back;
+# counted in the cache, so only global with a cache shared by the workers
+SMART_SEARCH_BURST = int(os.getenv("SMART_SEARCH_BURST", "10"))
+SMART_SEARCH_RATE = float(os.getenv("SMART_SEARCH_RATE", "0.5"))
+
+# Database alias reads are routed to when it is configured, the paths whose
+# GET requests use it, seconds after any write that all reads stay on the
+# primary, and seconds a client that wrote keeps reading from the primary
+REPLICA_DATABASE = os.getenv("REPLICA_DATABASE", "replica")
+REPLICA_ROUTED_PATHS = tuple(os.getenv("REPLICA_ROUTED_PATHS", "/api/").split(","))
+REPLICA_LAG_SECONDS = float(os.getenv("REPLICA_LAG_SECONDS", "2"))
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", "15"))
+
+# Render member list pages straight from the database rows instead of through
+# the serializers
+FAST_LIST_RENDERING = os.getenv("FAST_LIST_RENDERING", "true").lower() == "true"
+
+# Also hold single-flight locks in the cache, so concurrent identical requests
+# compute once across workers and not just within each one
+SINGLE_FLIGHT_SHARED_LOCK = os.getenv("SINGLE_FLIGHT_SHARED_LOCK", "false").lower() == "true"
+
+# Directory the export_bundles command and job write static directory bundles to
+BUNDLES_DIR = Path(os.getenv("BUNDLES_DIR", BASE_DIR / "bundles"))
+
+# Embeddings model for profiles and queries, and the directory of the member
+# and project embedding indexes
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+EMBEDDING_INDEX_DIR = Path(os.getenv("EMBEDDING_INDEX_DIR", BASE_DIR / "embeddings"))
+# Lists an index is split into once trained (unset: the square root of its
+# size) and how many of them each search scores
+EMBEDDING_INDEX_LISTS = int(os.getenv("EMBEDDING_INDEX_LISTS", "0")) or None
+EMBEDDING_INDEX_PROBE = int(os.getenv("EMBEDDING_INDEX_PROBE", "8"))
+# Precision index files store vectors at (int8, float16 or float32), and
+# whether they keep full vectors to re-score the best candidates with
+EMBEDDING_PRECISION = os.getenv("EMBEDDING_PRECISION", "int8")
+EMBEDDING_RERANK = os.getenv("EMBEDDING_RERANK", "true").lower() == "true"
+# Map the embedding indexes at startup instead of on the first search
+EMBEDDING_INDEX_PRELOAD = os.getenv("EMBEDDING_INDEX_PRELOAD", "false").lower() == "true"
+
+# On-disk query embedding cache (empty to keep it in memory only), how many
+# query embeddings each worker keeps in memory, and how many of the most
+# frequent past smart searches it loads at startup
+QUERY_EMBEDDING_CACHE_PATH = os.getenv(
+    "QUERY_EMBEDDING_CACHE_PATH", str(BASE_DIR / "embeddings" / "query-embeddings.sqlite3")
+)
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "2048"))
+QUERY_EMBEDDING_PREWARM = int(os.getenv("QUERY_EMBEDDING_PREWARM", "200"))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
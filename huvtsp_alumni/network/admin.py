@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import NetworkMember, Organization, Experience, SocialLink, Project, ProjectLink, Resources, SearchTracking
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from .models import NetworkMember, Organization, Experience, SocialLink, Project, ProjectLink, Resources, SearchTracking, Job
 
 # Inline classes for related models
 class ExperienceInline(admin.TabularInline):
@@ -149,3 +151,53 @@ class SearchTrackingAdmin(admin.ModelAdmin):
             'fields': ('created_at',)
         }),
     )
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'task', 'status', 'priority', 'get_progress', 'attempts', 'created_at', 'get_duration', 'worker')
+    list_filter = ('status', 'task')
+    search_fields = ('task', 'progress_message', 'last_error')
+    readonly_fields = (
+        'task', 'args', 'dedupe_key', 'status', 'attempts', 'progress', 'progress_message', 'result',
+        'last_error', 'worker', 'created_at', 'started_at', 'heartbeat_at', 'finished_at', 'get_duration',
+    )
+    date_hierarchy = 'created_at'
+    actions = ['retry_jobs']
+    fieldsets = (
+        ('Job', {
+            'fields': ('task', 'args', 'priority', 'status', 'run_after')
+        }),
+        ('Progress', {
+            'fields': ('progress', 'progress_message', 'result', 'attempts', 'max_attempts', 'last_error')
+        }),
+        ('Timing', {
+            'fields': ('worker', 'created_at', 'started_at', 'heartbeat_at', 'finished_at', 'get_duration')
+        }),
+    )
+
+    def has_add_permission(self, request):
+        # Jobs are queued with enqueue() so they get a dedupe key
+        return False
+
+    def get_progress(self, obj):
+        return f"{obj.progress:.0%}"
+    get_progress.short_description = 'Progress'
+
+    def get_duration(self, obj):
+        duration = obj.duration
+        return f"{duration.total_seconds():.1f}s" if duration is not None else '-'
+    get_duration.short_description = 'Duration'
+
+    def retry_jobs(self, request, queryset):
+        retried = 0
+        for job in queryset.filter(status=Job.STATUS_FAILED):
+            try:
+                with transaction.atomic():
+                    retried += Job.objects.filter(id=job.id, status=Job.STATUS_FAILED).update(
+                        status=Job.STATUS_PENDING, attempts=0, run_after=timezone.now()
+                    )
+            except IntegrityError:
+                # An identical job is already queued
+                pass
+        self.message_user(request, f"{retried} failed jobs queued again")
+    retry_jobs.short_description = 'Retry selected failed jobs'
@@ -0,0 +1,170 @@
+from contextlib import contextmanager
+from typing import Dict, Optional
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+
+
+class SearchRejected(Exception):
+    """Raised when a smart search cannot be admitted in time"""
+
+
+class AdmissionController:
+    """Cap the number of smart searches running at once in this worker.
+
+    Up to ``max_in_flight`` searches run concurrently; up to ``max_queue``
+    more wait at most ``queue_timeout`` seconds for a slot, and anything
+    beyond that is rejected straight away so cheap requests on the same
+    worker keep flowing. Counters are kept for the stats endpoint.
+    """
+
+    def __init__(self, max_in_flight: int = 4, max_queue: int = 8, queue_timeout: float = 0.5):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._queued = 0
+        self._counters = {
+            'admitted': 0, 'queued': 0, 'rejected': 0, 'throttled': 0,
+            'degraded_cached': 0, 'degraded_keyword': 0,
+        }
+
+    @classmethod
+    def from_settings(cls) -> 'AdmissionController':
+        return cls(
+            max_in_flight=getattr(settings, 'SMART_SEARCH_MAX_IN_FLIGHT', 4),
+            max_queue=getattr(settings, 'SMART_SEARCH_MAX_QUEUE', 8),
+            queue_timeout=getattr(settings, 'SMART_SEARCH_QUEUE_TIMEOUT', 0.5),
+        )
+
+    def acquire(self) -> bool:
+        with self._condition:
+            if self._in_flight < self.max_in_flight:
+                self._in_flight += 1
+                self._counters['admitted'] += 1
+                return True
+            if self._queued >= self.max_queue:
+                self._counters['rejected'] += 1
+                return False
+
+            self._queued += 1
+            self._counters['queued'] += 1
+            try:
+                admitted = self._condition.wait_for(
+                    lambda: self._in_flight < self.max_in_flight, timeout=self.queue_timeout
+                )
+            finally:
+                self._queued -= 1
+            if not admitted:
+                self._counters['rejected'] += 1
+                return False
+            self._in_flight += 1
+            self._counters['admitted'] += 1
+            return True
+
+    def release(self):
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify()
+
+    @contextmanager
+    def admit(self):
+        """Hold a search slot for the duration of the block, or raise SearchRejected"""
+        if not self.acquire():
+            raise SearchRejected()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def record(self, counter: str):
+        with self._condition:
+            self._counters[counter] += 1
+
+    def metrics(self) -> Dict[str, int]:
+        with self._condition:
+            return {
+                'in_flight': self._in_flight,
+                'queue_length': self._queued,
+                'max_in_flight': self.max_in_flight,
+                'max_queue': self.max_queue,
+                'queue_timeout': self.queue_timeout,
+                **self._counters,
+            }
+
+
+_controller: Optional[AdmissionController] = None
+_controller_lock = threading.Lock()
+
+
+def get_admission_controller() -> AdmissionController:
+    global _controller
+    if _controller is None:
+        with _controller_lock:
+            if _controller is None:
+                _controller = AdmissionController.from_settings()
+    return _controller
+
+
+class SmartSearchThrottle(BaseThrottle):
+    """Per-client rate limit for smart search, counted in the default cache.
+
+    Each client (user, or address when anonymous) may run
+    ``SMART_SEARCH_BURST`` searches per window of ``burst / rate``
+    seconds, so on average ``SMART_SEARCH_RATE`` per second. Counts are
+    kept per window with ``cache.add`` and ``cache.incr``, which are atomic
+    on Redis and Memcached, and the previous window's count weighs in by
+    how much of it still overlaps the last ``burst / rate`` seconds. The
+    limit is only global with a cache shared by all workers; with the
+    default per-process memory cache each worker counts on its own.
+    """
+
+    def __init__(self):
+        self.burst = getattr(settings, 'SMART_SEARCH_BURST', 10)
+        self.rate = getattr(settings, 'SMART_SEARCH_RATE', 0.5)
+        self.retry_after: Optional[float] = None
+
+    def get_cache_key(self, request) -> str:
+        if request.user and request.user.is_authenticated:
+            ident = f'user-{request.user.pk}'
+        else:
+            ident = self.get_ident(request)
+        return f'smart-search-window:{ident}'
+
+    def allow_request(self, request, view) -> bool:
+        window = self.burst / self.rate
+        number, elapsed = divmod(time.time(), window)
+        key = self.get_cache_key(request)
+        current = f'{key}:{int(number)}'
+        previous = cache.get(f'{key}:{int(number) - 1}', 0)
+
+        # A window is read until the one after it ends
+        cache.add(current, 0, math.ceil(2 * window) + 1)
+        try:
+            count = cache.incr(current)
+        except ValueError:
+            # Evicted between add and incr
+            cache.add(current, 1, math.ceil(2 * window) + 1)
+            count = 1
+
+        overlap = previous * (1 - elapsed / window)
+        excess = overlap + count - self.burst
+        if excess <= 0:
+            return True
+
+        # Rejected searches do not count against the client
+        cache.decr(current)
+        if previous and excess <= overlap:
+            self.retry_after = excess * window / previous
+        else:
+            self.retry_after = window - elapsed
+        get_admission_controller().record('throttled')
+        return False
+
+    def wait(self) -> Optional[float]:
+        return self.retry_after
@@ -0,0 +1,352 @@
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+import math
+import threading
+
+import numpy as np
+from django.conf import settings
+
+from .embedding_store import EmbeddingStore
+
+
+def normalize(vectors) -> np.ndarray:
+    """Scale vectors (or one vector) to unit length as float32, leaving zero vectors alone"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def nearest_centroids(vectors: np.ndarray, centroids: np.ndarray, batch_size: int = 8192) -> np.ndarray:
+    """Index of the most similar centroid for each unit vector"""
+    assignments = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), batch_size):
+        chunk = vectors[start:start + batch_size]
+        assignments[start:start + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+    return assignments
+
+
+def kmeans(vectors: np.ndarray, k: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """Spherical k-means: k unit centroids for unit vectors"""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), k, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = nearest_centroids(vectors, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, vectors)
+        empty = np.bincount(assignments, minlength=k) == 0
+        # Lists that lost every vector restart from a random one
+        if empty.any():
+            sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+        centroids = normalize(sums)
+    return centroids
+
+
+class IVFIndex:
+    """Inverted-file index for cosine search over embeddings.
+
+    Vectors are stored unit-normalised, so cosine similarity is a dot
+    product. Once the index holds ``MIN_TRAIN_SIZE`` vectors it is trained:
+    k-means splits it into ``n_lists`` lists (the square root of its size
+    by default), and a search only scores the vectors in the ``n_probe``
+    lists whose centroids are closest to the query. More probes raise
+    recall at the cost of latency; probing every list is exact search.
+
+    Vectors can be added, replaced and removed at any time. New vectors
+    join their nearest list, and the lists are retrained whenever the
+    index has doubled in size since the last training.
+
+    Saved indexes are an ``EmbeddingStore`` file with vectors quantized to
+    ``precision``. A loaded index searches the memory-mapped codes in
+    place, re-ranking the best ``RERANK_FACTOR * k`` candidates at full
+    precision when ``rerank`` is on, and only copies its vectors into
+    float32 arrays if it is modified.
+    """
+
+    MIN_TRAIN_SIZE = 1024
+    # Vectors sampled per list when training
+    TRAIN_SAMPLE = 256
+    # Quantized candidates re-scored at full precision, per result
+    RERANK_FACTOR = 4
+
+    def __init__(self, n_lists: Optional[int] = None, n_probe: int = 8,
+                 precision: str = 'int8', rerank: bool = True):
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.precision = precision
+        self.rerank = rerank
+        self.store: Optional[EmbeddingStore] = None
+        self.dim: Optional[int] = None
+        self.ids = np.empty(0, dtype=np.int64)
+        self.vectors = np.empty((0, 0), dtype=np.float32)
+        self.lists = np.empty(0, dtype=np.int32)
+        self.centroids: Optional[np.ndarray] = None
+        self.trained_size = 0
+        self._size = 0
+        self._rows: Dict[int, int] = {}
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_settings(cls) -> 'IVFIndex':
+        return cls(
+            n_lists=getattr(settings, 'EMBEDDING_INDEX_LISTS', None),
+            n_probe=getattr(settings, 'EMBEDDING_INDEX_PROBE', 8),
+            precision=getattr(settings, 'EMBEDDING_PRECISION', 'int8'),
+            rerank=getattr(settings, 'EMBEDDING_RERANK', True),
+        )
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, object_id) -> bool:
+        if self.store is not None:
+            return bool(self.store.rows([int(object_id)])[0] >= 0)
+        return int(object_id) in self._rows
+
+    def trained_centroids(self) -> Optional[np.ndarray]:
+        """The list centroids, or None before the index is trained"""
+        if self.store is not None:
+            return self.store.sections['global:centroids'] if self.trained_size else None
+        return self.centroids
+
+    def stored_vectors(self) -> np.ndarray:
+        """The indexed vectors as float32, in row order"""
+        if self.store is not None:
+            return self.store.vectors()
+        return self.vectors[:self._size]
+
+    def _materialize(self):
+        """Copy a loaded store into writable arrays before the index changes"""
+        store = self.store
+        if store is None:
+            return
+        self.ids = np.array(store.ids)
+        self.vectors = store.vectors()
+        self.lists = np.array(store.sections['lists'])
+        self.centroids = np.array(store.sections['global:centroids']) if self.trained_size else None
+        self._rows = {int(object_id): row for row, object_id in enumerate(self.ids)}
+        self.store = None
+
+    def _reserve(self, count: int):
+        capacity = len(self.ids)
+        if self._size + count <= capacity:
+            return
+        capacity = max(self._size + count, capacity * 2, 64)
+        for name, shape in (('ids', (capacity,)), ('vectors', (capacity, self.dim)), ('lists', (capacity,))):
+            old = getattr(self, name)
+            new = np.zeros(shape, dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, name, new)
+
+    def add(self, object_id: int, vector):
+        """Insert a vector, or replace the one stored for object_id"""
+        self.add_many([object_id], [vector])
+
+    def add_many(self, object_ids: Iterable[int], vectors):
+        vectors = normalize(vectors)
+        if vectors.ndim != 2:
+            raise ValueError('Expected a 2-d array of vectors')
+        with self._lock:
+            self._materialize()
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+                self.vectors = np.empty((0, self.dim), dtype=np.float32)
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f'Expected {self.dim}-dimensional vectors, got {vectors.shape[1]}')
+
+            lists = nearest_centroids(vectors, self.centroids) if self.centroids is not None else None
+            for position, object_id in enumerate(object_ids):
+                object_id = int(object_id)
+                row = self._rows.get(object_id)
+                if row is None:
+                    self._reserve(1)
+                    row = self._rows[object_id] = self._size
+                    self._size += 1
+                    self.ids[row] = object_id
+                self.vectors[row] = vectors[position]
+                if lists is not None:
+                    self.lists[row] = lists[position]
+
+            if self._size >= self.MIN_TRAIN_SIZE and self._size >= 2 * self.trained_size:
+                self.train()
+
+    def remove(self, object_id: int) -> bool:
+        """Remove object_id's vector; returns whether it was indexed"""
+        with self._lock:
+            if object_id not in self:
+                return False
+            self._materialize()
+            row = self._rows.pop(int(object_id), None)
+            if row is None:
+                return False
+            last = self._size - 1
+            # Keep rows packed by moving the last row into the gap
+            if row != last:
+                self.ids[row] = self.ids[last]
+                self.vectors[row] = self.vectors[last]
+                self.lists[row] = self.lists[last]
+                self._rows[int(self.ids[row])] = row
+            self._size = last
+            return True
+
+    def train(self, n_lists: Optional[int] = None, seed: int = 0):
+        """Cluster the stored vectors into lists and assign every vector to one"""
+        with self._lock:
+            self._materialize()
+            size = self._size
+            if size == 0:
+                return
+            k = min(size, n_lists or self.n_lists or max(1, int(math.sqrt(size))))
+            rng = np.random.default_rng(seed)
+            sample = rng.choice(size, min(size, k * self.TRAIN_SAMPLE), replace=False)
+            self.centroids = kmeans(self.vectors[sample], k, seed=seed)
+            self.lists[:size] = nearest_centroids(self.vectors[:size], self.centroids)
+            self.trained_size = size
+
+    def search(self, query, k: int = 10, n_probe: Optional[int] = None, exact: bool = False) -> List[Tuple[int, float]]:
+        """The k most similar (id, cosine similarity) pairs, best first"""
+        query = normalize(query)
+        with self._lock:
+            size = self._size
+            if size == 0 or k <= 0:
+                return []
+            n_probe = n_probe or self.n_probe
+            centroids = self.trained_centroids()
+            lists = self.lists if self.store is None else self.store.sections['lists']
+            if exact or centroids is None or n_probe >= len(centroids):
+                rows = np.arange(size)
+            else:
+                probe = np.argpartition(-(centroids @ query), n_probe - 1)[:n_probe]
+                rows = np.flatnonzero(np.isin(lists[:size], probe))
+
+            if self.store is None:
+                ids = self.ids
+                scores = self.vectors[rows] @ query
+            else:
+                ids = self.store.ids
+                scores = self.store.scores(query, rows)
+                if self.rerank and self.store.full is not None:
+                    rows, scores = self._top(rows, scores, k * self.RERANK_FACTOR)
+                    scores = self.store.exact_scores(query, rows)
+
+            rows, scores = self._top(rows, scores, k)
+            return [(int(object_id), float(score)) for object_id, score in zip(ids[rows], scores)]
+
+    @staticmethod
+    def _top(rows: np.ndarray, scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """The k best-scoring rows and their scores, best first"""
+        if len(scores) > k:
+            best = np.argpartition(-scores, k - 1)[:k]
+        else:
+            best = np.arange(len(scores))
+        best = best[np.argsort(-scores[best], kind='stable')]
+        return rows[best], scores[best]
+
+    def save(self, path: Path):
+        """Write the index to path, atomically replacing any previous file"""
+        with self._lock:
+            self._materialize()
+            size = self._size
+            dim = self.dim or 0
+            EmbeddingStore.write(
+                path,
+                self.ids[:size],
+                self.vectors[:size].reshape(size, dim),
+                precision=self.precision,
+                keep_full=self.rerank,
+                extra={
+                    'lists': self.lists[:size],
+                    'global:centroids': self.centroids if self.centroids is not None else np.empty((0, dim), np.float32),
+                },
+                meta={'n_lists': self.n_lists, 'n_probe': self.n_probe, 'trained_size': self.trained_size},
+            )
+
+    @classmethod
+    def load(cls, path: Path) -> 'IVFIndex':
+        """Map a saved index; it is searched in place until modified"""
+        store = EmbeddingStore.open(path)
+        index = cls(
+            n_lists=store.meta['n_lists'], n_probe=store.meta['n_probe'],
+            precision=store.precision, rerank=getattr(settings, 'EMBEDDING_RERANK', True),
+        )
+        index.store = store
+        index.dim = store.dim or None
+        index.trained_size = store.meta['trained_size']
+        index._size = len(store)
+        return index
+
+
+def index_path(kind: str) -> Path:
+    """File holding the embedding index for 'member' or 'project'"""
+    directory = Path(getattr(settings, 'EMBEDDING_INDEX_DIR', settings.BASE_DIR / 'embeddings'))
+    return directory / f'{kind}.emb'
+
+
+def _modified(path: Path) -> Optional[int]:
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+# kind -> (path, file modification time when loaded or saved, index)
+_indexes: Dict[str, Tuple[Path, Optional[int], IVFIndex]] = {}
+_lock = threading.Lock()
+_batch = threading.local()
+
+
+def get_embedding_index(kind: str) -> IVFIndex:
+    """Return the process-wide index for kind, reloading it when another process saved it"""
+    path = index_path(kind)
+    modified = _modified(path)
+    entry = _indexes.get(kind)
+    if entry is None or entry[0] != path or entry[1] != modified:
+        with _lock:
+            entry = _indexes.get(kind)
+            if entry is None or entry[0] != path or entry[1] != modified:
+                index = IVFIndex.load(path) if modified is not None else IVFIndex.from_settings()
+                entry = _indexes[kind] = (path, modified, index)
+    return entry[2]
+
+
+def save_embedding_index(kind: str):
+    if getattr(_batch, 'dirty', None) is not None:
+        _batch.dirty.add(kind)
+        return
+    path = index_path(kind)
+    with _lock:
+        entry = _indexes.get(kind)
+        if entry is None or entry[0] != path:
+            return
+        entry[2].save(path)
+        # Swap the writable copy for the mapped file so workers stay lean
+        _indexes[kind] = (path, _modified(path), IVFIndex.load(path))
+
+
+@contextmanager
+def batch_updates():
+    """Save changed indexes once when the block ends instead of after every update"""
+    if getattr(_batch, 'dirty', None) is not None:
+        yield
+        return
+    _batch.dirty = set()
+    try:
+        yield
+    finally:
+        dirty, _batch.dirty = _batch.dirty, None
+        for kind in dirty:
+            save_embedding_index(kind)
+
+
+def update_embeddings(kind: str, object_ids: Iterable[int], vectors):
+    """Add or replace the vectors of object_ids in the kind's index and save it"""
+    get_embedding_index(kind).add_many(object_ids, vectors)
+    save_embedding_index(kind)
+
+
+def remove_embeddings(kind: str, object_ids: Iterable[int]):
+    """Drop object_ids from the kind's index, saving it if any were in it"""
+    index = get_embedding_index(kind)
+    removed = [object_id for object_id in object_ids if index.remove(object_id)]
+    if removed:
+        save_embedding_index(kind)
@@ -1,6 +1,32 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class NetworkConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'network'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+        if getattr(settings, 'OUTBOX_POLL_INTERVAL', 0):
+            # Each server process applies everyone's changes to its own derived state
+            from django.core.signals import request_started
+            from .outbox import start_worker_consumer
+            request_started.connect(start_worker_consumer, dispatch_uid='outbox-worker-consumer')
+
+        if getattr(settings, 'EMBEDDING_INDEX_PRELOAD', False):
+            # Map the embedding indexes up front, e.g. before a preforking server forks
+            from .ann import get_embedding_index
+            for kind in ('member', 'project'):
+                get_embedding_index(kind)
+
+        if getattr(settings, 'SEARCH_SNAPSHOT_PRELOAD', False):
+            # Map the persisted search snapshots and replay changes made since they were written
+            from django.db import DatabaseError
+            from .services import IntelligentMatchingService
+            try:
+                IntelligentMatchingService.warm_indexes()
+            except DatabaseError:
+                # Tables not migrated yet; the indexes load on the first search instead
+                pass
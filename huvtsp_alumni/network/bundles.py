@@ -0,0 +1,174 @@
+from typing import Dict, Iterable, List, Any, Optional, Tuple
+from collections import defaultdict
+from pathlib import Path
+import gzip
+import hashlib
+import json
+
+from django.utils import timezone
+from django.utils.text import slugify
+
+from .models import NetworkMember, Organization, Project, ChangeLog
+from .snapshot import settled_change
+from .serializers import NetworkMemberListSerializer, OrganizationListSerializer, ProjectListSerializer
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; bundles are still gzip-compressed
+    brotli = None
+
+
+MANIFEST_NAME = 'manifest.json'
+
+# Change feed entities whose changes alter the bundles
+BUNDLE_ENTITIES = [
+    ChangeLog.ENTITY_MEMBER,
+    ChangeLog.ENTITY_EXPERIENCE,
+    ChangeLog.ENTITY_PROJECT,
+    ChangeLog.ENTITY_ORGANIZATION,
+]
+
+
+def encode(data: Any) -> bytes:
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def shard_names(prefix: str, values: Iterable[str]) -> Dict[str, str]:
+    """Bundle name of each shard value, unique even where values slugify alike.
+
+    Values are taken in sorted order; the first to claim a slug keeps it
+    and the rest get a short hash of the value appended, so names stay
+    the same from one export to the next.
+    """
+    names: Dict[str, str] = {}
+    taken = set()
+    for value in sorted(values):
+        name = f'{prefix}-{slugify(value) or "none"}'
+        if name in taken:
+            name = f'{name}-{hashlib.sha256(value.encode("utf-8")).hexdigest()[:8]}'
+        taken.add(name)
+        names[value] = name
+    return names
+
+
+class BundleExporter:
+    """Render the public directory into static, content-hashed JSON bundles.
+
+    Writes a member card index, one member shard per pod and per region,
+    plus project and organization bundles, using the same fields as the
+    list API. Each bundle is named after a hash of its content and written
+    with gzip (and brotli, when installed) siblings. ``manifest.json`` maps
+    bundle names to files and each pod and region to its shard, and
+    records the change log cursor it was built at,
+    so a run with no directory changes since then does nothing, and only
+    bundles whose content changed are rewritten and recompressed.
+    """
+
+    def __init__(self, output_dir: Path):
+        self.output_dir = Path(output_dir)
+
+    def read_manifest(self) -> Optional[Dict[str, Any]]:
+        path = self.output_dir / MANIFEST_NAME
+        if not path.exists():
+            return None
+        return json.loads(path.read_text())
+
+    def is_stale(self, manifest: Optional[Dict[str, Any]]) -> bool:
+        if manifest is None:
+            return True
+        return ChangeLog.objects.filter(
+            id__gt=manifest['cursor'], entity__in=BUNDLE_ENTITIES
+        ).exists()
+
+    def export(self, force: bool = False) -> Dict[str, Any]:
+        """Rebuild the bundles if the directory changed; return a summary"""
+        previous = self.read_manifest()
+        if not force and not self.is_stale(previous):
+            return {'rebuilt': False, 'written': [], 'manifest': previous}
+
+        # Read the cursor first so changes made while rendering trigger another run;
+        # it stays before gaps that may still fill, like a snapshot watermark
+        latest = ChangeLog.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        cursor = settled_change(latest)
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        written = []
+        files: Dict[str, Any] = {}
+        bundles, shards = self.render()
+        for name, data in bundles.items():
+            filename, is_new = self.write_bundle(name, data)
+            files[name] = filename
+            if is_new:
+                written.append(filename)
+
+        manifest = {
+            'cursor': cursor,
+            'generated_at': timezone.now().isoformat(),
+            'compression': ['gzip'] + (['br'] if brotli else []),
+            'bundles': files,
+            'shards': shards,
+        }
+        self.write_manifest(manifest)
+        self.remove_stale_files(manifest, previous)
+        return {'rebuilt': True, 'written': written, 'manifest': manifest}
+
+    def render(self) -> Tuple[Dict[str, Any], Dict[str, Dict[str, str]]]:
+        """Serialize every bundle, keyed by bundle name, and name the shard of each pod and region"""
+        members = NetworkMember.objects.prefetch_related('experiences').order_by('first_name', 'last_name')
+        cards = NetworkMemberListSerializer(members, many=True).data
+
+        by_pod: Dict[str, List] = defaultdict(list)
+        by_region: Dict[str, List] = defaultdict(list)
+        for card in cards:
+            by_pod[card['pod']].append(card)
+            by_region[card['region']].append(card)
+
+        projects = Project.objects.prefetch_related('founders').order_by('title')
+        organizations = Organization.objects.prefetch_related('affiliated_people').order_by('name')
+
+        bundles = {
+            'members': cards,
+            'projects': ProjectListSerializer(projects, many=True).data,
+            'organizations': OrganizationListSerializer(organizations, many=True).data,
+        }
+        shards = {
+            'pod': shard_names('members-pod', by_pod),
+            'region': shard_names('members-region', by_region),
+        }
+        for pod, pod_cards in by_pod.items():
+            bundles[shards['pod'][pod]] = {'pod': pod, 'results': pod_cards}
+        for region, region_cards in by_region.items():
+            bundles[shards['region'][region]] = {'region': region, 'results': region_cards}
+        return bundles, shards
+
+    def write_bundle(self, name: str, data: Any):
+        """Write one bundle and its compressed copies, unless identical content exists"""
+        content = encode(data)
+        filename = f"{name}.{hashlib.sha256(content).hexdigest()[:12]}.json"
+        path = self.output_dir / filename
+        if path.exists():
+            return filename, False
+
+        path.write_bytes(content)
+        (self.output_dir / f"{filename}.gz").write_bytes(gzip.compress(content, compresslevel=9, mtime=0))
+        if brotli is not None:
+            (self.output_dir / f"{filename}.br").write_bytes(brotli.compress(content))
+        return filename, True
+
+    def write_manifest(self, manifest: Dict[str, Any]):
+        path = self.output_dir / MANIFEST_NAME
+        temporary = path.with_suffix('.tmp')
+        temporary.write_bytes(encode(manifest))
+        # Swap the manifest in atomically so readers never see a partial file
+        temporary.replace(path)
+
+    def remove_stale_files(self, manifest: Dict[str, Any], previous: Optional[Dict[str, Any]]):
+        """Delete bundles referenced by neither this manifest nor the previous one"""
+        keep = set(manifest['bundles'].values())
+        if previous:
+            keep.update(previous['bundles'].values())
+        for path in self.output_dir.glob('*.json*'):
+            if path.name == MANIFEST_NAME:
+                continue
+            if path.name.split('.json')[0] + '.json' not in keep:
+                path.unlink()
@@ -0,0 +1,75 @@
+from functools import wraps
+from typing import Sequence
+
+from django.views.decorators.cache import cache_page
+from django.views.decorators.http import condition
+
+from .singleflight import get_single_flight
+from .versions import get_versions, get_last_modified
+
+
+def versions_etag(models: Sequence) -> str:
+    versions = get_versions(models)
+    return '-'.join(str(versions[model]) for model in models)
+
+
+def versioned_cache_page(timeout: int, *models):
+    """Like ``cache_page``, but entries are dropped as soon as any of the models change.
+
+    The current change versions are part of the cache key prefix, so a
+    cached page is never served for data that has since been written.
+    Concurrent misses for the same page are coalesced: one request renders
+    it and the others are served from the cache once it is done.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            key_prefix = versions_etag(models)
+            cached_view = cache_page(timeout, key_prefix=key_prefix)(view_func)
+            if request.method not in ('GET', 'HEAD'):
+                return cached_view(request, *args, **kwargs)
+
+            finish = get_single_flight().begin(('page', key_prefix, request.method, request.get_full_path()))
+            if finish is None:
+                return cached_view(request, *args, **kwargs)
+            try:
+                response = cached_view(request, *args, **kwargs)
+            except BaseException:
+                finish()
+                raise
+            # The page is cached when the response is rendered; release waiting requests then
+            if callable(getattr(response, 'add_post_render_callback', None)) and not response.is_rendered:
+                response.add_post_render_callback(lambda response: finish())
+            else:
+                finish()
+            return response
+        return wrapper
+    return decorator
+
+
+class ConditionalGetMixin:
+    """Answer If-None-Match / If-Modified-Since from per-model change versions.
+
+    The ETag is built from the change versions of ``version_models`` and
+    Last-Modified is the time of their newest change log entry. Both are
+    checked before the request reaches DRF, so a 304 costs no serializer
+    work, only a couple of indexed queries on the change log.
+    """
+    version_models: Sequence = ()
+
+    def get_version_models(self, action: str) -> Sequence:
+        """Models whose changes affect the response of the given action"""
+        return self.version_models
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+
+        models = self.get_version_models(self.action_map.get(request.method.lower()))
+        if not models:
+            return super().dispatch(request, *args, **kwargs)
+
+        return condition(
+            etag_func=lambda request, *args, **kwargs: versions_etag(models),
+            last_modified_func=lambda request, *args, **kwargs: get_last_modified(models),
+        )(super().dispatch)(request, *args, **kwargs)
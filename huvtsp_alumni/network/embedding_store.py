@@ -0,0 +1,123 @@
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from .mapped import MappedFile, write_mapped
+
+
+PRECISIONS = ('int8', 'float16', 'float32')
+
+
+def quantize(vectors: np.ndarray, precision: str):
+    """Encode float vectors as (codes, per-vector scales or None)"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if precision == 'int8':
+        scales = np.abs(vectors).max(axis=1) / 127 if len(vectors) else np.empty(0, np.float32)
+        scales = np.where(scales == 0, 1, scales).astype(np.float32)
+        codes = np.rint(vectors / scales[:, None]).astype(np.int8)
+        return codes, scales
+    if precision in ('float16', 'float32'):
+        return vectors.astype(precision), None
+    raise ValueError(f'Unknown precision {precision!r}; expected one of {PRECISIONS}')
+
+
+class EmbeddingStore:
+    """Embeddings held in one memory-mapped file, quantized to int8 or float16.
+
+    Rows are sorted by id, so looking up an id is a binary search over the
+    mapped id column rather than a per-process dictionary. int8 codes carry
+    one float32 scale per vector. The file can also keep full-precision
+    vectors to re-rank the best quantized candidates, and any extra arrays
+    the caller stores alongside (the IVF index keeps its lists and
+    centroids there).
+
+    Opening the file maps it read-only: arrays are views onto the page
+    cache, shared between every worker on the host, and only the pages a
+    search touches are read from disk.
+    """
+
+    BATCH_SIZE = 16384
+
+    def __init__(self, mapped: MappedFile):
+        self.path = mapped.path
+        self.precision: str = mapped.meta['precision']
+        self.dim: int = mapped.meta['dim']
+        self.meta: Dict[str, Any] = mapped.meta['extra']
+        self.sections: Dict[str, np.ndarray] = mapped.arrays
+        self.ids = self.sections['ids']
+        self.codes = self.sections['codes']
+        self.scales = self.sections.get('scales')
+        self.full = self.sections.get('full')
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def write(cls, path: Path, ids, vectors, precision: str = 'int8', keep_full: bool = True,
+              extra: Optional[Dict[str, np.ndarray]] = None, meta: Optional[Dict[str, Any]] = None):
+        """Write a store atomically, replacing any previous file.
+
+        Extra arrays hold one row per vector and are reordered with them,
+        except those named ``global:<name>``, which are stored as they are.
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        vectors = np.asarray(vectors, dtype=np.float32)
+        order = np.argsort(ids, kind='stable')
+        ids, vectors = ids[order], vectors[order]
+        codes, scales = quantize(vectors, precision)
+
+        sections = {'ids': ids, 'codes': codes}
+        if scales is not None:
+            sections['scales'] = scales
+        if keep_full and precision != 'float32':
+            sections['full'] = vectors
+        for name, array in (extra or {}).items():
+            array = np.ascontiguousarray(array)
+            sections[name] = array if name.startswith('global:') else array[order]
+
+        write_mapped(path, sections, {'precision': precision, 'dim': vectors.shape[1], 'extra': meta or {}})
+
+    @classmethod
+    def open(cls, path: Path) -> 'EmbeddingStore':
+        return cls(MappedFile(path))
+
+    def rows(self, ids) -> np.ndarray:
+        """Row of each id, or -1 where the id is not stored"""
+        ids = np.asarray(ids, dtype=np.int64)
+        if len(self.ids) == 0:
+            return np.full(ids.shape, -1, dtype=np.int64)
+        rows = np.minimum(np.searchsorted(self.ids, ids), len(self.ids) - 1)
+        return np.where(self.ids[rows] == ids, rows, -1)
+
+    def decode(self, rows=None) -> np.ndarray:
+        """Approximate float32 vectors for rows (all rows by default)"""
+        codes = self.codes if rows is None else self.codes[rows]
+        vectors = codes.astype(np.float32)
+        if self.scales is not None:
+            vectors *= (self.scales if rows is None else self.scales[rows])[:, None]
+        return vectors
+
+    def vectors(self) -> np.ndarray:
+        """All vectors as a new float32 array, at full precision when the store kept it"""
+        return np.array(self.full, dtype=np.float32) if self.full is not None else self.decode()
+
+    def scores(self, query: np.ndarray, rows=None) -> np.ndarray:
+        """Dot products of query with the quantized rows, decoded a batch at a time"""
+        query = np.asarray(query, dtype=np.float32)
+        count = len(self.ids) if rows is None else len(rows)
+        scores = np.empty(count, dtype=np.float32)
+        for start in range(0, count, self.BATCH_SIZE):
+            batch = slice(start, start + self.BATCH_SIZE)
+            selected = batch if rows is None else rows[batch]
+            part = self.codes[selected].astype(np.float32) @ query
+            if self.scales is not None:
+                part *= self.scales[selected]
+            scores[batch] = part
+        return scores
+
+    def exact_scores(self, query: np.ndarray, rows) -> np.ndarray:
+        """Full-precision dot products for rows; the quantized ones if the store has none"""
+        if self.full is None:
+            return self.scores(query, rows)
+        return self.full[rows] @ np.asarray(query, dtype=np.float32)
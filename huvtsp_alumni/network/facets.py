@@ -0,0 +1,45 @@
+from typing import Dict, List, Any
+from collections import Counter
+
+from django.db.models import Count, QuerySet
+
+
+# Member fields the frontend filters on
+MEMBER_FACETS = ['region', 'session', 'pod', 'internship']
+
+
+def compute_member_facets(queryset: QuerySet, active_filters: Dict[str, str]) -> Dict[str, Any]:
+    """Count every member facet, aware of the other active filters, in one query.
+
+    ``queryset`` must not have the facet filters applied. It is grouped
+    once by all facet fields together; each facet's counts then include
+    the rows matching every active filter except that facet's own, so
+    the frontend can still show how many members other choices would give.
+    ``total`` counts the rows matching all active filters.
+    """
+    active = {field: value for field, value in active_filters.items() if field in MEMBER_FACETS and value}
+    facets = {field: Counter() for field in MEMBER_FACETS}
+    total = 0
+
+    for row in queryset.order_by().values(*MEMBER_FACETS).annotate(count=Count('id')):
+        mismatched = [field for field, value in active.items() if row[field] != value]
+        if not mismatched:
+            total += row['count']
+        for field in MEMBER_FACETS:
+            # A row counts towards a facet if it matches every other filter
+            if not mismatched or mismatched == [field]:
+                facets[field][row[field]] += row['count']
+
+    result: Dict[str, Any] = {
+        field: _facet_rows(field, counts) for field, counts in facets.items()
+    }
+    result['total'] = total
+    return result
+
+
+def _facet_rows(field: str, counts: Counter) -> List[Dict[str, Any]]:
+    # Same shape as the by_region/by_session actions
+    return [
+        {field: value, 'count': count}
+        for value, count in sorted(counts.items(), key=lambda item: (item[0] is None, item[0] or ''))
+    ]
@@ -0,0 +1,154 @@
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.db.models import Count
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework import ISO_8601
+from rest_framework.settings import api_settings
+
+from .fieldsets import DISPLAY_SOURCE
+
+
+# Model fields whose values() value is already what the matching serializer field sends
+PLAIN_FIELDS = (
+    ((models.AutoField, models.BigAutoField, models.IntegerField), serializers.IntegerField),
+    (models.BooleanField, serializers.BooleanField),
+    ((models.CharField, models.TextField), (serializers.CharField, serializers.ChoiceField)),
+)
+
+# (output name, values_list column index, conversion for non-null values or None)
+RowSpec = List[Tuple[str, int, Optional[Callable]]]
+
+
+@lru_cache(maxsize=None)
+def choice_labels(model, field_name: str) -> Dict:
+    """Display labels for a choice field, as used by get_FOO_display"""
+    return {value: str(label) for value, label in model._meta.get_field(field_name).flatchoices}
+
+
+def _file_url(field, request) -> Callable:
+    storage = field.storage
+
+    def convert(name):
+        if not name:
+            return None
+        url = storage.url(name)
+        return request.build_absolute_uri(url) if request is not None else url
+    return convert
+
+
+def plan_rows(serializer, request) -> Optional[Tuple[List[str], RowSpec, Dict[str, str]]]:
+    """Work out how to build a serializer's rows from values_list() tuples.
+
+    Returns the columns to load, the row spec and the count fields (output
+    name to relation), or None when a field is anything but a plain column,
+    a choice display, a file URL, a date or a relation count.
+    """
+    model = serializer.Meta.model
+    columns: List[str] = [model._meta.pk.attname]
+    spec: RowSpec = []
+    counts: Dict[str, str] = {}
+    count_fields = getattr(serializer, 'count_fields', ())
+    method_relations = getattr(serializer, 'method_field_relations', {})
+
+    def column(name: str) -> int:
+        if name not in columns:
+            columns.append(name)
+        return columns.index(name)
+
+    for name, field in serializer.fields.items():
+        source = field.source
+        if isinstance(field, serializers.SerializerMethodField):
+            relation = method_relations.get(name) if name in count_fields else None
+            if relation is None:
+                return None
+            counts[name] = relation
+            spec.append((name, 0, None))
+            continue
+        if isinstance(field, (serializers.RelatedField, serializers.ManyRelatedField, serializers.BaseSerializer)):
+            return None
+
+        display = DISPLAY_SOURCE.match(source)
+        try:
+            model_field = model._meta.get_field(display.group(1) if display else source)
+        except FieldDoesNotExist:
+            return None
+        if not model_field.concrete or model_field.is_relation:
+            return None
+
+        if display and isinstance(field, serializers.CharField):
+            labels = choice_labels(model, model_field.name)
+            spec.append((name, column(model_field.attname), lambda value, labels=labels: labels.get(value, value)))
+        elif isinstance(model_field, models.FileField) and isinstance(field, serializers.FileField):
+            if not getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL):
+                return None
+            spec.append((name, column(model_field.attname), _file_url(model_field, request)))
+        elif (
+            isinstance(model_field, models.DateField) and not isinstance(model_field, models.DateTimeField)
+            and type(field) is serializers.DateField
+            and getattr(field, 'format', api_settings.DATE_FORMAT).lower() == ISO_8601
+        ):
+            spec.append((name, column(model_field.attname), lambda value: value.isoformat()))
+        elif any(isinstance(model_field, kinds) and isinstance(field, kind) for kinds, kind in PLAIN_FIELDS):
+            spec.append((name, column(model_field.attname), None))
+        else:
+            return None
+
+    return columns, spec, counts
+
+
+def build_rows(model, rows: List[tuple], spec: RowSpec, counts: Dict[str, str]) -> List[Dict]:
+    """Turn values_list() tuples into dicts shaped exactly like the serializer output"""
+    if counts:
+        ids = [row[0] for row in rows]
+        annotations = {name: Count(relation, distinct=True) for name, relation in counts.items()}
+        counted = {
+            row['pk']: row
+            for row in model._default_manager.filter(pk__in=ids).order_by().values('pk').annotate(**annotations)
+        }
+        spec = [
+            (name, index, (lambda pk, name=name: counted[pk][name]) if name in counts else convert)
+            for name, index, convert in spec
+        ]
+
+    data = []
+    for row in rows:
+        item = {}
+        for name, index, convert in spec:
+            value = row[index]
+            item[name] = value if convert is None or value is None else convert(value)
+        data.append(item)
+    return data
+
+
+class FastListMixin:
+    """Serve ``list`` from values_list() rows instead of serializer instances.
+
+    Rows are built straight from column tuples with precomputed choice
+    labels and relation counts, giving the same JSON as the list serializer
+    without DRF's per-field machinery. Falls back to the serializer when
+    its fields cannot be planned, or when ``FAST_LIST_RENDERING`` is off.
+    """
+
+    def list(self, request, *args, **kwargs):
+        if not getattr(settings, 'FAST_LIST_RENDERING', True):
+            return super().list(request, *args, **kwargs)
+
+        serializer = self.get_serializer(many=True).child
+        plan = plan_rows(serializer, request)
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+        columns, spec, counts = plan
+
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None).values_list(*columns)
+        page = self.paginate_queryset(queryset)
+        rows = list(page if page is not None else queryset)
+        data = build_rows(queryset.model, rows, spec, counts)
+
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
@@ -0,0 +1,197 @@
+from typing import Dict, Optional, Set, Tuple
+import re
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch, QuerySet
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+
+DISPLAY_SOURCE = re.compile(r'^get_(\w+)_display$')
+
+
+def parse_fields(value: str) -> Dict[str, dict]:
+    """Turn "id,title,founders.first_name" into a nested dict of field names"""
+    tree: Dict[str, dict] = {}
+    for path in value.split(','):
+        node = tree
+        for name in filter(None, path.strip().split('.')):
+            node = node.setdefault(name, {})
+    return tree
+
+
+class SparseFieldsetMixin:
+    """Let clients choose fields with ``?fields=`` and nested relations with ``?expand=``.
+
+    ``fields`` is a comma-separated list of field names, with dotted names
+    reaching into nested serializers (``fields=id,title,founders.first_name``).
+    Once ``expand`` is given, nested relations not listed in it are sent as
+    lists of ids; without it every relation is nested as before. Both only
+    apply to reads, so writes always validate and return every field.
+    """
+
+    # SerializerMethodFields and the relation they read, so views can prefetch it
+    method_field_relations: Dict[str, str] = {}
+    # Method fields that return the size of their relation, so it can be counted in SQL
+    count_fields: Tuple[str, ...] = ()
+
+    def _sparse_path(self) -> Tuple[str, ...]:
+        names = []
+        node = self
+        while node is not None:
+            if node.field_name:
+                names.append(node.field_name)
+            node = node.parent
+        return tuple(reversed(names))
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is None or request.method not in SAFE_METHODS:
+            return fields
+
+        params = getattr(request, 'query_params', request.GET)
+        path = self._sparse_path()
+
+        if 'fields' in params:
+            requested: Optional[dict] = parse_fields(params['fields'])
+            for name in path:
+                requested = requested.get(name) if requested is not None else None
+            # An empty node means the relation was asked for without sub-fields
+            if requested:
+                fields = {name: field for name, field in fields.items() if name in requested}
+        else:
+            requested = None
+
+        if 'expand' in params:
+            expanded = {tuple(filter(None, p.strip().split('.'))) for p in params['expand'].split(',')}
+            for name, field in list(fields.items()):
+                child = getattr(field, 'child', field)
+                if not isinstance(child, serializers.ModelSerializer):
+                    continue
+                if path + (name,) in expanded or (requested and requested.get(name)):
+                    continue
+                collapsed = {'many': isinstance(field, serializers.ListSerializer), 'read_only': True}
+                if field.source and field.source != name:
+                    collapsed['source'] = field.source
+                fields[name] = serializers.PrimaryKeyRelatedField(**collapsed)
+        return fields
+
+
+def plan_queryset(queryset: QuerySet, serializer: serializers.ModelSerializer) -> QuerySet:
+    """Trim a queryset to the columns and relations a serializer will read.
+
+    Adds ``only()`` for the serialized columns, ``select_related`` for
+    dotted sources and a ``Prefetch`` for every nested relation, itself
+    trimmed the same way. Returns the queryset unchanged when a field's
+    needs cannot be worked out.
+    """
+    plan = _plan(queryset.model, serializer)
+    if plan is None:
+        return queryset
+    columns, select, prefetches = plan
+    return _apply_plan(queryset.select_related(None).prefetch_related(None), columns, select, prefetches)
+
+
+def _apply_plan(queryset: QuerySet, columns: Set[str], select: Set[str], prefetches: Dict[str, Prefetch]) -> QuerySet:
+    queryset = queryset.only(*columns)
+    # select_related() without arguments would follow every foreign key
+    if select:
+        queryset = queryset.select_related(*select)
+    return queryset.prefetch_related(*prefetches.values())
+
+
+def _plan(model, serializer) -> Optional[Tuple[Set[str], Set[str], Dict[str, Prefetch]]]:
+    if getattr(getattr(serializer, 'Meta', None), 'model', model) is not model:
+        return None
+
+    columns: Set[str] = {model._meta.pk.name}
+    select: Set[str] = set()
+    prefetches: Dict[str, Prefetch] = {}
+    method_relations = getattr(serializer, 'method_field_relations', {})
+
+    # Fragment-cached serializers key each object on its row version
+    version_field = getattr(getattr(serializer.Meta, 'list_serializer_class', None), 'version_field', None)
+    if version_field:
+        columns.add(version_field)
+
+    for name, field in serializer.fields.items():
+        source = field.source
+        child = getattr(field, 'child_relation', None) or getattr(field, 'child', None)
+
+        if isinstance(field, serializers.SerializerMethodField):
+            relation = method_relations.get(name)
+            if relation is None:
+                return None
+            if relation not in prefetches:
+                prefetch = _relation_prefetch(model, relation, None)
+                if prefetch is None:
+                    return None
+                prefetches[relation] = prefetch
+        elif isinstance(child, serializers.ModelSerializer) or isinstance(field, serializers.ModelSerializer):
+            prefetch = _relation_prefetch(model, source, child or field)
+            if prefetch is None:
+                return None
+            prefetches[source] = prefetch
+        elif isinstance(field, serializers.ManyRelatedField):
+            prefetch = _relation_prefetch(model, source, None)
+            if prefetch is None:
+                return None
+            prefetches.setdefault(source, prefetch)
+        elif '.' in source:
+            relation, attribute = source.split('.', 1)
+            if '.' in attribute or not _is_concrete(model, relation):
+                return None
+            select.add(relation)
+            columns.add(f"{relation}__{attribute}")
+        elif DISPLAY_SOURCE.match(source):
+            columns.add(DISPLAY_SOURCE.match(source).group(1))
+        elif _is_concrete(model, source):
+            columns.add(source)
+        else:
+            return None
+
+    return columns, select, prefetches
+
+
+def _is_concrete(model, name: str) -> bool:
+    try:
+        return model._meta.get_field(name).concrete
+    except FieldDoesNotExist:
+        return False
+
+
+def _relation_prefetch(model, relation: str, child_serializer) -> Optional[Prefetch]:
+    """Prefetch a to-many relation, loading only what child_serializer reads (ids if None)"""
+    try:
+        field = model._meta.get_field(relation)
+    except FieldDoesNotExist:
+        return None
+    if not (field.one_to_many or field.many_to_many):
+        return None
+
+    related_model = field.related_model
+    if child_serializer is None:
+        columns, select, prefetches = {related_model._meta.pk.name}, set(), {}
+    else:
+        plan = _plan(related_model, child_serializer)
+        if plan is None:
+            return None
+        columns, select, prefetches = plan
+
+    # Reverse foreign keys are matched back to their parent on the child's column
+    if field.one_to_many:
+        columns.add(field.field.name)
+
+    queryset = _apply_plan(related_model._default_manager.all(), columns, select, prefetches)
+    return Prefetch(relation, queryset=queryset)
+
+
+class SparseQuerysetMixin:
+    """Trim list and retrieve querysets to the fields the serializer will send"""
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method not in ('GET', 'HEAD') or self.action not in ('list', 'retrieve'):
+            return queryset
+        return plan_queryset(queryset, self.get_serializer())
@@ -0,0 +1,34 @@
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from .geo import parse_near
+from .services import IntelligentMatchingService
+from .snapshot import get_member_snapshot
+
+
+def near_params(query_params):
+    """[latitude, longitude, radius_km, area] from near=/radius_km= parameters, or None without near="""
+    near = query_params.get('near', '')
+    if not near:
+        return None
+    try:
+        latitude, longitude, radius_km, area = parse_near(near, query_params.get('radius_km'))
+    except ValueError as error:
+        raise ValidationError({'error': str(error)})
+    return [latitude, longitude, radius_km, area]
+
+
+class NearFilter(BaseFilterBackend):
+    """Limits members to those within radius_km of near=, a place name or "latitude,longitude".
+
+    The circle is looked up in the member search snapshot's grid index, so
+    only members in the cells it covers have their distance computed. A
+    state or country without radius_km keeps the members placed in it.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        near = near_params(request.query_params)
+        if near is None:
+            return queryset
+        snapshot = get_member_snapshot(IntelligentMatchingService.SKILL_VOCABULARY)
+        return queryset.filter(id__in=snapshot.ids[snapshot.near_mask(near)].tolist())
@@ -0,0 +1,94 @@
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, List
+import threading
+
+from django.db import models
+from rest_framework import serializers
+
+
+class FragmentCache:
+    """Process-wide LRU of serialized objects, bounded by entry count.
+
+    Keys carry the row version, so entries for an object that has since
+    been written are never read again and age out of the LRU. Cached
+    fragments are shared between responses and must not be mutated.
+    """
+
+    MAX_ENTRIES = 10000
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        found = {}
+        with self._lock:
+            for key in keys:
+                value = self._entries.get(key)
+                if value is not None:
+                    self._entries.move_to_end(key)
+                    found[key] = value
+        return found
+
+    def set_many(self, fragments: Dict[Hashable, Any]):
+        with self._lock:
+            for key, value in fragments.items():
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_fragment_cache = FragmentCache()
+
+
+def get_fragment_cache() -> FragmentCache:
+    return _fragment_cache
+
+
+class FragmentCacheListSerializer(serializers.ListSerializer):
+    """List serializer that reuses each object's serialized form while its row is unchanged.
+
+    Fragments are keyed by (model, pk, serializer, row version, base URL);
+    the base URL matters because file fields are sent as absolute URLs.
+    Only objects missing from the cache go through the child serializer.
+    Sparse fieldset requests change the shape of each object and bypass
+    the cache.
+    """
+
+    # Column bumped whenever anything the child serializer reads changes
+    version_field = 'updated_at'
+
+    def to_representation(self, data) -> List[Dict]:
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        request = self.context.get('request')
+        params = getattr(request, 'query_params', {}) if request is not None else {}
+        if 'fields' in params or 'expand' in params:
+            return [self.child.to_representation(item) for item in iterable]
+
+        items = list(iterable)
+        base_url = request.build_absolute_uri('/') if request is not None else ''
+        serializer_name = f"{type(self.child).__module__}.{type(self.child).__qualname__}"
+        keys = [
+            (item._meta.label_lower, item.pk, serializer_name, getattr(item, self.version_field), base_url)
+            for item in items
+        ]
+
+        cache = get_fragment_cache()
+        fragments = cache.get_many(keys)
+        missing = {
+            key: self.child.to_representation(item)
+            for key, item in zip(keys, items) if key not in fragments
+        }
+        if missing:
+            cache.set_many(missing)
+            fragments.update(missing)
+        return [fragments[key] for key in keys]
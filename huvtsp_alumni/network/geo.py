@@ -0,0 +1,276 @@
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import csv
+import math
+import re
+import threading
+
+import numpy as np
+from django.conf import settings
+
+
+EARTH_RADIUS_KM = 6371.0088
+DEFAULT_GAZETTEER = Path(__file__).resolve().parent / 'data' / 'gazetteer.tsv'
+
+
+class Place(NamedTuple):
+    """A gazetteer entry; radius_km is 0 for a city and the rough extent of a wider area.
+
+    code is the admin code of the cities in a state or province.
+    """
+    name: str
+    admin: str
+    country: str
+    latitude: float
+    longitude: float
+    radius_km: float
+    code: str = ''
+
+    @property
+    def label(self) -> str:
+        return ', '.join(part for part in (self.name, self.admin, self.country) if part)
+
+    @property
+    def is_area(self) -> bool:
+        """A state or country, matched by what lies in it rather than by a radius.
+
+        Metro areas (with an admin) and continents (without a country) keep
+        their radius, as the gazetteer does not say what lies in them.
+        """
+        return self.radius_km > 0 and not self.admin and bool(self.country)
+
+    def contains(self, other: 'Place') -> bool:
+        """Whether other lies in this place; only states and countries contain others"""
+        if other == self:
+            return True
+        if not self.is_area or other.country != self.country:
+            return False
+        if self.code:
+            return other.admin == self.code or other.code == self.code
+        # A country, which contains everything in it
+        return self.name == self.country
+
+
+def place_words(text: str) -> str:
+    """Lower-cased words of text, space separated and padded, so phrases match on word boundaries"""
+    return ' ' + ' '.join(re.findall(r'\w+', text.lower())) + ' '
+
+
+class Gazetteer:
+    """Offline list of places that free-text locations are resolved against.
+
+    Each place is known by its name, "name admin", "name country" and any
+    extra aliases. All aliases are found in one pass over a location by a
+    keyword automaton. A place in a state or country the location names
+    beats one outside them ("London, Ontario" is not London, UK), then a
+    city beats a wider area, then a longer alias beats a shorter one, then
+    the place listed first wins.
+    """
+
+    # Areas named by an alias this short ("ca", "uk") support a place in
+    # them but do not rule out places elsewhere; "Toronto, CA" is Toronto
+    WEAK_ALIAS_LENGTH = 3
+
+    def __init__(self, places: List[Place], aliases: List[List[str]]):
+        # Imported here because keywords imports snapshot, which imports this module
+        from .keywords import KeywordAutomaton
+
+        self.places = places
+        self._by_label = {}
+        for place in places:
+            self._by_label.setdefault(place.label, place)
+        # Places each alias names, in listed order; "london" is London, UK and London, Ontario
+        self._aliases: Dict[str, List[int]] = {}
+        for position, (place, extra) in enumerate(zip(places, aliases)):
+            names = [place.name, f'{place.name} {place.admin}', f'{place.name} {place.country}', *extra]
+            for name in names:
+                words = place_words(name)
+                if words.strip() and position not in self._aliases.setdefault(words, []):
+                    self._aliases[words].append(position)
+        self._automaton = KeywordAutomaton(list(self._aliases))
+
+    @classmethod
+    def load(cls, path: Path) -> 'Gazetteer':
+        places, aliases = [], []
+        with open(path, encoding='utf-8', newline='') as handle:
+            rows = csv.DictReader((line for line in handle if not line.startswith('#')), delimiter='\t')
+            for row in rows:
+                places.append(Place(
+                    row['name'], row['admin'], row['country'],
+                    float(row['latitude']), float(row['longitude']), float(row['radius_km']),
+                    row.get('code') or '',
+                ))
+                aliases.append([alias for alias in (row['aliases'] or '').split('|') if alias])
+        return cls(places, aliases)
+
+    def resolve(self, text: Optional[str]) -> Optional[Place]:
+        """The place a free-text location refers to, or None if it names none"""
+        if not text:
+            return None
+        found = self._automaton.matches(place_words(text))
+        if not found:
+            return None
+        # The longest alias each named place was found by
+        named: Dict[int, str] = {}
+        for alias in found:
+            for position in self._aliases[alias]:
+                if len(alias) > len(named.get(position, '')):
+                    named[position] = alias
+        areas = [
+            (self.places[position], len(alias.strip()) > self.WEAK_ALIAS_LENGTH)
+            for position, alias in named.items() if self.places[position].is_area
+        ]
+
+        def rank(position: int):
+            place = self.places[position]
+            others = [(area, strong) for area, strong in areas if area != place]
+            outside = sum(1 for area, strong in others if strong and not area.contains(place))
+            inside = sum(1 for area, _ in others if area.contains(place))
+            return outside, -inside, place.radius_km, -len(named[position]), position
+
+        return self.places[min(named, key=rank)]
+
+    def place(self, label: str) -> Optional[Place]:
+        """The place with the given label, as stored on members"""
+        return self._by_label.get(label)
+
+    def labels_within(self, area: Place) -> List[str]:
+        """Labels of the places an area contains, itself included"""
+        return [place.label for place in self.places if area.contains(place)]
+
+
+_gazetteer: Optional[Gazetteer] = None
+_lock = threading.Lock()
+
+
+def get_gazetteer() -> Gazetteer:
+    """The process-wide gazetteer, loaded from GAZETTEER_PATH"""
+    global _gazetteer
+    if _gazetteer is None:
+        with _lock:
+            if _gazetteer is None:
+                _gazetteer = Gazetteer.load(getattr(settings, 'GAZETTEER_PATH', None) or DEFAULT_GAZETTEER)
+    return _gazetteer
+
+
+def geocode(location: Optional[str]) -> Tuple[str, Optional[float], Optional[float]]:
+    """(place label, latitude, longitude) for a free-text location, blank when it names no known place"""
+    place = get_gazetteer().resolve(location)
+    if place is None:
+        return '', None, None
+    return place.label, place.latitude, place.longitude
+
+
+def default_radius(place: Place) -> float:
+    """Search radius for "near place" when none is given"""
+    return max(place.radius_km, getattr(settings, 'GEO_DEFAULT_RADIUS_KM', 50))
+
+
+def parse_near(near: str, radius_km: Optional[str] = None) -> Tuple[float, float, float, str]:
+    """Resolve near= and radius_km= parameters to (latitude, longitude, radius in km, area).
+
+    near is a place name or "latitude,longitude". area is the label of a
+    state or country named without a radius_km, whose members are those
+    placed in it rather than those within the radius, and blank otherwise.
+    Raises ValueError for anything that is neither, or for a radius that is
+    not a positive number.
+    """
+    coordinates = re.fullmatch(r'\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*', near)
+    if coordinates:
+        latitude, longitude = float(coordinates.group(1)), float(coordinates.group(2))
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise ValueError(f'"{near}" is not a valid latitude,longitude')
+        radius, area = getattr(settings, 'GEO_DEFAULT_RADIUS_KM', 50), ''
+    else:
+        place = get_gazetteer().resolve(near)
+        if place is None:
+            raise ValueError(f'Unknown place "{near}"')
+        latitude, longitude, radius = place.latitude, place.longitude, default_radius(place)
+        area = place.label if place.is_area and not radius_km else ''
+    if radius_km:
+        try:
+            radius = float(radius_km)
+        except ValueError:
+            raise ValueError(f'"{radius_km}" is not a number of kilometres')
+        if not 0 < radius <= 20000:
+            raise ValueError('radius_km must be between 0 and 20000')
+    return latitude, longitude, radius, area
+
+
+def haversine_km(latitude: float, longitude: float, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    """Great-circle distances from one point to many, in km"""
+    lat1, lon1 = math.radians(latitude), math.radians(longitude)
+    lat2, lon2 = np.radians(latitudes), np.radians(longitudes)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def bounding_box(latitude: float, longitude: float, radius_km: float) -> Tuple[float, float, Optional[Tuple[float, float]]]:
+    """Latitude range and longitude range (None when it wraps or spans a pole) around a circle"""
+    spread = math.degrees(radius_km / EARTH_RADIUS_KM)
+    south, north = max(latitude - spread, -90.0), min(latitude + spread, 90.0)
+    widest = max(abs(south), abs(north))
+    if widest >= 90:
+        return south, north, None
+    longitude_spread = spread / math.cos(math.radians(widest))
+    west, east = longitude - longitude_spread, longitude + longitude_spread
+    if west < -180 or east > 180:
+        return south, north, None
+    return south, north, (west, east)
+
+
+class GridIndex:
+    """Points bucketed into a latitude/longitude grid for radius queries.
+
+    Rows are sorted by cell, cells numbered row-major from the south-west
+    corner, so every grid row a circle's bounding box crosses is one run of
+    cells and one binary search. Only points in those cells have their
+    distance computed. Rows with no coordinates (NaN) are not indexed.
+    """
+
+    def __init__(self, latitudes: np.ndarray, longitudes: np.ndarray, cell_degrees: float = 0.5):
+        self.latitudes = latitudes
+        self.longitudes = longitudes
+        self.cell_degrees = cell_degrees
+        self.columns = int(math.ceil(360 / cell_degrees))
+        self.grid_rows = int(math.ceil(180 / cell_degrees))
+
+        located = np.flatnonzero(~(np.isnan(latitudes) | np.isnan(longitudes)))
+        cells = self._cells(latitudes[located], longitudes[located])
+        order = np.argsort(cells, kind='stable')
+        self.rows = located[order]
+        self.cells = cells[order]
+
+    def _cells(self, latitudes, longitudes) -> np.ndarray:
+        grid_row = np.clip(((latitudes + 90) // self.cell_degrees).astype(np.int64), 0, self.grid_rows - 1)
+        column = np.clip(((longitudes + 180) // self.cell_degrees).astype(np.int64), 0, self.columns - 1)
+        return grid_row * self.columns + column
+
+    def candidates(self, latitude: float, longitude: float, radius_km: float) -> np.ndarray:
+        """Rows in the cells covering the circle's bounding box"""
+        south, north, longitudes = bounding_box(latitude, longitude, radius_km)
+        first_row = int((south + 90) // self.cell_degrees)
+        last_row = min(int((north + 90) // self.cell_degrees), self.grid_rows - 1)
+        if longitudes is None:
+            spans = [(0, self.columns - 1)]
+        else:
+            spans = [(int((longitudes[0] + 180) // self.cell_degrees),
+                      min(int((longitudes[1] + 180) // self.cell_degrees), self.columns - 1))]
+
+        starts, ends = [], []
+        for grid_row in range(first_row, last_row + 1):
+            for west, east in spans:
+                starts.append(grid_row * self.columns + west)
+                ends.append(grid_row * self.columns + east + 1)
+        lower = np.searchsorted(self.cells, starts)
+        upper = np.searchsorted(self.cells, ends)
+        if not len(lower):
+            return self.rows[:0]
+        return np.concatenate([self.rows[start:end] for start, end in zip(lower, upper)])
+
+    def within(self, latitude: float, longitude: float, radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Rows within radius_km of the point and their distances, in row order"""
+        rows = np.sort(self.candidates(latitude, longitude, radius_km))
+        distances = haversine_km(latitude, longitude, self.latitudes[rows], self.longitudes[rows])
+        inside = distances <= radius_km
+        return rows[inside], distances[inside]
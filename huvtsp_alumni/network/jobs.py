@@ -0,0 +1,345 @@
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import hashlib
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+
+logger = logging.getLogger(__name__)
+
+# Task name -> function called with a JobContext and the job's args
+TASKS: Dict[str, Callable[..., Any]] = {}
+
+
+def task(name: str):
+    """Register a function as the job task called name"""
+    def register(function):
+        TASKS[name] = function
+        return function
+    return register
+
+
+def dedupe_key(task_name: str, args: Dict[str, Any]) -> str:
+    encoded = json.dumps([task_name, args], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def enqueue(task_name: str, priority: int = Job.PRIORITY_NORMAL, run_after=None,
+            max_attempts: int = 3, **args) -> Job:
+    """Queue a job, or return the identical job already waiting to run.
+
+    A duplicate asking for a higher priority or an earlier start moves the
+    waiting job up instead. Args must be JSON serializable.
+    """
+    if task_name not in TASKS:
+        raise ValueError(f'Unknown job task {task_name!r}')
+    key = dedupe_key(task_name, args)
+    run_after = run_after or timezone.now()
+    for _ in range(3):
+        try:
+            with transaction.atomic():
+                return Job.objects.create(
+                    task=task_name, args=args, dedupe_key=key, priority=priority,
+                    run_after=run_after, max_attempts=max_attempts,
+                )
+        except IntegrityError:
+            pass
+        pending = Job.objects.filter(dedupe_key=key, status=Job.STATUS_PENDING)
+        existing = pending.first()
+        if existing is None:
+            # Claimed by a worker in between; queue it again
+            continue
+        if priority > existing.priority:
+            pending.filter(priority__lt=priority).update(priority=priority)
+        if run_after < existing.run_after:
+            pending.filter(run_after__gt=run_after).update(run_after=run_after)
+        existing.refresh_from_db()
+        return existing
+    raise IntegrityError(f'Could not queue {task_name}')
+
+
+class JobContext:
+    """Passed to a running task to report its progress"""
+
+    PROGRESS_INTERVAL = 1.0
+
+    def __init__(self, job: Optional[Job] = None):
+        self.job = job
+        self._reported = 0.0
+
+    def progress(self, done: int, total: int, message: str = ''):
+        """Record that done of total units are finished; writes are throttled to PROGRESS_INTERVAL"""
+        if self.job is None:
+            return
+        fraction = min(done / total, 1.0) if total else 1.0
+        now = time.monotonic()
+        if fraction < 1.0 and now - self._reported < self.PROGRESS_INTERVAL:
+            return
+        self._reported = now
+        Job.objects.filter(id=self.job.id, status=Job.STATUS_RUNNING).update(
+            progress=fraction, progress_message=message[:255], heartbeat_at=timezone.now(),
+        )
+
+
+def run_inline(task_name: str, **args) -> Any:
+    """Run a task in this process without queueing it, e.g. from a management command"""
+    return TASKS[task_name](JobContext(), **args)
+
+
+class JobWorker:
+    """Claims and runs queued jobs, highest priority first.
+
+    Jobs are claimed with a conditional update, so any number of workers
+    can share the queue. A failed job is retried after an exponential
+    backoff until it has made ``max_attempts`` attempts. While a job runs
+    its heartbeat is refreshed; a running job whose heartbeat is older than
+    ``STALE_AFTER`` belonged to a worker that died and counts as failed.
+    """
+
+    CLAIM_BATCH = 10
+    RETRY_BACKOFF = 30
+    MAX_BACKOFF = 3600
+    HEARTBEAT_INTERVAL = 30
+    STALE_AFTER = 600
+
+    def __init__(self, name: Optional[str] = None):
+        self.name = name or f'{socket.gethostname()}:{os.getpid()}'
+        self.succeeded = 0
+        self.failed = 0
+
+    def claim(self) -> Optional[Job]:
+        now = timezone.now()
+        candidates = list(
+            Job.objects.filter(status=Job.STATUS_PENDING, run_after__lte=now)
+            .order_by('-priority', 'run_after', 'id').values_list('id', flat=True)[:self.CLAIM_BATCH]
+        )
+        for job_id in candidates:
+            claimed = Job.objects.filter(id=job_id, status=Job.STATUS_PENDING).update(
+                status=Job.STATUS_RUNNING, worker=self.name, attempts=F('attempts') + 1,
+                started_at=now, heartbeat_at=now, finished_at=None, progress=0, progress_message='',
+            )
+            if claimed:
+                return Job.objects.get(id=job_id)
+        return None
+
+    def run_one(self) -> Optional[Job]:
+        """Claim and run the next due job; returns it, or None if none is due"""
+        job = self.claim()
+        if job is None:
+            return None
+        self.execute(job)
+        job.refresh_from_db()
+        return job
+
+    def execute(self, job: Job):
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(job, stop), name=f'job-{job.id}-heartbeat', daemon=True)
+        heartbeat.start()
+        try:
+            function = TASKS.get(job.task)
+            if function is None:
+                raise LookupError(f'No task named {job.task!r}')
+            result = function(JobContext(job), **job.args)
+            Job.objects.filter(id=job.id, status=Job.STATUS_RUNNING, worker=job.worker).update(
+                status=Job.STATUS_SUCCEEDED, progress=1.0, result=result, finished_at=timezone.now(),
+            )
+            self.succeeded += 1
+        except Exception:
+            logger.exception('Job %s failed', job)
+            self.fail(job, traceback.format_exc())
+            self.failed += 1
+        finally:
+            stop.set()
+            heartbeat.join()
+
+    def _heartbeat(self, job: Job, stop: threading.Event):
+        try:
+            while not stop.wait(self.HEARTBEAT_INTERVAL):
+                Job.objects.filter(id=job.id, status=Job.STATUS_RUNNING, worker=job.worker).update(
+                    heartbeat_at=timezone.now()
+                )
+        finally:
+            connection.close()
+
+    def fail(self, job: Job, error: str):
+        """Retry job after a backoff, or mark it failed once it is out of attempts"""
+        now = timezone.now()
+        running = Job.objects.filter(id=job.id, status=Job.STATUS_RUNNING, worker=job.worker)
+        if job.attempts < job.max_attempts:
+            delay = min(self.RETRY_BACKOFF * 2 ** (job.attempts - 1), self.MAX_BACKOFF)
+            try:
+                with transaction.atomic():
+                    running.update(
+                        status=Job.STATUS_PENDING, last_error=error, finished_at=now,
+                        run_after=now + timedelta(seconds=delay),
+                    )
+                return
+            except IntegrityError:
+                error += '\nNot retried: an identical job is already queued'
+        running.update(status=Job.STATUS_FAILED, last_error=error, finished_at=now)
+
+    def requeue_stale(self) -> int:
+        """Fail or retry the running jobs of workers that stopped sending heartbeats"""
+        cutoff = timezone.now() - timedelta(seconds=self.STALE_AFTER)
+        stale = list(Job.objects.filter(status=Job.STATUS_RUNNING, heartbeat_at__lt=cutoff))
+        for job in stale:
+            self.fail(job, f'Worker {job.worker} stopped sending heartbeats')
+        return len(stale)
+
+    def run(self, interval: float, stop: Optional[threading.Event] = None, once: bool = False):
+        """Run jobs until stop is set, or with once until none are due"""
+        stop = stop or threading.Event()
+        last_sweep = None
+        while not stop.is_set():
+            job = None
+            try:
+                if last_sweep is None or time.monotonic() - last_sweep > self.HEARTBEAT_INTERVAL:
+                    self.requeue_stale()
+                    last_sweep = time.monotonic()
+                job = self.run_one()
+            except Exception:
+                logger.exception('Job worker %s failed; retrying', self.name)
+            finally:
+                close_old_connections()
+            if job is None:
+                if once:
+                    return
+                stop.wait(interval)
+
+
+def profile_texts(kind: str, object_ids: Optional[List[int]] = None) -> List[Tuple[int, str]]:
+    """(id, text to embed) of every 'member' or 'project' profile, or only of object_ids"""
+    from .models import NetworkMember, Project
+
+    if kind == 'member':
+        rows = NetworkMember.objects.values_list('id', 'skills', 'additional_info')
+    else:
+        rows = Project.objects.values_list('id', 'title', 'what_are_they_looking_for', 'additional_info')
+    if object_ids is not None:
+        rows = rows.filter(id__in=object_ids)
+    return [(object_id, ' '.join(str(field) for field in fields)) for object_id, *fields in rows.order_by('id')]
+
+
+@task('generate_embeddings')
+def generate_embeddings(context: JobContext) -> Dict[str, int]:
+    """Embed every member and project profile into the embedding indexes"""
+    from .ann import batch_updates, update_embeddings
+    from .query_embeddings import fetch_embedding, get_embedding_model
+
+    model = get_embedding_model()
+    members = profile_texts('member')
+    projects = profile_texts('project')
+    total = len(members) + len(projects)
+
+    # Vectors go straight into the indexes, not through model saves, so
+    # rows, change versions and caches are left alone; each index file is
+    # written once at the end
+    with batch_updates():
+        for done, (member_id, text) in enumerate(members, 1):
+            update_embeddings('member', [member_id], [fetch_embedding(text, model)])
+            context.progress(done, total, f'{done} of {len(members)} members')
+
+        for done, (project_id, text) in enumerate(projects, 1):
+            update_embeddings('project', [project_id], [fetch_embedding(text, model)])
+            context.progress(len(members) + done, total, f'{done} of {len(projects)} projects')
+    return {'members': len(members), 'projects': len(projects)}
+
+
+@task('embed_profile')
+def embed_profile(context: JobContext, kind: str, object_id: int) -> Dict[str, int]:
+    """Embed one saved member or project profile into its embedding index"""
+    from .ann import batch_updates, update_embeddings
+    from .query_embeddings import fetch_embedding, get_embedding_model
+
+    texts = profile_texts(kind, [object_id])
+    # Deleted since it was queued; the embedding-indexes consumer drops it
+    if not texts:
+        return {'embedded': 0}
+    with batch_updates():
+        update_embeddings(kind, [object_id], [fetch_embedding(texts[0][1], get_embedding_model())])
+    return {'embedded': 1}
+
+
+@task('geocode_members')
+def geocode_members(context: JobContext) -> Dict[str, int]:
+    """Resolve every member's location against the gazetteer again, e.g. after it was edited"""
+    from .geo import geocode
+    from .models import ChangeLog, NetworkMember
+
+    members = list(NetworkMember.objects.only('id', 'location', 'place', 'latitude', 'longitude'))
+    changed = []
+    for done, member in enumerate(members, 1):
+        place = geocode(member.location)
+        if (member.place, member.latitude, member.longitude) != place:
+            member.place, member.latitude, member.longitude = place
+            changed.append(member)
+        if done % 500 == 0:
+            context.progress(done, len(members), f'{done} of {len(members)} members')
+
+    # bulk_update() skips the save signals, so record the changes here
+    with transaction.atomic():
+        NetworkMember.objects.bulk_update(changed, ['place', 'latitude', 'longitude'], batch_size=500)
+        ChangeLog.objects.bulk_create(
+            ChangeLog(entity=ChangeLog.ENTITY_MEMBER, object_id=member.id, action=ChangeLog.ACTION_UPSERT)
+            for member in changed
+        )
+    return {'members': len(members), 'changed': len(changed)}
+
+
+@task('train_embedding_index')
+def train_embedding_index(context: JobContext, kind: str) -> Dict[str, int]:
+    """Recluster an embedding index and write it back"""
+    from .ann import get_embedding_index, save_embedding_index
+
+    index = get_embedding_index(kind)
+    index.train()
+    save_embedding_index(kind)
+    centroids = index.trained_centroids()
+    return {'vectors': len(index), 'lists': 0 if centroids is None else len(centroids)}
+
+
+@task('publish_search_snapshots')
+def publish_search_snapshots(context: JobContext) -> List[Dict[str, Any]]:
+    """Publish new generations of the shared search snapshots that are out of date"""
+    from .keywords import get_keyword_automaton
+    from .services import IntelligentMatchingService
+    from .snapshot import publish_stale_snapshots, shared_snapshot_dir
+
+    if shared_snapshot_dir() is None:
+        raise RuntimeError('SEARCH_SNAPSHOT_DIR is not set')
+    get_keyword_automaton(IntelligentMatchingService.QUERY_KEYWORDS)
+    return [
+        {'name': name, 'generation': generation, 'rows': rows, 'how': how, 'ms': round(elapsed, 1)}
+        for name, generation, rows, how, elapsed in publish_stale_snapshots(IntelligentMatchingService.SKILL_VOCABULARY)
+    ]
+
+
+@task('export_bundles')
+def export_bundles(context: JobContext, force: bool = False) -> Dict[str, Any]:
+    """Export the public directory bundles to BUNDLES_DIR"""
+    from .bundles import BundleExporter
+
+    summary = BundleExporter(getattr(settings, 'BUNDLES_DIR', settings.BASE_DIR / 'bundles')).export(force=force)
+    return {'rebuilt': summary['rebuilt'], 'written': summary['written']}
+
+
+@task('warm_query_embeddings')
+def warm_query_embeddings(context: JobContext, top: int = 200) -> Dict[str, Any]:
+    """Embed the most frequent historical search queries into the query embedding cache"""
+    from .query_embeddings import QueryEmbeddingCache, get_embedding_model, top_queries
+
+    cache = QueryEmbeddingCache.from_settings()
+    warmed = cache.warm(top_queries(top), model=get_embedding_model(), fetch_missing=True)
+    return {'warmed': warmed, 'embedded': cache.metrics()['misses']}
@@ -0,0 +1,144 @@
+from collections import deque
+from pathlib import Path
+from typing import Iterable, List, Optional, Set
+import threading
+
+import numpy as np
+
+from .mapped import MappedFile, write_mapped
+from .snapshot import shared_snapshot_dir
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton finding every keyword contained in a text in one pass.
+
+    Keywords are matched as UTF-8 bytes, so a hit is exactly a substring
+    match. Bytes that occur in no keyword share one input class to keep the
+    transition table small. The tables are plain numpy arrays, so the
+    automaton can be saved to and mapped from a file.
+    """
+
+    FORMAT = 1
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: List[str] = list(dict.fromkeys(keywords))
+        encoded = [keyword.encode('utf-8') for keyword in self.keywords]
+
+        used = sorted(set(b''.join(encoded)))
+        self.alphabet = np.zeros(256, dtype=np.uint16)
+        self.alphabet[used] = np.arange(1, len(used) + 1)
+        classes = len(used) + 1
+
+        # Trie of the keywords; the empty keyword is in every text and needs no state
+        children = [{}]
+        outputs: List[List[int]] = [[]]
+        for keyword_id, keyword in enumerate(encoded):
+            state = 0
+            for byte in keyword:
+                symbol = int(self.alphabet[byte])
+                following = children[state].get(symbol)
+                if following is None:
+                    following = children[state][symbol] = len(children)
+                    children.append({})
+                    outputs.append([])
+                state = following
+            outputs[state].append(keyword_id)
+
+        # Breadth-first, fill in the failure transitions so every state has
+        # a move for every input class
+        transitions = np.zeros((len(children), classes), dtype=np.int32)
+        failure = [0] * len(children)
+        queue = deque()
+        for symbol, following in children[0].items():
+            transitions[0, symbol] = following
+            queue.append(following)
+        while queue:
+            state = queue.popleft()
+            outputs[state].extend(outputs[failure[state]])
+            transitions[state] = transitions[failure[state]]
+            for symbol, following in children[state].items():
+                failure[following] = int(transitions[failure[state], symbol])
+                transitions[state, symbol] = following
+                queue.append(following)
+
+        self.transitions = transitions
+        lengths = np.array([len(found) for found in outputs], dtype=np.int64)
+        self.output_starts = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        self.output_ids = np.array([keyword_id for found in outputs for keyword_id in found], dtype=np.int32)
+        self._prepare()
+
+    def _prepare(self):
+        # Memoryviews index to plain ints far faster than numpy scalars in the byte loop
+        self._symbols = self.alphabet.tolist()
+        self._flat = memoryview(np.ascontiguousarray(self.transitions)).cast('B').cast('i')
+        self._classes = self.transitions.shape[1]
+        self._accepting = (self.output_starts[1:] > self.output_starts[:-1]).tobytes()
+        self._always = [keyword for keyword in self.keywords if not keyword]
+
+    def matches(self, text: str) -> Set[str]:
+        """The keywords that occur in text"""
+        symbols, flat, classes, accepting = self._symbols, self._flat, self._classes, self._accepting
+        state = 0
+        accepted = set()
+        for byte in text.encode('utf-8'):
+            state = flat[state * classes + symbols[byte]]
+            if accepting[state]:
+                accepted.add(state)
+
+        found = set(self._always)
+        for state in accepted:
+            for keyword_id in self.output_ids[self.output_starts[state]:self.output_starts[state + 1]]:
+                found.add(self.keywords[keyword_id])
+        return found
+
+    def save(self, path: Path):
+        write_mapped(path, {
+            'alphabet': self.alphabet,
+            'transitions': self.transitions,
+            'output_starts': self.output_starts,
+            'output_ids': self.output_ids,
+        }, {'format': self.FORMAT, 'keywords': self.keywords})
+
+    @classmethod
+    def load(cls, path: Path) -> Optional['KeywordAutomaton']:
+        """Map a saved automaton, or None if there is none in a format this code reads"""
+        try:
+            mapped = MappedFile(path)
+        except (FileNotFoundError, ValueError):
+            return None
+        if mapped.meta.get('format') != cls.FORMAT:
+            return None
+        automaton = cls.__new__(cls)
+        automaton.keywords = mapped.meta['keywords']
+        for name in ('alphabet', 'transitions', 'output_starts', 'output_ids'):
+            setattr(automaton, name, mapped.arrays[name])
+        automaton._prepare()
+        return automaton
+
+
+_automaton: Optional[KeywordAutomaton] = None
+_lock = threading.Lock()
+
+
+def get_keyword_automaton(keywords: List[str]) -> KeywordAutomaton:
+    """Return the process-wide automaton for keywords.
+
+    With ``SEARCH_SNAPSHOT_DIR`` set it is mapped from ``keywords.snap``
+    there, and written there when missing or built for other keywords.
+    """
+    global _automaton
+    keywords = list(dict.fromkeys(keywords))
+    automaton = _automaton
+    if automaton is None or automaton.keywords != keywords:
+        with _lock:
+            automaton = _automaton
+            if automaton is None or automaton.keywords != keywords:
+                directory = shared_snapshot_dir()
+                path = directory / 'keywords.snap' if directory is not None else None
+                automaton = KeywordAutomaton.load(path) if path is not None else None
+                if automaton is None or automaton.keywords != keywords:
+                    automaton = KeywordAutomaton(keywords)
+                    if path is not None:
+                        automaton.save(path)
+                _automaton = automaton
+    return automaton
@@ -0,0 +1,106 @@
+from pathlib import Path
+import statistics
+import tempfile
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from network.ann import IVFIndex, get_embedding_index, normalize
+from network.embedding_store import PRECISIONS
+
+
+class Command(BaseCommand):
+    help = 'Compare recall, latency and memory of the IVF embedding index against exact search'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--kind', choices=['member', 'project'],
+            help='Benchmark a stored embedding index instead of synthetic vectors'
+        )
+        parser.add_argument('--size', type=int, default=20000, help='Synthetic vectors to index')
+        parser.add_argument('--dim', type=int, default=256, help='Synthetic vector dimensions')
+        parser.add_argument('--queries', type=int, default=200, help='Queries to run per setting')
+        parser.add_argument('--k', type=int, default=10, help='Neighbours to retrieve')
+        parser.add_argument('--probes', default='1,2,4,8,16,32', help='Comma-separated n_probe values')
+        parser.add_argument(
+            '--precisions', default='int8,float16',
+            help=f"Comma-separated stored precisions to compare ({', '.join(PRECISIONS)})"
+        )
+        parser.add_argument('--no-rerank', action='store_true', help='Skip full-precision re-ranking')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options['seed'])
+        if options['kind']:
+            stored = get_embedding_index(options['kind'])
+            if len(stored) == 0:
+                raise CommandError(f"The {options['kind']} embedding index is empty")
+            base = stored.stored_vectors()
+            index = IVFIndex(n_lists=stored.n_lists, n_probe=stored.n_probe)
+        else:
+            base = self.synthetic_vectors(rng, options['size'], options['dim'])
+            index = IVFIndex()
+        index.add_many(range(len(base)), base)
+        if index.trained_centroids() is None:
+            index.train()
+
+        # Queries are perturbed copies of indexed vectors, like a profile's near neighbours
+        picks = rng.choice(len(base), options['queries'])
+        queries = normalize(base[picks] + rng.normal(scale=0.5 / np.sqrt(base.shape[1]), size=base[picks].shape))
+        k = options['k']
+        probes = [int(value) for value in options['probes'].split(',')]
+
+        exact_results, exact_times = self.run(index, queries, k, exact=True)
+        self.stdout.write(
+            f'{len(index)} vectors, {index.dim} dimensions, {len(index.trained_centroids())} lists, k={k}'
+        )
+        self.report('float32 exact', 1.0, exact_times)
+        self.run_probes('float32', index, queries, k, probes, exact_results)
+
+        with tempfile.TemporaryDirectory() as directory:
+            for precision in options['precisions'].split(','):
+                index.precision = precision
+                index.rerank = not options['no_rerank']
+                path = Path(directory) / f'{precision}.emb'
+                index.save(path)
+                mapped = IVFIndex.load(path)
+                mapped.rerank = index.rerank
+                store = mapped.store
+                scanned = store.codes.nbytes + (store.scales.nbytes if store.scales is not None else 0)
+                self.stdout.write(
+                    f'{precision}: {scanned / 2 ** 20:.1f} MiB scanned vectors '
+                    f'(float32 {len(index) * index.dim * 4 / 2 ** 20:.1f} MiB), '
+                    f'{path.stat().st_size / 2 ** 20:.1f} MiB file'
+                )
+                self.run_probes(precision, mapped, queries, k, probes, exact_results)
+
+    def synthetic_vectors(self, rng, size, dim):
+        """Clustered random unit vectors, shaped roughly like text embeddings"""
+        centers = rng.normal(size=(max(1, size // 1000), dim))
+        return normalize(centers[rng.integers(len(centers), size=size)] + rng.normal(scale=1.5, size=(size, dim)))
+
+    def run_probes(self, label, index, queries, k, probes, exact_results):
+        for n_probe in probes:
+            results, times = self.run(index, queries, k, n_probe=n_probe)
+            recall = statistics.fmean(
+                len(set(found) & set(expected)) / len(expected)
+                for found, expected in zip(results, exact_results)
+            )
+            self.report(f'{label} n_probe={n_probe}', recall, times)
+
+    def run(self, index, queries, k, **search_options):
+        results, times = [], []
+        for query in queries:
+            start = time.perf_counter()
+            found = index.search(query, k, **search_options)
+            times.append((time.perf_counter() - start) * 1000)
+            results.append([object_id for object_id, _ in found])
+        return results, times
+
+    def report(self, label, recall, times):
+        ordered = sorted(times)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        self.stdout.write(
+            f'{label:<22} recall@k {recall:6.3f}  median {statistics.median(ordered):7.3f} ms  p95 {p95:7.3f} ms'
+        )
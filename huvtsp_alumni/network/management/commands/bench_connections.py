@@ -0,0 +1,75 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connections
+from django.db.backends.signals import connection_created
+from django.test import Client
+
+
+class Command(BaseCommand):
+    help = 'Measure per-request latency with fresh, persistent and pooled database connections'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/api/resources/', help='Endpoint to request')
+        parser.add_argument('--requests', type=int, default=200, help='Requests to time per mode')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Database alias to vary')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        settings_dict = connection.settings_dict
+        original = {'CONN_MAX_AGE': settings_dict.get('CONN_MAX_AGE', 0), 'OPTIONS': settings_dict.get('OPTIONS', {})}
+        unpooled = {key: value for key, value in original['OPTIONS'].items() if key != 'pool'}
+
+        modes = [
+            ('fresh connections', {'CONN_MAX_AGE': 0, 'OPTIONS': unpooled}),
+            ('persistent', {'CONN_MAX_AGE': original['CONN_MAX_AGE'] or 600, 'OPTIONS': unpooled}),
+        ]
+        if original['OPTIONS'].get('pool'):
+            modes.append(('pooled', original))
+
+        host = next((host.lstrip('.') for host in settings.ALLOWED_HOSTS if host != '*'), 'localhost')
+        client = Client(HTTP_HOST=host)
+        try:
+            for label, mode in modes:
+                connection.close()
+                settings_dict.update(mode)
+                self.report(label, *self.run(client, connection, options['path'], options['requests']))
+        finally:
+            connection.close()
+            settings_dict.update(original)
+
+    def run(self, client, connection, path, count):
+        opened = []
+
+        def on_created(sender, connection, **kwargs):
+            opened.append(connection.alias)
+
+        # Warm up URL resolution, imports and caches outside the timings
+        client.get(path)
+        close_old_connections()
+
+        timings = []
+        connection_created.connect(on_created)
+        try:
+            for _ in range(count):
+                start = time.perf_counter()
+                response = client.get(path)
+                # The test client skips Django's end-of-request connection handling
+                close_old_connections()
+                timings.append((time.perf_counter() - start) * 1000)
+                if response.status_code >= 400:
+                    raise CommandError(f'{path} returned {response.status_code}')
+        finally:
+            connection_created.disconnect(on_created)
+        return timings, opened.count(connection.alias)
+
+    def report(self, label, timings, opened):
+        ordered = sorted(timings)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        self.stdout.write(
+            f'{label:<18} median {statistics.median(ordered):7.2f} ms  '
+            f'p95 {p95:7.2f} ms  mean {statistics.fmean(ordered):7.2f} ms  '
+            f'connections opened {opened}'
+        )
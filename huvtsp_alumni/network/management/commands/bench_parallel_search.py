@@ -0,0 +1,87 @@
+from pathlib import Path
+import os
+import statistics
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from network.models import NetworkMember
+from network.parallel import ShardedScorer
+from network.services import IntelligentMatchingService
+from network.snapshot import MemberSnapshot, attach_snapshot, publish_snapshot
+
+
+class Command(BaseCommand):
+    help = 'Measure member search latency scored in one process and in parallel shards, over a synthetic corpus'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=200000, help='Members in the synthetic snapshot')
+        parser.add_argument('--workers', default='1,2,4,8', help='Comma separated shard counts to time')
+        parser.add_argument('--modes', default='thread,process', help='Comma separated pool kinds to time')
+        parser.add_argument('--query', default='anyone in boston who knows python?', help='Search to time')
+        parser.add_argument('--limit', type=int, default=20, help='Matches each search returns')
+        parser.add_argument('--repeat', type=int, default=10, help='Searches to time per setting')
+
+    def handle(self, *args, **options):
+        if not NetworkMember.objects.exists():
+            raise CommandError('There are no members to replicate')
+        try:
+            workers = [int(count) for count in options['workers'].split(',')]
+            modes = options['modes'].split(',')
+        except ValueError:
+            raise CommandError('--workers must be comma separated numbers')
+        for mode in modes:
+            if mode not in ShardedScorer.MODES:
+                raise CommandError(f'Unknown mode {mode!r}; choose from {", ".join(ShardedScorer.MODES)}')
+
+        # Pool processes map the snapshot from a shared directory, as they would in production
+        with tempfile.TemporaryDirectory() as directory, override_settings(SEARCH_SNAPSHOT_DIR=directory):
+            self.run_modes(options, workers, modes, Path(directory))
+
+    def run_modes(self, options, workers, modes, directory):
+        publish_snapshot(directory, 'members', self.build(options['rows']))
+        snapshot = MemberSnapshot.attach(attach_snapshot(directory, 'members'))
+        service = IntelligentMatchingService()
+        processed_query = service.process_query(options['query'])
+        limit, repeat = options['limit'], options['repeat']
+        self.stdout.write(f'{len(snapshot)} members, {os.cpu_count()} CPUs, query "{options["query"]}"')
+
+        baseline = self.time(repeat, lambda: service.score_member_rows(snapshot, processed_query, None, limit))
+        self.report('in-process', 1, baseline, baseline)
+        for mode in modes:
+            for count in workers:
+                if count < 2:
+                    continue
+                scorer = ShardedScorer(count, mode, min_rows=0, timeout=600)
+                try:
+                    # The first search starts the pool
+                    scorer.score_members(snapshot, processed_query, None, limit)
+                    timings = self.time(repeat, lambda: scorer.score_members(snapshot, processed_query, None, limit))
+                finally:
+                    scorer.close()
+                self.report(mode, count, timings, baseline)
+                if scorer.fallbacks:
+                    self.stdout.write(f'  {scorer.fallbacks} searches were scored in-process instead')
+
+    def build(self, size):
+        """A member snapshot of the stored members repeated under new ids up to size rows"""
+        rows, watermark = MemberSnapshot.read_rows()
+        replicated = [(position + 1, *rows[position % len(rows)][1:]) for position in range(size)]
+        return MemberSnapshot(replicated, IntelligentMatchingService.SKILL_VOCABULARY, 0, watermark)
+
+    def time(self, repeat, search):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            search()
+            timings.append((time.perf_counter() - start) * 1000)
+        return timings
+
+    def report(self, label, workers, timings, baseline):
+        median = statistics.median(timings)
+        self.stdout.write(
+            f'{label:<10} {workers:>2} workers  median {median:8.2f} ms  max {max(timings):8.2f} ms  '
+            f'speedup {statistics.median(baseline) / median:5.2f}x'
+        )
@@ -0,0 +1,88 @@
+from pathlib import Path
+import statistics
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from network import keywords, snapshot
+from network.models import ChangeLog, NetworkMember, Project
+from network.services import IntelligentMatchingService
+from network.snapshot import MemberSnapshot, ProjectSnapshot, publish_snapshot
+from network.versions import get_version
+
+
+class Command(BaseCommand):
+    help = 'Measure how long a fresh worker takes to get its search indexes ready, with and without snapshots'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5, help='Cold starts to time per mode')
+        parser.add_argument(
+            '--replay', type=int, default=100,
+            help='Recent change log entries a stale snapshot replays in the replay mode'
+        )
+        parser.add_argument('--query', default='anyone in boston who knows python?', help='First search to time')
+
+    def handle(self, *args, **options):
+        if not NetworkMember.objects.exists():
+            raise CommandError('There are no members to index')
+        self.query = options['query']
+        repeat = options['repeat']
+
+        self.stdout.write(f'{NetworkMember.objects.count()} members, {Project.objects.count()} projects')
+        with override_settings(SEARCH_SNAPSHOT_DIR=None):
+            self.report('build from database', self.run(repeat, lambda: None))
+
+        with tempfile.TemporaryDirectory() as directory, override_settings(SEARCH_SNAPSHOT_DIR=directory):
+            directory = Path(directory)
+            self.publish(directory)
+            self.report('map snapshot', self.run(repeat, lambda: None))
+
+            # Snapshots written a few changes ago, as after a deploy
+            older = ChangeLog.objects.order_by('-id').values_list('id', flat=True)[options['replay']:options['replay'] + 1]
+            watermark = next(iter(older), 0)
+            self.report(
+                f"map + replay {options['replay']} changes",
+                self.run(repeat, lambda: self.publish(directory, watermark=watermark, version=0)),
+            )
+
+    def publish(self, directory, watermark=None, version=None):
+        """Publish fresh snapshots, or ones tagged as older than they are"""
+        for name, built in (
+            ('members', MemberSnapshot.build(IntelligentMatchingService.SKILL_VOCABULARY, get_version(NetworkMember))),
+            ('projects', ProjectSnapshot.build(get_version(Project))),
+        ):
+            if watermark is not None:
+                built.watermark = watermark
+            if version is not None:
+                built.version = version
+            publish_snapshot(directory, name, built)
+        keywords.get_keyword_automaton(IntelligentMatchingService.QUERY_KEYWORDS)
+
+    def run(self, repeat, prepare):
+        ready, first = [], []
+        for _ in range(repeat):
+            prepare()
+            # What a newly started worker holds
+            snapshot._member_snapshot = snapshot._project_snapshot = None
+            keywords._automaton = None
+
+            start = time.perf_counter()
+            IntelligentMatchingService.warm_indexes()
+            ready.append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            service = IntelligentMatchingService()
+            processed_query = service.process_query(self.query)
+            service.score_members(processed_query)
+            service.score_projects(processed_query)
+            first.append((time.perf_counter() - start) * 1000)
+        return ready, first
+
+    def report(self, label, timings):
+        ready, first = timings
+        self.stdout.write(
+            f'{label:<28} ready median {statistics.median(ready):8.2f} ms  max {max(ready):8.2f} ms  '
+            f'first search {statistics.median(first):7.2f} ms'
+        )
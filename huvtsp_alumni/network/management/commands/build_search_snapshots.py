@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from network.keywords import get_keyword_automaton
+from network.services import IntelligentMatchingService
+from network.snapshot import publish_stale_snapshots, shared_snapshot_dir
+
+
+class Command(BaseCommand):
+    help = 'Build the member and project search snapshots into SEARCH_SNAPSHOT_DIR for workers to map'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--watch', type=float, metavar='SECONDS',
+            help='Keep running, publishing a new generation whenever the data changes'
+        )
+
+    def handle(self, *args, **options):
+        if shared_snapshot_dir() is None:
+            raise CommandError('SEARCH_SNAPSHOT_DIR is not set')
+        get_keyword_automaton(IntelligentMatchingService.QUERY_KEYWORDS)
+
+        while True:
+            for name, generation, rows, how, elapsed in publish_stale_snapshots(
+                IntelligentMatchingService.SKILL_VOCABULARY
+            ):
+                self.stdout.write(self.style.SUCCESS(
+                    f'{name}: generation {generation}, {rows} rows, {how} ({elapsed:.0f} ms)'
+                ))
+            if not options['watch']:
+                return
+            time.sleep(options['watch'])
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from network.outbox import DURABLE_CONSUMERS, OutboxConsumer
+
+
+class Command(BaseCommand):
+    help = 'Apply the change log outbox to derived state with a durable checkpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument('consumer', choices=sorted(DURABLE_CONSUMERS), help='Consumer to run')
+        parser.add_argument('--interval', type=float, default=1.0, help='Seconds between polls when caught up')
+        parser.add_argument('--once', action='store_true', help='Apply the current backlog and exit')
+
+    def handle(self, *args, **options):
+        consumer = OutboxConsumer(options['consumer'], DURABLE_CONSUMERS[options['consumer']], durable=True)
+        start = consumer.position
+        if not options['once']:
+            self.stdout.write(f"{consumer.name}: resuming after #{start}")
+            consumer.run(options['interval'])
+            return
+
+        try:
+            while consumer.poll() == consumer.BATCH_SIZE:
+                pass
+        except Exception as error:
+            raise CommandError(f'{consumer.name} stopped at #{consumer.position}: {error}')
+        self.stdout.write(self.style.SUCCESS(
+            f"{consumer.name}: applied {consumer.applied} entries, checkpoint #{start} -> #{consumer.position}"
+        ))
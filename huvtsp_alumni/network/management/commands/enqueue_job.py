@@ -0,0 +1,33 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from network.jobs import TASKS, enqueue
+from network.models import Job
+
+
+class Command(BaseCommand):
+    help = 'Queue a background job for run_jobs workers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('task', choices=sorted(TASKS), help='Task to run')
+        parser.add_argument(
+            'arguments', nargs='*', metavar='NAME=VALUE',
+            help='Task arguments; values are read as JSON, falling back to plain strings'
+        )
+        parser.add_argument('--priority', type=int, default=Job.PRIORITY_NORMAL, help='Higher runs first')
+        parser.add_argument('--max-attempts', type=int, default=3, help='Attempts before the job is marked failed')
+
+    def handle(self, *args, **options):
+        task_args = {}
+        for argument in options['arguments']:
+            name, separator, value = argument.partition('=')
+            if not separator:
+                raise CommandError(f'Expected NAME=VALUE, got {argument!r}')
+            try:
+                task_args[name] = json.loads(value)
+            except ValueError:
+                task_args[name] = value
+
+        job = enqueue(options['task'], priority=options['priority'], max_attempts=options['max_attempts'], **task_args)
+        self.stdout.write(self.style.SUCCESS(f'Queued {job}'))
@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from network.bundles import BundleExporter
+
+
+class Command(BaseCommand):
+    help = 'Export the public directory as precompressed, content-hashed static JSON bundles'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', default=getattr(settings, 'BUNDLES_DIR', settings.BASE_DIR / 'bundles'),
+            help='Directory to write the bundles to'
+        )
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Rebuild even if nothing changed since the last export'
+        )
+
+    def handle(self, *args, **options):
+        summary = BundleExporter(options['output']).export(force=options['force'])
+
+        if not summary['rebuilt']:
+            self.stdout.write('Bundles are up to date.')
+            return
+
+        for filename in summary['written']:
+            self.stdout.write(f'Wrote {filename}')
+        self.stdout.write(self.style.SUCCESS(
+            f"Exported {len(summary['manifest']['bundles'])} bundles "
+            f"({len(summary['written'])} changed) to {options['output']}"
+        ))
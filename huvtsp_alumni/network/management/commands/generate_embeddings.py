@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from network.jobs import enqueue, run_inline
+
+
+class Command(BaseCommand):
+    help = 'Generate and store embeddings for all profiles'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--background', action='store_true',
+            help='Queue the work for run_jobs workers instead of running it here'
+        )
+
+    def handle(self, *args, **options):
+        if options['background']:
+            job = enqueue('generate_embeddings')
+            self.stdout.write(self.style.SUCCESS(f'Queued {job}'))
+            return
+
+        embedded = run_inline('generate_embeddings')
+        self.stdout.write(self.style.SUCCESS(
+            f"Embedded {embedded['members']} members and {embedded['projects']} projects"
+        ))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from network.jobs import enqueue, run_inline
+
+
+class Command(BaseCommand):
+    help = "Resolve every member's location against the gazetteer again"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--background', action='store_true',
+            help='Queue the work for run_jobs workers instead of running it here'
+        )
+
+    def handle(self, *args, **options):
+        if options['background']:
+            job = enqueue('geocode_members')
+            self.stdout.write(self.style.SUCCESS(f'Queued {job}'))
+            return
+
+        summary = run_inline('geocode_members')
+        self.stdout.write(self.style.SUCCESS(
+            f"Geocoded {summary['members']} members, {summary['changed']} changed"
+        ))
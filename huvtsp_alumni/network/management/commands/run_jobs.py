@@ -0,0 +1,53 @@
+import multiprocessing
+import signal
+import socket
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from network.jobs import JobWorker
+
+
+def work(name, interval, once):
+    stop = threading.Event()
+    # Finish the job in hand on SIGTERM rather than dying mid-way
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    worker = JobWorker(name)
+    worker.run(interval, stop=stop, once=once)
+    return worker
+
+
+class Command(BaseCommand):
+    help = 'Run background jobs from the job queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=1, help='Worker processes to run')
+        parser.add_argument('--interval', type=float, default=1.0, help='Seconds between polls when no job is due')
+        parser.add_argument('--once', action='store_true', help='Run the jobs that are due, then exit')
+
+    def handle(self, *args, **options):
+        interval, once = options['interval'], options['once']
+        if options['workers'] <= 1:
+            worker = work(None, interval, once)
+            self.stdout.write(f'{worker.name}: {worker.succeeded} jobs succeeded, {worker.failed} failed')
+            return
+
+        # Children must not share the parent's database connections
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        processes = [
+            context.Process(target=work, args=(f'{socket.gethostname()}:{number}', interval, once), daemon=False)
+            for number in range(options['workers'])
+        ]
+        for process in processes:
+            process.start()
+        self.stdout.write(f"Started {len(processes)} job workers")
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                process.join()
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from network.query_embeddings import QueryEmbeddingCache, get_embedding_model, top_queries
+
+
+class Command(BaseCommand):
+    help = 'Embed the most frequent historical search queries into the on-disk query embedding cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=200, help='Number of most frequent queries to embed')
+
+    def handle(self, *args, **options):
+        cache = QueryEmbeddingCache.from_settings()
+        queries = top_queries(options['top'])
+        warmed = cache.warm(queries, model=get_embedding_model(), fetch_missing=True)
+        metrics = cache.metrics()
+        self.stdout.write(self.style.SUCCESS(
+            f"{warmed} query embeddings cached: {warmed - metrics['misses']} already on disk, "
+            f"{metrics['misses']} embedded ({metrics['avg_remote_ms']} ms each)"
+        ))
@@ -0,0 +1,76 @@
+from pathlib import Path
+from typing import Any, Dict
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+
+
+MAGIC = b'HVMAP\x00\x01\x00'
+ALIGNMENT = 64
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def write_mapped(path: Path, arrays: Dict[str, np.ndarray], meta: Dict[str, Any]):
+    """Write named arrays and JSON metadata to one file, atomically replacing path.
+
+    The file is the magic, the header length, a JSON header describing
+    each array, then the arrays' bytes, each aligned to ``ALIGNMENT``.
+    """
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+    specs, offset = {}, 0
+    for name, array in arrays.items():
+        specs[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset, 'nbytes': array.nbytes}
+        offset = _aligned(offset + array.nbytes)
+    header = json.dumps({'meta': meta, 'sections': specs}).encode('utf-8')
+    data_start = _aligned(len(MAGIC) + 8 + len(header))
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    with open(temporary, 'wb') as handle:
+        handle.write(MAGIC + struct.pack('<Q', len(header)) + header)
+        for name, array in arrays.items():
+            handle.seek(data_start + specs[name]['offset'])
+            handle.write(array.tobytes())
+        handle.truncate(data_start + offset)
+    os.replace(temporary, path)
+
+
+class MappedFile:
+    """A file written by ``write_mapped``, mapped read-only.
+
+    ``arrays`` are zero-copy views onto the map, so the pages are shared
+    through the page cache by every process that maps the file.
+    ``buffer`` is the map itself and ``offsets`` give each array's absolute
+    position in it, for byte-level searches over text sections.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as handle:
+            if handle.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f'{path} is not a mapped array file')
+            (length,) = struct.unpack('<Q', handle.read(8))
+            header = json.loads(handle.read(length))
+            self.buffer = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        data_start = _aligned(len(MAGIC) + 8 + length)
+
+        self.meta: Dict[str, Any] = header['meta']
+        self.offsets: Dict[str, int] = {}
+        self.arrays: Dict[str, np.ndarray] = {}
+        for name, spec in header['sections'].items():
+            offset = data_start + spec['offset']
+            self.offsets[name] = offset
+            if spec['nbytes'] == 0:
+                self.arrays[name] = np.empty(spec['shape'], dtype=spec['dtype'])
+                continue
+            dtype = np.dtype(spec['dtype'])
+            self.arrays[name] = np.frombuffer(
+                self.buffer, dtype=dtype, count=spec['nbytes'] // dtype.itemsize, offset=offset
+            ).reshape(spec['shape'])
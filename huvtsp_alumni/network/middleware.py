@@ -0,0 +1,47 @@
+from django.conf import settings
+
+from .routers import get_replica_alias, reset_read_database, set_read_database, written_recently
+
+
+class ReplicaRoutingMiddleware:
+    """Let safe API requests read from the replica.
+
+    GET and HEAD requests under ``REPLICA_ROUTED_PATHS`` read from the
+    replica unless the client recently wrote (a pin cookie set on its
+    successful writes keeps it on the primary for ``REPLICA_PIN_SECONDS``,
+    so it reads its own writes) or anyone changed directory data within
+    the replica lag. Streamed response bodies are generated after this
+    middleware returns and read from the primary.
+    """
+
+    PIN_COOKIE = 'replica_pin'
+    SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = set_read_database(self.read_database(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            reset_read_database(token)
+
+        if request.method not in self.SAFE_METHODS and response.status_code < 400 and get_replica_alias():
+            response.set_cookie(
+                self.PIN_COOKIE, '1', max_age=getattr(settings, 'REPLICA_PIN_SECONDS', 15),
+                httponly=True, samesite='Lax'
+            )
+        return response
+
+    def read_database(self, request):
+        replica = get_replica_alias()
+        if (
+            replica is None
+            or request.method not in ('GET', 'HEAD')
+            or not request.path.startswith(tuple(getattr(settings, 'REPLICA_ROUTED_PATHS', ('/api/',))))
+            or self.PIN_COOKIE in request.COOKIES
+            or written_recently()
+        ):
+            return None
+        return replica
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:23
+
+from django.db import migrations, models
+
+
+def seed_change_log(apps, schema_editor):
+    """Record every existing row, so syncing from cursor 0 returns the whole directory"""
+    ChangeLog = apps.get_model('network', 'ChangeLog')
+    for model_name, entity in [
+        ('NetworkMember', 'members'),
+        ('Experience', 'experiences'),
+        ('SocialLink', 'social_links'),
+        ('Project', 'projects'),
+        ('Organization', 'organizations'),
+    ]:
+        model = apps.get_model('network', model_name)
+        ChangeLog.objects.bulk_create(
+            ChangeLog(entity=entity, object_id=object_id, action='upsert')
+            for object_id in model.objects.order_by('id').values_list('id', flat=True)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('network', '0004_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entity', models.CharField(choices=[('members', 'Network Member'), ('experiences', 'Experience'), ('social_links', 'Social Link'), ('projects', 'Project'), ('organizations', 'Organization')], max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('action', models.CharField(choices=[('upsert', 'Created or updated'), ('delete', 'Deleted')], max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.RunPython(seed_change_log, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('network', '0007_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='networkmember',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='networkmember',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='networkmember',
+            name='place',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+    ]
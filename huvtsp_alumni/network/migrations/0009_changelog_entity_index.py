@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('network', '0008_member_place'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='changelog',
+            name='entity',
+            field=models.CharField(choices=[('members', 'Network Member'), ('experiences', 'Experience'), ('social_links', 'Social Link'), ('projects', 'Project'), ('organizations', 'Organization'), ('project_links', 'Project Link'), ('resources', 'Resource')], max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='changelog',
+            index=models.Index(fields=['entity', 'id'], name='network_changelog_entity_idx'),
+        ),
+    ]
@@ -1,8 +1,22 @@
-from django.db import models
+from django.db import models, router, transaction
+from django.utils import timezone
 from django.utils.text import slugify
 import uuid
 
-class NetworkMember(models.Model):
+
+class OutboxMixin:
+    """Saves in a transaction, so the change log entry written by post_save commits or rolls back with the row.
+
+    Deletes already send post_delete inside the deletion's transaction.
+    """
+
+    def save(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+
+
+class NetworkMember(OutboxMixin, models.Model):
     REGION_NORTH_AMERICA = "NA"
     REGION_SOUTH_AMERICA = "SA"
     REGION_EUROPE = "EU"
@@ -25,6 +39,10 @@ class NetworkMember(models.Model):
     last_name = models.CharField(max_length=100)
     region = models.CharField(max_length=200, choices=REGIONS)
     location = models.CharField(max_length=255, blank=True, null=True) # exact city/country
+    # Gazetteer place the location resolves to, set on save
+    place = models.CharField(max_length=255, blank=True)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
     session = models.CharField(max_length=200)
     pod = models.CharField(max_length=200)
     internship = models.CharField(max_length=200)
@@ -33,6 +51,7 @@ class NetworkMember(models.Model):
     additional_info = models.TextField(null=True, blank=True)
     avatar = models.ImageField(upload_to="avatars", null=True, blank=True)
     slug = models.SlugField(unique=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.first_name} {self.last_name} - {self.pod}"
@@ -49,7 +68,7 @@ class NetworkMember(models.Model):
         super().save(*args, **kwargs)
 
 # this helps in queries like "Is anyone in FinTech Nexus"
-class Organization(models.Model):    
+class Organization(OutboxMixin, models.Model):    
     ORGANIZATION_TYPE_COMPANY = "CO"
     ORGANIZATION_TYPE_EVENT = "EV"
     ORGANIZATION_TYPE_COMMUNITY = "CM"
@@ -75,6 +94,7 @@ class Organization(models.Model):
     type = models.CharField(max_length=2, choices=ORGANIZATION_TYPES, null=True, blank=True)
     description = models.TextField(blank=True, null=True, help_text="Brief description of the organization, its mission, or purpose.")
     website = models.URLField(max_length=2083, blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
@@ -83,7 +103,7 @@ class Organization(models.Model):
         ordering = ['name']
 
 
-class Experience(models.Model):  
+class Experience(OutboxMixin, models.Model):  
     EXPERIENCE_TYPE_EMPLOYMENT = "EM"
     EXPERIENCE_TYPE_INTERNSHIP = "IN"
     EXPERIENCE_TYPE_VOLUNTEER = "VO"
@@ -127,6 +147,7 @@ class Experience(models.Model):
     end_date = models.DateField(null=True, blank=True)
     is_current = models.BooleanField(default=False)
     description = models.TextField(blank=True, null=True, help_text="Describe your responsibilities, achievements, or what you learned/contributed.")
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.network_member.first_name} {self.network_member.last_name}'s experience at {self.organization.name} as {self.title or 'N/A'}"
@@ -135,7 +156,7 @@ class Experience(models.Model):
         ordering = ['-start_date', '-id'] # Order by newest experience first
 
 
-class SocialLink(models.Model):
+class SocialLink(OutboxMixin, models.Model):
     title = models.CharField(max_length=100, null=True, blank=True)
     link = models.URLField(max_length=2083)
     description = models.TextField(null=True, blank=True)
@@ -143,7 +164,7 @@ class SocialLink(models.Model):
     network_member = models.ForeignKey(NetworkMember, on_delete=models.CASCADE, related_name="social_links")
 
 
-class Project(models.Model):
+class Project(OutboxMixin, models.Model):
     PROJECT_STARTUP = "ST"
     PROJECT_NON_PROFIT = "NP"
 
@@ -172,22 +193,24 @@ class Project(models.Model):
     what_are_they_looking_for = models.TextField(null=True, blank=True)
     additional_info = models.TextField(null=True, blank=True)
     slug = models.SlugField(unique=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     
 
-class ProjectLink(models.Model):
+class ProjectLink(OutboxMixin, models.Model):
     title = models.CharField(max_length=100, null=True, blank=True)
     link = models.URLField(max_length=2083)
     platform = models.CharField(max_length=200, null=True, blank=True) # indicate if it's LinkedIn, website, etc.
     project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name="project_links")
 
 
-class Resources(models.Model):
+class Resources(OutboxMixin, models.Model):
     title = models.CharField(max_length=100, null=True, blank=True)
     slug = models.SlugField(unique=True)
     link = models.URLField(max_length=2083)
     platform = models.CharField(max_length=200, null=True, blank=True) # indicate if it's YC, blog, etc.
     description = models.TextField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
 
 class SearchTracking(models.Model):
@@ -213,4 +236,120 @@ class SearchTracking(models.Model):
         return f"{self.search_type} search at {self.created_at}"
 
 
+class ChangeLog(models.Model):
+    """Append-only log of directory changes, read by the delta-sync change feed.
+
+    It is also the transactional outbox for derived state: entries are
+    written in the same transaction as the change, and outbox consumers
+    apply them in id order.
+    """
+    ACTION_UPSERT = "upsert"
+    ACTION_DELETE = "delete"
+
+    ACTIONS = [
+        (ACTION_UPSERT, "Created or updated"),
+        (ACTION_DELETE, "Deleted"),
+    ]
+
+    ENTITY_MEMBER = "members"
+    ENTITY_EXPERIENCE = "experiences"
+    ENTITY_SOCIAL_LINK = "social_links"
+    ENTITY_PROJECT = "projects"
+    ENTITY_ORGANIZATION = "organizations"
+    # Logged only for change versions; not part of the change feed
+    ENTITY_PROJECT_LINK = "project_links"
+    ENTITY_RESOURCE = "resources"
+
+    ENTITIES = [
+        (ENTITY_MEMBER, "Network Member"),
+        (ENTITY_EXPERIENCE, "Experience"),
+        (ENTITY_SOCIAL_LINK, "Social Link"),
+        (ENTITY_PROJECT, "Project"),
+        (ENTITY_ORGANIZATION, "Organization"),
+        (ENTITY_PROJECT_LINK, "Project Link"),
+        (ENTITY_RESOURCE, "Resource"),
+    ]
+
+    entity = models.CharField(max_length=20, choices=ENTITIES)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=10, choices=ACTIONS)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            # The newest entries of an entity, read for its change version
+            models.Index(fields=['entity', 'id'], name='network_changelog_entity_idx'),
+        ]
 
+    def __str__(self):
+        return f"{self.action} {self.entity} #{self.object_id}"
+
+
+class OutboxCheckpoint(models.Model):
+    """How far a durable outbox consumer has applied the change log"""
+    name = models.CharField(max_length=100, unique=True)
+    position = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} at #{self.position}"
+
+
+class Job(models.Model):
+    """Background work queued for run_jobs workers, highest priority first"""
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_SUCCEEDED = "succeeded"
+    STATUS_FAILED = "failed"
+
+    STATUSES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_SUCCEEDED, "Succeeded"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    PRIORITY_LOW = 0
+    PRIORITY_NORMAL = 50
+    PRIORITY_HIGH = 100
+
+    task = models.CharField(max_length=100)
+    args = models.JSONField(default=dict, blank=True)
+    # Identifies the task and args, so an identical job is only queued once
+    dedupe_key = models.CharField(max_length=64)
+    priority = models.IntegerField(default=PRIORITY_NORMAL)
+    status = models.CharField(max_length=10, choices=STATUSES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField()
+    progress = models.FloatField(default=0)
+    progress_message = models.CharField(max_length=255, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', '-priority', 'run_after'], name='network_job_claim_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['dedupe_key'], condition=models.Q(status="pending"), name='network_job_pending_dedupe',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.task} #{self.id} ({self.status})"
+
+    @property
+    def duration(self):
+        """How long the last attempt ran, or has been running"""
+        if self.started_at is None:
+            return None
+        return (self.finished_at or timezone.now()) - self.started_at
@@ -0,0 +1,206 @@
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from .models import ChangeLog, OutboxCheckpoint
+from .snapshot import GAP_TIMEOUT, latest_change, publish_stale_snapshots, refresh_snapshots, shared_snapshot_dir
+from .typeahead import get_typeahead_index
+
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxChanges:
+    """The net effect of a run of change log entries, by entity"""
+
+    def __init__(self, entries: Iterable[Tuple[int, str, str, int]]):
+        # Only the last change to each row matters
+        latest: Dict[Tuple[str, int], str] = {}
+        for _, entity, action, object_id in entries:
+            latest[(entity, object_id)] = action
+        self.upserted: Dict[str, Set[int]] = {}
+        self.deleted: Dict[str, Set[int]] = {}
+        for (entity, object_id), action in latest.items():
+            rows = self.deleted if action == ChangeLog.ACTION_DELETE else self.upserted
+            rows.setdefault(entity, set()).add(object_id)
+
+    @property
+    def entities(self) -> Set[str]:
+        return set(self.upserted) | set(self.deleted)
+
+
+Handler = Callable[[OutboxChanges], None]
+
+
+class OutboxConsumer:
+    """Applies change log entries to derived state in id order, checkpointing how far it got.
+
+    ``position`` is the id up to which every entry has been applied. Ids
+    are taken when a transaction inserts its entry, not when it commits,
+    so a lower id can become visible after a higher one. Entries past such
+    a gap are applied straight away, but the checkpoint stays before the
+    gap until it fills or has been open for ``GAP_TIMEOUT`` seconds (a
+    rolled back transaction leaves a gap for good). Entries can therefore
+    be applied more than once, and handlers must be idempotent.
+
+    A durable consumer keeps its checkpoint in ``OutboxCheckpoint`` and
+    resumes from it after a restart. Otherwise the checkpoint lives in
+    memory and starts at the newest entry, for state that is built from
+    current data when the process starts.
+    """
+
+    BATCH_SIZE = 500
+    GAP_TIMEOUT = GAP_TIMEOUT
+
+    def __init__(self, name: str, handler: Handler, durable: bool = False):
+        self.name = name
+        self.handler = handler
+        self.durable = durable
+        if durable:
+            self.position = OutboxCheckpoint.objects.get_or_create(name=name)[0].position
+        else:
+            self.position = latest_change()
+        self.applied = 0
+        self.last_poll: Optional[float] = None
+        self._gap_since: Optional[float] = None
+
+    def poll(self) -> int:
+        """Apply the entries after the checkpoint, up to BATCH_SIZE; returns how many were read"""
+        entries = list(
+            ChangeLog.objects.filter(id__gt=self.position).order_by('id')
+            .values_list('id', 'entity', 'action', 'object_id')[:self.BATCH_SIZE]
+        )
+        self.last_poll = time.time()
+        if not entries:
+            return 0
+        self.handler(OutboxChanges(entries))
+        self.applied += len(entries)
+        self._advance([entry[0] for entry in entries])
+        return len(entries)
+
+    def _advance(self, ids: List[int]):
+        contiguous = self.position
+        for entry_id in ids:
+            if entry_id != contiguous + 1:
+                break
+            contiguous = entry_id
+
+        position = ids[-1]
+        if contiguous != ids[-1]:
+            now = time.monotonic()
+            if self._gap_since is None:
+                self._gap_since = now
+            if now - self._gap_since < self.GAP_TIMEOUT:
+                position = contiguous
+        if position == ids[-1]:
+            self._gap_since = None
+
+        if position != self.position:
+            self.position = position
+            if self.durable:
+                OutboxCheckpoint.objects.filter(name=self.name).update(position=position)
+
+    def run(self, interval: float, stop: Optional[threading.Event] = None):
+        """Poll until stop is set, without pausing while there is a backlog"""
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            read = 0
+            try:
+                read = self.poll()
+            except Exception:
+                logger.exception('Outbox consumer %s failed; retrying', self.name)
+            finally:
+                close_old_connections()
+            if read < self.BATCH_SIZE:
+                stop.wait(interval)
+
+    def metrics(self) -> Dict:
+        latest = latest_change()
+        return {
+            'name': self.name,
+            'position': self.position,
+            'latest': latest,
+            'lag': max(latest - self.position, 0),
+            'applied': self.applied,
+            'last_poll': self.last_poll,
+        }
+
+
+def apply_to_worker(changes: OutboxChanges):
+    """Bring this process's derived state up to date with changes made by any process"""
+    refresh_snapshots(changes.entities)
+    if changes.entities & {ChangeLog.ENTITY_MEMBER, ChangeLog.ENTITY_ORGANIZATION}:
+        get_typeahead_index().invalidate()
+
+
+def publish_snapshots(changes: OutboxChanges):
+    """Publish new shared search snapshots when members or projects change"""
+    from .services import IntelligentMatchingService
+
+    if shared_snapshot_dir() is not None and changes.entities & {ChangeLog.ENTITY_MEMBER, ChangeLog.ENTITY_PROJECT}:
+        publish_stale_snapshots(IntelligentMatchingService.SKILL_VOCABULARY)
+
+
+# Embedding index kinds, by change log entity
+EMBEDDING_INDEX_KINDS = {
+    ChangeLog.ENTITY_MEMBER: 'member',
+    ChangeLog.ENTITY_PROJECT: 'project',
+}
+
+
+def sync_embedding_indexes(changes: OutboxChanges):
+    """Queue an embed job for each saved member and project, and drop deleted ones from the indexes"""
+    from .ann import batch_updates, remove_embeddings
+    from .jobs import enqueue
+    from .models import Job
+
+    with batch_updates():
+        for entity, kind in EMBEDDING_INDEX_KINDS.items():
+            if changes.deleted.get(entity):
+                remove_embeddings(kind, changes.deleted[entity])
+    # Queued jobs are deduplicated, so repeated saves before a worker gets to them embed once
+    for entity, kind in EMBEDDING_INDEX_KINDS.items():
+        for object_id in sorted(changes.upserted.get(entity, ())):
+            enqueue('embed_profile', priority=Job.PRIORITY_LOW, kind=kind, object_id=object_id)
+
+
+# Durable consumers run by the consume_outbox command, by name
+DURABLE_CONSUMERS: Dict[str, Handler] = {
+    'search-snapshots': publish_snapshots,
+    'embedding-indexes': sync_embedding_indexes,
+}
+
+
+_worker_consumer: Optional[OutboxConsumer] = None
+_worker_pid: Optional[int] = None
+_worker_lock = threading.Lock()
+
+
+def get_worker_consumer() -> Optional[OutboxConsumer]:
+    """This process's consumer, if it has been started"""
+    return _worker_consumer if _worker_pid == os.getpid() else None
+
+
+def start_worker_consumer(**kwargs):
+    """Start this process's consumer thread once; connected to request_started.
+
+    Checked per process id, so each forked server worker starts its own.
+    """
+    global _worker_consumer, _worker_pid
+    if _worker_pid == os.getpid():
+        return
+    with _worker_lock:
+        if _worker_pid == os.getpid():
+            return
+        consumer = OutboxConsumer(f'worker-{os.getpid()}', apply_to_worker)
+        thread = threading.Thread(
+            target=consumer.run, args=(getattr(settings, 'OUTBOX_POLL_INTERVAL', 1),),
+            name='outbox-consumer', daemon=True,
+        )
+        _worker_consumer, _worker_pid = consumer, os.getpid()
+        thread.start()
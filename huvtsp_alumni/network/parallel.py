@@ -0,0 +1,198 @@
+from concurrent.futures import BrokenExecutor, Executor, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import heapq
+import logging
+import threading
+
+import django
+from django.conf import settings
+
+from .snapshot import MemberSnapshot, attach_snapshot, shared_snapshot_dir
+
+
+logger = logging.getLogger(__name__)
+
+
+class StaleShardSource(Exception):
+    """A pool process holds a different snapshot from the one the query was for"""
+
+
+# The published member snapshot a pool process last mapped, by directory
+_sources: Dict[str, MemberSnapshot] = {}
+
+
+def _shard_source(directory: str, version: int, watermark: int, rows: int) -> MemberSnapshot:
+    """The published member snapshot the query was for, mapped once per generation"""
+    key = (version, watermark, rows)
+    snapshot = _sources.get(directory)
+    if snapshot is None or (snapshot.version, snapshot.watermark, len(snapshot)) != key:
+        mapped = attach_snapshot(Path(directory), 'members')
+        if mapped is not None:
+            snapshot = _sources[directory] = MemberSnapshot.attach(mapped)
+    if snapshot is None or (snapshot.version, snapshot.watermark, len(snapshot)) != key:
+        raise StaleShardSource(f'{directory} holds another snapshot than version {version}')
+    return snapshot
+
+
+def _score_shard(directory: str, start: int, stop: int, version: int, watermark: int, rows: int,
+                 processed_query: Dict, filters: Optional[Dict], limit: int) -> Tuple[List, int]:
+    """Score rows start to stop of the published snapshot; runs in a pool process"""
+    from .services import IntelligentMatchingService
+
+    snapshot = _shard_source(directory, version, watermark, rows)
+    return IntelligentMatchingService().score_member_rows(
+        snapshot.rows_view(start, stop), processed_query, filters, limit
+    )
+
+
+class ShardedScorer:
+    """Scores a member snapshot in contiguous shards in parallel and merges their top matches.
+
+    Each shard is a ``rows_view`` of the snapshot, scored exactly as the
+    whole snapshot would be, and returns its own best ``limit`` matches;
+    as shards are in id order, merging them by score then id gives the
+    same ranking as scoring in one go. Snapshots under ``min_rows`` rows
+    are not worth the hand-off and are scored in the calling process, as
+    is any search whose shards take longer than ``timeout`` seconds.
+
+    Thread mode shares the snapshot as it is but only helps as far as
+    numpy releases the GIL. Process mode needs ``SEARCH_SNAPSHOT_DIR``:
+    its processes come from a fork server, never forked from the threaded
+    server itself, and map the published snapshot file, so they share its
+    pages. Searches on a snapshot that is not the published one are scored
+    in the calling process.
+    """
+
+    MODES = ('thread', 'process')
+
+    def __init__(self, workers: int = 0, mode: str = 'thread', min_rows: int = 50000, timeout: float = 2.0):
+        if mode not in self.MODES:
+            raise ValueError(f'Unknown parallel search mode {mode!r}')
+        self.workers = workers
+        self.mode = mode
+        self.min_rows = min_rows
+        self.timeout = timeout
+        self.sharded = 0
+        self.fallbacks = 0
+        self.timeouts = 0
+        self._pool: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> 'ShardedScorer':
+        return cls(
+            workers=getattr(settings, 'SEARCH_PARALLEL_WORKERS', 0),
+            mode=getattr(settings, 'SEARCH_PARALLEL_MODE', 'thread'),
+            min_rows=getattr(settings, 'SEARCH_PARALLEL_MIN_ROWS', 50000),
+            timeout=getattr(settings, 'SEARCH_PARALLEL_TIMEOUT', 2.0),
+        )
+
+    def should_shard(self, rows: int) -> bool:
+        return self.workers > 1 and rows >= self.min_rows
+
+    def shards(self, rows: int) -> List[Tuple[int, int]]:
+        """Row ranges of one shard per worker, as even as they divide"""
+        count = max(min(self.workers, rows), 1)
+        bounds = [rows * shard // count for shard in range(count + 1)]
+        return list(zip(bounds, bounds[1:]))
+
+    def score_members(self, snapshot: MemberSnapshot, processed_query: Dict,
+                      filters: Optional[Dict], limit: int) -> Tuple[List, int]:
+        """The best limit matches across all shards and how many members matched in all"""
+        from .services import IntelligentMatchingService
+
+        def in_process() -> Tuple[List, int]:
+            self.fallbacks += 1
+            return IntelligentMatchingService().score_member_rows(snapshot, processed_query, filters, limit)
+
+        try:
+            futures = self._submit(snapshot, processed_query, filters, limit)
+            _, pending = wait(futures, timeout=self.timeout)
+            if pending:
+                for future in pending:
+                    future.cancel()
+                self.timeouts += 1
+                logger.warning('Search shards took over %ss; scoring in the request', self.timeout)
+                # Processes still busy, or stuck, are left to finish outside a fresh pool
+                self._discard_pool()
+                return in_process()
+            results = [future.result() for future in futures]
+        except StaleShardSource:
+            return in_process()
+        except BrokenExecutor:
+            logger.exception('Search shard pool failed; scoring in the request')
+            self._discard_pool()
+            return in_process()
+        self.sharded += 1
+        merged = heapq.merge(*(matches for matches, _ in results), key=lambda match: (-match.score, match.id))
+        return list(merged)[:limit], sum(total for _, total in results)
+
+    def _submit(self, snapshot: MemberSnapshot, processed_query: Dict, filters: Optional[Dict], limit: int):
+        if self.mode == 'thread':
+            from .services import IntelligentMatchingService
+
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix='search-shard')
+                pool = self._pool
+            service = IntelligentMatchingService()
+            return [
+                pool.submit(service.score_member_rows, snapshot.rows_view(start, stop), processed_query, filters, limit)
+                for start, stop in self.shards(len(snapshot))
+            ]
+
+        directory = shared_snapshot_dir()
+        if directory is None:
+            raise StaleShardSource('Process mode needs SEARCH_SNAPSHOT_DIR')
+        with self._lock:
+            if self._pool is None:
+                # Fork server children start clean and set Django up before their first shard
+                self._pool = ProcessPoolExecutor(
+                    self.workers, mp_context=get_context('forkserver'), initializer=django.setup
+                )
+                logger.info('Started %s search shard processes', self.workers)
+            pool = self._pool
+        return [
+            pool.submit(_score_shard, str(directory), start, stop, snapshot.version, snapshot.watermark,
+                        len(snapshot), processed_query, filters, limit)
+            for start, stop in self.shards(len(snapshot))
+        ]
+
+    def _discard_pool(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def close(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def metrics(self) -> Dict:
+        return {
+            'workers': self.workers,
+            'mode': self.mode,
+            'min_rows': self.min_rows,
+            'timeout': self.timeout,
+            'sharded': self.sharded,
+            'fallbacks': self.fallbacks,
+            'timeouts': self.timeouts,
+        }
+
+
+_scorer: Optional[ShardedScorer] = None
+_scorer_lock = threading.Lock()
+
+
+def get_sharded_scorer() -> ShardedScorer:
+    """The process-wide sharded scorer, configured from settings"""
+    global _scorer
+    if _scorer is None:
+        with _scorer_lock:
+            if _scorer is None:
+                _scorer = ShardedScorer.from_settings()
+    return _scorer
@@ -0,0 +1,53 @@
+from typing import Any, Dict
+
+from django.db import connections
+
+
+def pool_metrics(pool) -> Dict[str, Any]:
+    """Utilization and wait figures from a psycopg ConnectionPool's stats"""
+    stats = pool.get_stats()
+    size = stats.get('pool_size', 0)
+    available = stats.get('pool_available', 0)
+    max_size = stats.get('pool_max', pool.max_size)
+    requests = stats.get('requests_num', 0)
+    wait_ms = stats.get('requests_wait_ms', 0)
+    return {
+        'size': size,
+        'available': available,
+        'in_use': size - available,
+        'min_size': stats.get('pool_min', pool.min_size),
+        'max_size': max_size,
+        'max_lifetime': pool.max_lifetime,
+        'utilization': round((size - available) / max_size, 3) if max_size else 0.0,
+        'requests_waiting': stats.get('requests_waiting', 0),
+        'requests': requests,
+        'requests_queued': stats.get('requests_queued', 0),
+        'requests_errors': stats.get('requests_errors', 0) + stats.get('requests_timeouts', 0),
+        'wait_ms_total': wait_ms,
+        'wait_ms_avg': round(wait_ms / requests, 3) if requests else 0.0,
+        'connections_lost': stats.get('connections_lost', 0),
+    }
+
+
+def connection_metrics() -> Dict[str, Dict[str, Any]]:
+    """How each configured database holds its connections in this worker.
+
+    Databases without a pool report whether persistent connections are
+    enabled (``CONN_MAX_AGE``) and checked before reuse
+    (``CONN_HEALTH_CHECKS``); pooled PostgreSQL databases add the pool's
+    utilization and wait-time counters.
+    """
+    metrics = {}
+    for alias in connections:
+        connection = connections[alias]
+        settings_dict = connection.settings_dict
+        pool = getattr(connection, 'pool', None)
+        metrics[alias] = {
+            'vendor': connection.vendor,
+            'pooled': pool is not None,
+            'conn_max_age': settings_dict.get('CONN_MAX_AGE', 0),
+            'health_checks': settings_dict.get('CONN_HEALTH_CHECKS', False),
+            'connected': connection.connection is not None,
+            'pool': pool_metrics(pool) if pool is not None else None,
+        }
+    return metrics
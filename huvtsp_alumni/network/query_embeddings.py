@@ -0,0 +1,234 @@
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import sqlite3
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Count
+
+from .models import SearchTracking
+
+try:
+    import openai
+except ImportError:  # only needed to embed queries missing from the cache
+    openai = None
+
+
+DEFAULT_MODEL = 'text-embedding-3-small'
+
+
+def get_embedding_model() -> str:
+    return getattr(settings, 'EMBEDDING_MODEL', DEFAULT_MODEL)
+
+
+def normalize_query(query: str) -> str:
+    """Cache key form of a query: lower-cased with whitespace collapsed"""
+    return ' '.join(query.lower().split())
+
+
+def fetch_embedding(text: str, model: str) -> np.ndarray:
+    """Embed text with the OpenAI embeddings API"""
+    if openai is None:
+        raise RuntimeError('The openai package is required to embed queries')
+    response = openai.embeddings.create(model=model, input=text)
+    return np.asarray(response.data[0].embedding, dtype=np.float32)
+
+
+class QueryEmbeddingStore:
+    """On-disk (model, query) -> embedding store in a SQLite file.
+
+    SQLite in WAL mode lets every worker on the host read and add entries
+    concurrently. Vectors are stored as raw float32 bytes.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=5)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS query_embeddings ('
+                'model TEXT NOT NULL, query TEXT NOT NULL, vector BLOB NOT NULL, created REAL NOT NULL, '
+                'PRIMARY KEY (model, query))'
+            )
+            self._local.connection = connection
+        return connection
+
+    def get_many(self, model: str, queries: List[str]) -> Dict[str, np.ndarray]:
+        found = {}
+        connection = self._connection()
+        # Stay well under SQLite's bound parameter limit
+        for start in range(0, len(queries), 500):
+            chunk = queries[start:start + 500]
+            rows = connection.execute(
+                f"SELECT query, vector FROM query_embeddings WHERE model = ? AND query IN ({','.join('?' * len(chunk))})",
+                [model, *chunk],
+            )
+            for query, vector in rows:
+                found[query] = np.frombuffer(vector, dtype=np.float32)
+        return found
+
+    def set(self, model: str, query: str, vector: np.ndarray):
+        with self._connection() as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO query_embeddings (model, query, vector, created) VALUES (?, ?, ?, ?)',
+                (model, query, np.asarray(vector, dtype=np.float32).tobytes(), time.time()),
+            )
+
+    def __len__(self):
+        return self._connection().execute('SELECT COUNT(*) FROM query_embeddings').fetchone()[0]
+
+
+class QueryEmbeddingCache:
+    """Two-level cache of query embeddings: an in-process LRU over a disk store.
+
+    Queries are keyed by model and normalized text. A miss in both levels
+    calls ``fetch`` (the embeddings API) and writes the vector to both.
+    Counters track hits per level, misses and the latency the hits saved,
+    estimated from the average time of the remote calls made so far.
+    Cached vectors are shared and read-only.
+    """
+
+    MAX_ENTRIES = 2048
+
+    def __init__(self, store: Optional[QueryEmbeddingStore],
+                 fetch: Callable[[str, str], np.ndarray] = fetch_embedding,
+                 max_entries: int = MAX_ENTRIES):
+        self.store = store
+        self.fetch = fetch
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Tuple[str, str], np.ndarray]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'remote_ms': 0.0, 'disk_ms': 0.0}
+
+    @classmethod
+    def from_settings(cls) -> 'QueryEmbeddingCache':
+        path = getattr(settings, 'QUERY_EMBEDDING_CACHE_PATH',
+                       settings.BASE_DIR / 'embeddings' / 'query-embeddings.sqlite3')
+        return cls(
+            QueryEmbeddingStore(path) if path else None,
+            max_entries=getattr(settings, 'QUERY_EMBEDDING_CACHE_SIZE', cls.MAX_ENTRIES),
+        )
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remember(self, key: Tuple[str, str], vector: np.ndarray):
+        vector.flags.writeable = False
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, query: str, model: str = DEFAULT_MODEL) -> np.ndarray:
+        """The embedding of query, from memory, disk or the embeddings API"""
+        key = (model, normalize_query(query))
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self._counters['memory_hits'] += 1
+                return vector
+
+        if self.store is not None:
+            start = time.perf_counter()
+            vector = self.store.get_many(model, [key[1]]).get(key[1])
+            elapsed = (time.perf_counter() - start) * 1000
+            with self._lock:
+                self._counters['disk_ms'] += elapsed
+                if vector is not None:
+                    self._counters['disk_hits'] += 1
+            if vector is not None:
+                self._remember(key, vector)
+                return vector
+
+        start = time.perf_counter()
+        vector = np.asarray(self.fetch(key[1], model), dtype=np.float32)
+        elapsed = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self._counters['misses'] += 1
+            self._counters['remote_ms'] += elapsed
+        if self.store is not None:
+            self.store.set(model, key[1], vector)
+        self._remember(key, vector)
+        return vector
+
+    def warm(self, queries: Iterable[str], model: str = DEFAULT_MODEL, fetch_missing: bool = False) -> int:
+        """Load queries' embeddings from disk into memory, embedding the missing ones if asked.
+
+        Returns how many queries are in memory afterwards.
+        """
+        normalized = list(dict.fromkeys(normalize_query(query) for query in queries if query.strip()))
+        found = self.store.get_many(model, normalized) if self.store is not None else {}
+        for query, vector in found.items():
+            self._remember((model, query), vector)
+        warmed = len(found)
+        if fetch_missing:
+            for query in normalized:
+                if query not in found:
+                    self.get(query, model)
+                    warmed += 1
+        return warmed
+
+    def metrics(self) -> Dict[str, float]:
+        with self._lock:
+            counters = dict(self._counters)
+            entries = len(self._entries)
+        hits = counters['memory_hits'] + counters['disk_hits']
+        lookups = hits + counters['misses']
+        remote_avg = counters['remote_ms'] / counters['misses'] if counters['misses'] else 0.0
+        disk_lookups = counters['disk_hits'] + counters['misses'] if self.store is not None else 0
+        disk_avg = counters['disk_ms'] / disk_lookups if disk_lookups else 0.0
+        return {
+            'entries': entries,
+            'max_entries': self.max_entries,
+            'memory_hits': counters['memory_hits'],
+            'disk_hits': counters['disk_hits'],
+            'misses': counters['misses'],
+            'hit_rate': round(hits / lookups, 3) if lookups else 0.0,
+            'avg_remote_ms': round(remote_avg, 2),
+            'avg_disk_ms': round(disk_avg, 3),
+            # Memory hits skip both levels; disk hits still pay the disk lookup
+            'saved_ms': round(counters['memory_hits'] * remote_avg + counters['disk_hits'] * max(remote_avg - disk_avg, 0), 1),
+        }
+
+
+def top_queries(limit: int) -> List[str]:
+    """The most frequent smart search queries in the search history"""
+    rows = (
+        SearchTracking.objects.filter(search_type=SearchTracking.SEARCH_TYPE_SMART)
+        .exclude(query='')
+        .values('query').annotate(count=Count('id')).order_by('-count')[:limit]
+    )
+    return [row['query'] for row in rows]
+
+
+_cache: Optional[QueryEmbeddingCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_query_embedding_cache() -> QueryEmbeddingCache:
+    """Return the process-wide cache, warmed from disk with the top historical queries"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                cache = QueryEmbeddingCache.from_settings()
+                prewarm = getattr(settings, 'QUERY_EMBEDDING_PREWARM', 200)
+                if prewarm:
+                    cache.warm(top_queries(prewarm), model=get_embedding_model())
+                _cache = cache
+    return _cache
+
+
+def embed_query(query: str) -> np.ndarray:
+    return get_query_embedding_cache().get(query, get_embedding_model())
@@ -0,0 +1,39 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; rendering falls back to the standard encoder
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """Drop-in ``JSONRenderer`` that encodes with orjson when it is installed.
+
+    The output is byte-for-byte what ``JSONRenderer`` writes for the compact,
+    unicode settings: dates and other non-JSON types are handed back to DRF's
+    encoder, and anything orjson refuses (non-string keys, huge integers,
+    lone surrogates) is rendered by ``JSONRenderer`` itself. orjson writes
+    floats below 1e-4 or from 1e16 up in a different exponent form, so use it
+    only where floats stay inside that range (the network API only sends
+    relevance scores).
+    """
+
+    OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME if orjson else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None or data is None
+            or not (api_settings.COMPACT_JSON and api_settings.UNICODE_JSON)
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            content = orjson.dumps(data, default=JSONEncoder().default, option=self.OPTIONS)
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Same escaping JSONRenderer applies, for embedding in JavaScript
+        return content.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
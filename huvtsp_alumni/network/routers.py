@@ -0,0 +1,76 @@
+from contextvars import ContextVar
+from typing import Optional
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+
+LAST_WRITE_KEY = 'replica:last-write'
+
+# Append-only logs written during reads, and the bookkeeping of outbox
+# consumers and background jobs; their lag never shows in directory data
+UNTRACKED_WRITES = {'network.searchtracking', 'network.changelog', 'network.outboxcheckpoint', 'network.job'}
+
+# Database the current request may read from; None reads the primary
+_read_database: ContextVar[Optional[str]] = ContextVar('read_database', default=None)
+
+
+def get_replica_alias() -> Optional[str]:
+    """The replica's database alias, or None when no replica is configured"""
+    alias = getattr(settings, 'REPLICA_DATABASE', 'replica')
+    return alias if alias in settings.DATABASES else None
+
+
+def get_read_database() -> Optional[str]:
+    return _read_database.get()
+
+
+def set_read_database(alias: Optional[str]):
+    """Route this context's reads to alias; returns a token for reset_read_database"""
+    return _read_database.set(alias)
+
+
+def reset_read_database(token):
+    _read_database.reset(token)
+
+
+def written_recently() -> bool:
+    """Whether any worker wrote within the replica's expected lag"""
+    last_write = cache.get(LAST_WRITE_KEY)
+    return last_write is not None and time.time() - last_write < getattr(settings, 'REPLICA_LAG_SECONDS', 2)
+
+
+class PrimaryReplicaRouter:
+    """Send reads to the replica when the current request allows it, writes to the primary.
+
+    ``ReplicaRoutingMiddleware`` decides per request whether reads may use
+    the replica. Any write pins the rest of the request to the primary, and
+    a write to directory data marks a recent write, so for
+    ``REPLICA_LAG_SECONDS`` every worker reads the primary while the
+    replica catches up. That keeps snapshots and cached pages, which are
+    rebuilt right after a write, from being built from stale replica data.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_database.get() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        if _read_database.get() is not None:
+            _read_database.set(None)
+        if model._meta.app_label == 'network' and model._meta.label_lower not in UNTRACKED_WRITES:
+            cache.set(LAST_WRITE_KEY, time.time(), None)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, get_replica_alias()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica gets its schema through replication
+        if db == get_replica_alias():
+            return False
+        return None
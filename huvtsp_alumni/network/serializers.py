@@ -1,17 +1,19 @@
 from rest_framework import serializers
+from .fieldsets import SparseFieldsetMixin
+from .fragments import FragmentCacheListSerializer
 from .models import (
     NetworkMember, Organization, Experience, SocialLink, 
     Project, ProjectLink, Resources, SearchTracking
 )
 
 
-class SocialLinkSerializer(serializers.ModelSerializer):
+class SocialLinkSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = SocialLink
         fields = ['id', 'title', 'link', 'description', 'platform']
 
 
-class ExperienceSerializer(serializers.ModelSerializer):
+class ExperienceSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     organization_name = serializers.CharField(source='organization.name', read_only=True)
     organization_type = serializers.CharField(source='organization.type', read_only=True)
     
@@ -24,7 +26,7 @@ class ExperienceSerializer(serializers.ModelSerializer):
         ]
 
 
-class NetworkMemberSerializer(serializers.ModelSerializer):
+class NetworkMemberSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     experiences = ExperienceSerializer(many=True, read_only=True)
     social_links = SocialLinkSerializer(many=True, read_only=True)
     region_display = serializers.CharField(source='get_region_display', read_only=True)
@@ -37,11 +39,14 @@ class NetworkMemberSerializer(serializers.ModelSerializer):
             'additional_info', 'avatar', 'slug', 'experiences', 'social_links'
         ]
         read_only_fields = ['slug']
+        list_serializer_class = FragmentCacheListSerializer
 
 
-class OrganizationSerializer(serializers.ModelSerializer):
+class OrganizationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     type_display = serializers.CharField(source='get_type_display', read_only=True)
     affiliated_people_count = serializers.SerializerMethodField()
+    method_field_relations = {'affiliated_people_count': 'affiliated_people'}
+    count_fields = ('affiliated_people_count',)
     
     class Meta:
         model = Organization
@@ -55,18 +60,20 @@ class OrganizationSerializer(serializers.ModelSerializer):
         return obj.affiliated_people.count()
 
 
-class ProjectLinkSerializer(serializers.ModelSerializer):
+class ProjectLinkSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = ProjectLink
         fields = ['id', 'title', 'link', 'platform']
 
 
-class ProjectSerializer(serializers.ModelSerializer):
+class ProjectSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     project_links = ProjectLinkSerializer(many=True, read_only=True)
     founders = NetworkMemberSerializer(many=True, read_only=True)
     type_display = serializers.CharField(source='get_type_display', read_only=True)
     stage_display = serializers.CharField(source='get_stage_display', read_only=True)
     founders_count = serializers.SerializerMethodField()
+    method_field_relations = {'founders_count': 'founders'}
+    count_fields = ('founders_count',)
     
     class Meta:
         model = Project
@@ -82,7 +89,7 @@ class ProjectSerializer(serializers.ModelSerializer):
         return obj.founders.count()
 
 
-class ResourcesSerializer(serializers.ModelSerializer):
+class ResourcesSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Resources
         fields = ['id', 'title', 'slug', 'link', 'platform', 'description']
@@ -114,9 +121,11 @@ class ProjectDetailSerializer(ProjectSerializer):
 
 
 # List serializers for performance
-class NetworkMemberListSerializer(serializers.ModelSerializer):
+class NetworkMemberListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     region_display = serializers.CharField(source='get_region_display', read_only=True)
     experiences_count = serializers.SerializerMethodField()
+    method_field_relations = {'experiences_count': 'experiences'}
+    count_fields = ('experiences_count',)
     
     class Meta:
         model = NetworkMember
@@ -125,14 +134,17 @@ class NetworkMemberListSerializer(serializers.ModelSerializer):
             'location', 'session', 'pod', 'internship', 'email', 'slug', 'experiences_count'
         ]
         read_only_fields = ['slug']
+        list_serializer_class = FragmentCacheListSerializer
     
     def get_experiences_count(self, obj):
         return obj.experiences.count()
 
 
-class OrganizationListSerializer(serializers.ModelSerializer):
+class OrganizationListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     type_display = serializers.CharField(source='get_type_display', read_only=True)
     affiliated_people_count = serializers.SerializerMethodField()
+    method_field_relations = {'affiliated_people_count': 'affiliated_people'}
+    count_fields = ('affiliated_people_count',)
     
     class Meta:
         model = Organization
@@ -146,10 +158,12 @@ class OrganizationListSerializer(serializers.ModelSerializer):
         return obj.affiliated_people.count()
 
 
-class ProjectListSerializer(serializers.ModelSerializer):
+class ProjectListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     type_display = serializers.CharField(source='get_type_display', read_only=True)
     stage_display = serializers.CharField(source='get_stage_display', read_only=True)
     founders_count = serializers.SerializerMethodField()
+    method_field_relations = {'founders_count': 'founders'}
+    count_fields = ('founders_count',)
     
     class Meta:
         model = Project
@@ -163,7 +177,7 @@ class ProjectListSerializer(serializers.ModelSerializer):
         return obj.founders.count()
 
 
-class SearchTrackingSerializer(serializers.ModelSerializer):
+class SearchTrackingSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     search_type_display = serializers.CharField(source='get_search_type_display', read_only=True)
     
     class Meta:
@@ -172,4 +186,44 @@ class SearchTrackingSerializer(serializers.ModelSerializer):
             'id', 'search_type', 'search_type_display', 'query', 
             'filters', 'results_count', 'created_at'
         ]
-        read_only_fields = ['created_at'] 
\ No newline at end of file
+        read_only_fields = ['created_at'] 
+
+# Flat serializers for the delta-sync change feed; relations are sent as ids
+class NetworkMemberSyncSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = NetworkMember
+        fields = [
+            'id', 'first_name', 'last_name', 'region', 'location', 'session',
+            'pod', 'internship', 'email', 'skills', 'additional_info', 'avatar',
+            'slug', 'updated_at'
+        ]
+
+
+class ExperienceSyncSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Experience
+        fields = [
+            'id', 'network_member', 'organization', 'title', 'experience_type',
+            'start_date', 'end_date', 'is_current', 'description', 'updated_at'
+        ]
+
+
+class SocialLinkSyncSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SocialLink
+        fields = ['id', 'network_member', 'title', 'link', 'description', 'platform']
+
+
+class ProjectSyncSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Project
+        fields = [
+            'id', 'title', 'logo', 'type', 'stage', 'founders',
+            'what_are_they_looking_for', 'additional_info', 'slug', 'updated_at'
+        ]
+
+
+class OrganizationSyncSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Organization
+        fields = ['id', 'name', 'slug', 'type', 'description', 'website', 'updated_at']
@@ -1,7 +1,65 @@
-from typing import List, Dict, Any, Tuple
-from django.db.models import Q
+from typing import List, Dict, Any, Tuple, Iterator, Optional, Callable, Union
+from operator import attrgetter
+from django.db.models import Q, Prefetch
 from .models import NetworkMember, Organization, Project, Experience
+from .geo import bounding_box, default_radius, get_gazetteer
+from .keywords import get_keyword_automaton
+from .parallel import get_sharded_scorer
+from .snapshot import MemberSnapshot, ProjectSnapshot, get_member_snapshot, get_project_snapshot
+from .typeahead import get_typeahead_index
+import numpy as np
 import re
+import time
+
+
+# A match reason as recorded while scoring: a REASON_TEMPLATES code, the
+# score it added and the values its template is filled in with
+Reason = Tuple[str, float, tuple]
+
+# A scoring feature: which rows match, the score they add, and the reason
+# code and template values, either fixed or read from the matching row
+Feature = Tuple[np.ndarray, float, Union[Tuple[str, tuple], Callable[[int], Tuple[str, tuple]]]]
+
+REASON_TEMPLATES = {
+    'skill': "Has {} skills",
+    'location': "Located in {}",
+    'near': "Near {} ({:.0f} km)",
+    'area': "In {}",
+    'company': "Connected to {}",
+    'text': "Text match",
+    'design': "Expert in graphic design",
+    'mobile': "Mobile development expert",
+    'marketing': "Marketing specialist",
+    'interning': "Currently interning",
+    'pod': "Member of {} pod",
+    'project_skill': "Looking for {} skills",
+    'startup': "Startup project",
+    'nonprofit': "Nonprofit project",
+    'organization': "Matches {}",
+}
+
+
+def render_reasons(reasons: List[Reason]) -> str:
+    """The match_reason text of a match"""
+    return ', '.join(REASON_TEMPLATES[code].format(*values) for code, _, values in reasons)
+
+
+def explain_reasons(reasons: List[Reason]) -> List[Dict]:
+    """Each feature a match scored on, with the score it added"""
+    return [
+        {'feature': code, 'score': weight, 'reason': REASON_TEMPLATES[code].format(*values)}
+        for code, weight, values in reasons
+    ]
+
+
+class SearchMatch:
+    """Compact scored search hit; display fields and reason text are produced only for returned hits"""
+    __slots__ = ('id', 'score', 'reasons')
+
+    def __init__(self, id: int, score: float, reasons: List[Reason]):
+        self.id = id
+        self.score = score
+        self.reasons = reasons
 
 
 class IntelligentMatchingService:
@@ -204,29 +262,55 @@ class IntelligentMatchingService:
         'robinhood',
     ]
     
+    # Skill keywords behind the specific query patterns in _member_pattern_features
+    DESIGN_SKILLS = ['design', 'graphic', 'logo', 'branding']
+    MOBILE_SKILLS = ['mobile', 'ios', 'android', 'react native']
+    MARKETING_SKILLS = ['marketing', 'social media', 'content creation']
+    PATTERN_CITIES = ['boston', 'toronto', 'san francisco', 'new york']
+    PATTERN_POD_COMPANIES = ['stripe', 'zoom', 'google', 'microsoft']
+
+    # Phrases precomputed into the member snapshot's skills bitmap
+    SKILL_VOCABULARY = sorted(set().union(
+        *SKILL_CATEGORIES.values(), DESIGN_SKILLS, MOBILE_SKILLS, MARKETING_SKILLS
+    ))
+
+    # Every phrase process_query extracts, found in one pass by a keyword automaton
+    QUERY_KEYWORDS = sorted(set().union(
+        *SKILL_CATEGORIES.values(), LOCATIONS, COMPANIES, PROJECT_KEYWORDS, POD_KEYWORDS
+    ))
+
+    @classmethod
+    def warm_indexes(cls):
+        """Load the search snapshots, keyword automaton and typeahead index so the first search doesn't pay for them"""
+        get_keyword_automaton(cls.QUERY_KEYWORDS)
+        get_member_snapshot(cls.SKILL_VOCABULARY)
+        get_project_snapshot()
+        get_typeahead_index().refresh()
+    
     def process_query(self, query: str) -> Dict[str, Any]:
         """Process natural language query to extract intent and keywords"""
         lower_query = query.lower()
+        found = get_keyword_automaton(self.QUERY_KEYWORDS).matches(lower_query)
         
         # Extract skills
         found_skills = []
         for category, patterns in self.SKILL_CATEGORIES.items():
             for pattern in patterns:
-                if pattern in lower_query:
+                if pattern in found:
                     found_skills.extend(patterns)
                     break
         
         # Extract locations
-        found_locations = [loc for loc in self.LOCATIONS if loc in lower_query]
+        found_locations = [loc for loc in self.LOCATIONS if loc in found]
         
         # Extract companies
-        found_companies = [comp for comp in self.COMPANIES if comp in lower_query]
+        found_companies = [comp for comp in self.COMPANIES if comp in found]
         
         # Extract project keywords
-        found_projects = [proj for proj in self.PROJECT_KEYWORDS if proj in lower_query]
+        found_projects = [proj for proj in self.PROJECT_KEYWORDS if proj in found]
 
         # Extract pod keywords
-        found_pods = [pod for pod in self.POD_KEYWORDS if pod in lower_query]
+        found_pods = [pod for pod in self.POD_KEYWORDS if pod in found]
         
         # Determine intent
         intent = self._determine_intent(lower_query, found_skills, found_locations, found_companies, found_projects, found_pods)
@@ -299,220 +383,403 @@ class IntelligentMatchingService:
         
         return 'general'
     
-    def search_members(self, processed_query: Dict, filters: Dict = None) -> List[Dict]:
+    # Which entity searches run for each intent
+    MEMBER_INTENTS = ['find_person', 'skill_based', 'location_based', 'company_based', 'general']
+    PROJECT_INTENTS = ['find_project', 'company_based', 'general']
+    ORGANIZATION_INTENTS = ['find_organization', 'company_based', 'general']
+
+    def iter_search(self, processed_query: Dict, filters: Dict = None, intent: str = 'general',
+                    limit: Optional[int] = None, explain: bool = False,
+                    timings: Optional[Dict] = None) -> Iterator[Tuple[str, List[Dict], int]]:
+        """Yield (entity_type, results, total) as each entity search completes.
+
+        Members are searched first so callers streaming the response can
+        send the first member cards before the project and organization
+        scans have finished. Only the top ``limit`` results are hydrated;
+        ``total`` counts every match. With explain each result carries its
+        per-feature score breakdown, and timings, if given, is filled with
+        each entity's scoring and hydration time.
+        """
+        if intent in self.MEMBER_INTENTS:
+            yield self._timed_search(
+                timings, 'member', lambda: self.top_members(processed_query, filters, limit),
+                lambda matches: self.hydrate_members(matches, explain),
+            )
+
+        if intent in self.PROJECT_INTENTS:
+            yield self._timed_search(
+                timings, 'project', lambda: self.top_projects(processed_query, limit),
+                lambda matches: self.hydrate_projects(matches, explain),
+            )
+
+        if intent in self.ORGANIZATION_INTENTS:
+            yield self._timed_search(
+                timings, 'organization', lambda: self.top_organizations(processed_query, limit),
+                lambda matches: self.hydrate_organizations(matches, explain),
+            )
+
+    @staticmethod
+    def _timed_search(timings: Optional[Dict], entity_type: str,
+                      score: Callable[[], Tuple[List[SearchMatch], int]],
+                      hydrate: Callable[[List[SearchMatch]], List[Dict]]) -> Tuple[str, List[Dict], int]:
+        start = time.perf_counter()
+        matches, total = score()
+        scored = time.perf_counter()
+        results = hydrate(matches)
+        if timings is not None:
+            timings[entity_type] = {
+                'score_ms': round((scored - start) * 1000, 3),
+                'hydrate_ms': round((time.perf_counter() - scored) * 1000, 3),
+                'matched': total,
+            }
+        return entity_type, results, total
+
+    # Text columns matched by the keyword-only fallback
+    MEMBER_KEYWORD_FIELDS = ('first_name', 'last_name', 'skills', 'additional_info')
+    PROJECT_KEYWORD_FIELDS = ('title', 'what_are_they_looking_for', 'additional_info')
+    ORGANIZATION_KEYWORD_FIELDS = ('name', 'description')
+
+    def iter_keyword_search(self, processed_query: Dict, filters: Dict = None, intent: str = 'general',
+                            limit: Optional[int] = None) -> Iterator[Tuple[str, List[Dict], int]]:
+        """Cheap stand-in for iter_search used when smart search is overloaded.
+
+        Skips scoring and the snapshots: each entity type gets a single
+        LIMIT query for rows containing any query word, all ranked as plain
+        text matches. ``total`` counts only the returned results.
+        """
+        words = [word for word in processed_query['processed'].split() if len(word) > 2]
+
+        def keyword_matches(queryset, fields):
+            if not words:
+                return []
+            condition = Q()
+            for word in words:
+                for field in fields:
+                    condition |= Q(**{f'{field}__icontains': word})
+            ids = queryset.filter(condition).order_by('id').values_list('id', flat=True)[:limit]
+            return [SearchMatch(id, 0.2, [('text', 0.2, ())]) for id in ids]
+
+        if intent in self.MEMBER_INTENTS:
+            members = NetworkMember.objects.all()
+            for field in ('region', 'session', 'pod'):
+                if filters and filters.get(field):
+                    members = members.filter(**{field: filters[field]})
+            if filters and filters.get('near'):
+                area = get_gazetteer().place(filters['near'][3])
+                if area is not None:
+                    members = members.filter(place__in=get_gazetteer().labels_within(area))
+                else:
+                    # The circle's bounding box is close enough for the fallback
+                    south, north, longitudes = bounding_box(*filters['near'][:3])
+                    members = members.filter(latitude__range=(south, north))
+                    if longitudes is not None:
+                        members = members.filter(longitude__range=longitudes)
+            matches = keyword_matches(members, self.MEMBER_KEYWORD_FIELDS)
+            yield 'member', self.hydrate_members(matches), len(matches)
+
+        if intent in self.PROJECT_INTENTS:
+            matches = keyword_matches(Project.objects.all(), self.PROJECT_KEYWORD_FIELDS)
+            yield 'project', self.hydrate_projects(matches), len(matches)
+
+        if intent in self.ORGANIZATION_INTENTS:
+            matches = keyword_matches(Organization.objects.all(), self.ORGANIZATION_KEYWORD_FIELDS)
+            yield 'organization', self.hydrate_organizations(matches), len(matches)
+
+    # Columns returned for each hit
+    MEMBER_DISPLAY_FIELDS = (
+        'id', 'first_name', 'last_name', 'skills', 'location', 'region',
+        'pod', 'session', 'email', 'additional_info', 'slug'
+    )
+
+    def search_members(self, processed_query: Dict, filters: Dict = None, limit: Optional[int] = None) -> List[Dict]:
         """Search for network members based on processed query"""
-        queryset = NetworkMember.objects.all()
-        
-        # Apply filters
-        if filters:
-            if filters.get('region'):
-                queryset = queryset.filter(region=filters['region'])
-            if filters.get('session'):
-                queryset = queryset.filter(session=filters['session'])
-            if filters.get('pod'):
-                queryset = queryset.filter(pod=filters['pod'])
-        
-        results = []
-        
-        for member in queryset:
-            score, reasons = self._score_member(member, processed_query)
-            
-            if score > 0:
-                results.append({
-                    'type': 'member',
-                    'data': {
-                        'id': member.id,
-                        'first_name': member.first_name,
-                        'last_name': member.last_name,
-                        'skills': member.skills,
-                        'location': member.location,
-                        'region': member.region,
-                        'pod': member.pod,
-                        'session': member.session,
-                        'email': member.email,
-                        'additional_info': member.additional_info,
-                        'slug': member.slug
-                    },
-                    'relevance_score': score,
-                    'match_reason': ', '.join(reasons)
-                })
-        
-        # Sort by relevance score
-        results.sort(key=lambda x: x['relevance_score'], reverse=True)
-        return results
+        matches, _ = self.top_members(processed_query, filters, limit)
+        return self.hydrate_members(matches)
+
+    def score_members(self, processed_query: Dict, filters: Dict = None) -> List[SearchMatch]:
+        """Score every member at once over the column snapshot, best matches first"""
+        snapshot = get_member_snapshot(self.SKILL_VOCABULARY)
+        return self.score_member_rows(snapshot, processed_query, filters)[0]
+
+    def top_members(self, processed_query: Dict, filters: Dict = None,
+                    limit: Optional[int] = None) -> Tuple[List[SearchMatch], int]:
+        """The best limit member matches and how many members matched in all.
+
+        Large snapshots are scored in shards in parallel when
+        ``SEARCH_PARALLEL_WORKERS`` is set; see ``ShardedScorer``.
+        """
+        snapshot = get_member_snapshot(self.SKILL_VOCABULARY)
+        scorer = get_sharded_scorer()
+        if limit is not None and scorer.should_shard(len(snapshot)):
+            return scorer.score_members(snapshot, processed_query, filters, limit)
+        return self.score_member_rows(snapshot, processed_query, filters, limit)
+
+    def score_member_rows(self, snapshot: MemberSnapshot, processed_query: Dict, filters: Dict = None,
+                          limit: Optional[int] = None) -> Tuple[List[SearchMatch], int]:
+        """The best limit matches among a snapshot's rows and how many rows matched"""
+        features = self._member_features(snapshot, processed_query)
+        pattern_features = self._member_pattern_features(snapshot, processed_query)
+        
+        # Pattern scores are summed separately, then added, as they always have been
+        scores = self._sum_features(len(snapshot), features) + self._sum_features(len(snapshot), pattern_features)
+        return self._collect_matches(
+            snapshot.ids, scores, snapshot.filter_mask(filters), features + pattern_features, limit
+        )
+
+    def hydrate_members(self, matches: List[SearchMatch], explain: bool = False) -> List[Dict]:
+        """Load display fields for the given matches in a single query"""
+        rows = {
+            row['id']: row
+            for row in NetworkMember.objects.filter(
+                id__in=[match.id for match in matches]
+            ).values(*self.MEMBER_DISPLAY_FIELDS)
+        }
+        return [self._result('member', rows[match.id], match, explain) for match in matches if match.id in rows]
+
+    @staticmethod
+    def _result(entity_type: str, data: Dict, match: SearchMatch, explain: bool) -> Dict:
+        result = {
+            'type': entity_type,
+            'data': data,
+            'relevance_score': match.score,
+            'match_reason': render_reasons(match.reasons)
+        }
+        if explain:
+            result['explain'] = explain_reasons(match.reasons)
+        return result
     
-    def _score_member(self, member: NetworkMember, processed_query: Dict) -> Tuple[float, List[str]]:
-        """Score a member based on how well they match the query"""
-        score = 0
-        reasons = []
+    def _member_features(self, snapshot: MemberSnapshot, processed_query: Dict) -> List[Feature]:
+        """Match masks for how well each member matches the query"""
+        features = []
         
         # Score based on skills match
         if processed_query.get('skills'):
-            member_skills = member.skills.lower() if member.skills else ''
             for skill in processed_query['skills']:
-                if skill.lower() in member_skills:
-                    score += 0.3
-                    reasons.append(f"Has {skill} skills")
+                features.append((snapshot.skills_contain(skill), 0.3, ('skill', (skill,))))
         
-        # Score based on location match
+        # Score based on location match, by name, by being placed in a named
+        # state or country, or within the radius of a city or metro area
         if processed_query.get('locations'):
-            member_location = member.location.lower() if member.location else ''
+            gazetteer = get_gazetteer()
             for location in processed_query['locations']:
-                if location.lower() in member_location:
-                    score += 0.4
-                    reasons.append(f"Located in {location}")
+                named = snapshot.location.contains(location)
+                place = gazetteer.resolve(location)
+                if place is None:
+                    features.append((named, 0.4, ('location', (location,))))
+                    continue
+                if place.is_area:
+                    features.append((named | snapshot.in_area(place), 0.4, self._area_reason(
+                        location, place.name, named
+                    )))
+                    continue
+                radius = default_radius(place)
+                distances = snapshot.distances(place.latitude, place.longitude, radius)
+                features.append((named | (distances <= radius), 0.4, self._location_reason(
+                    location, place.name, named, distances
+                )))
         
         # Score based on company/pod match
         if processed_query.get('companies'):
-            member_pod = member.pod.lower() if member.pod else ''
-            member_info = member.additional_info.lower() if member.additional_info else ''
             for company in processed_query['companies']:
-                if company.lower() in member_pod or company.lower() in member_info:
-                    score += 0.5
-                    reasons.append(f"Connected to {company}")
+                mask = snapshot.pods_contain(company) | snapshot.additional_info.contains(company)
+                features.append((mask, 0.5, ('company', (company,))))
         
         # Score based on general text search
-        search_text = f"{member.first_name} {member.last_name} {member.skills or ''} {member.additional_info or ''}".lower()
-        if processed_query['processed'] in search_text:
-            score += 0.2
-            reasons.append("Text match")
-        
-        # Score based on specific query patterns
-        score += self._score_specific_patterns(member, processed_query, reasons)
+        features.append((snapshot.search_text.contains(processed_query['processed']), 0.2, ('text', ())))
         
-        return score, reasons
+        return features
     
-    def _score_specific_patterns(self, member: NetworkMember, processed_query: Dict, reasons: List[str]) -> float:
-        """Score based on specific query patterns from the provided examples"""
+    def _member_pattern_features(self, snapshot: MemberSnapshot, processed_query: Dict) -> List[Feature]:
+        """Match masks for specific query patterns from the provided examples"""
         query = processed_query['processed']
-        score = 0
+        features = []
         
         # Pattern: "do you know any people who are really good with graphic design?"
         if 'graphic design' in query or 'design' in query:
-            if member.skills and any(skill in member.skills.lower() for skill in ['design', 'graphic', 'logo', 'branding']):
-                score += 0.4
-                reasons.append("Expert in graphic design")
+            features.append((self._skills_contain_any(snapshot, self.DESIGN_SKILLS), 0.4, ('design', ())))
         
         # Pattern: "Anyone in [city] rn?"
-        if any(location in query for location in ['boston', 'toronto', 'san francisco', 'new york']):
-            if member.location and any(location in member.location.lower() for location in ['boston', 'toronto', 'san francisco', 'new york']):
-                score += 0.5
-                reasons.append(f"Located in {member.location}")
+        if any(location in query for location in self.PATTERN_CITIES):
+            mask = np.logical_or.reduce([snapshot.location.contains(location) for location in self.PATTERN_CITIES])
+            features.append((mask, 0.5, lambda row: ('location', (snapshot.location_labels[row],))))
         
         # Pattern: "Does anyone know of a software engineer familiar with mobile apps for a startup?"
         if 'software engineer' in query or 'mobile' in query:
-            if member.skills and any(skill in member.skills.lower() for skill in ['mobile', 'ios', 'android', 'react native']):
-                score += 0.4
-                reasons.append("Mobile development expert")
+            features.append((self._skills_contain_any(snapshot, self.MOBILE_SKILLS), 0.4, ('mobile', ())))
         
         # Pattern: "Who would likely be interested in a marketing gig for a startup?"
         if 'marketing' in query:
-            if member.skills and any(skill in member.skills.lower() for skill in ['marketing', 'social media', 'content creation']):
-                score += 0.4
-                reasons.append("Marketing specialist")
+            features.append((self._skills_contain_any(snapshot, self.MARKETING_SKILLS), 0.4, ('marketing', ())))
         
         # Pattern: "who is interning at [company]?"
         if 'interning' in query or 'intern' in query:
-            if member.additional_info and 'intern' in member.additional_info.lower():
-                score += 0.3
-                reasons.append("Currently interning")
+            features.append((snapshot.additional_info.contains('intern'), 0.3, ('interning', ())))
         
         # Pattern: "who is in the [pod] pod?"
         if 'pod' in query:
-            for company in ['stripe', 'zoom', 'google', 'microsoft']:
-                if company in query and company.lower() in member.pod.lower():
-                    score += 0.6
-                    reasons.append(f"Member of {member.pod} pod")
-        
-        return score
+            for company in self.PATTERN_POD_COMPANIES:
+                if company in query:
+                    features.append((
+                        snapshot.pods_contain(company), 0.6,
+                        lambda row: ('pod', (snapshot.pod_labels[snapshot.pod_codes[row]],))
+                    ))
+        
+        return features
+    
+    @staticmethod
+    def _location_reason(location: str, place_name: str, named: np.ndarray,
+                         distances: np.ndarray) -> Callable[[int], Tuple[str, tuple]]:
+        def reason(row: int) -> Tuple[str, tuple]:
+            if named[row]:
+                return 'location', (location,)
+            return 'near', (place_name, float(distances[row]))
+        return reason
+    
+    @staticmethod
+    def _area_reason(location: str, place_name: str, named: np.ndarray) -> Callable[[int], Tuple[str, tuple]]:
+        def reason(row: int) -> Tuple[str, tuple]:
+            if named[row]:
+                return 'location', (location,)
+            return 'area', (place_name,)
+        return reason
     
-    def search_projects(self, processed_query: Dict) -> List[Dict]:
+    @staticmethod
+    def _skills_contain_any(snapshot: MemberSnapshot, skills: List[str]) -> np.ndarray:
+        return np.logical_or.reduce([snapshot.skills_contain(skill) for skill in skills])
+    
+    @staticmethod
+    def _sum_features(size: int, features: List[Feature]) -> np.ndarray:
+        scores = np.zeros(size)
+        for mask, weight, _ in features:
+            scores[mask] += weight
+        return scores
+    
+    @classmethod
+    def _collect_matches(cls, ids: np.ndarray, scores: np.ndarray, candidates: np.ndarray,
+                         features: List[Feature], limit: Optional[int] = None) -> Tuple[List[SearchMatch], int]:
+        """The best limit matches sorted by relevance, ties in id order, and how many rows matched.
+
+        Reasons are recorded only for the rows returned.
+        """
+        rows = np.flatnonzero((scores > 0) & candidates)
+        total = len(rows)
+        rows = rows[np.argsort(-scores[rows], kind='stable')][:limit]
+        return [
+            SearchMatch(int(ids[row]), float(scores[row]), cls._row_reasons(row, features))
+            for row in rows
+        ], total
+    
+    @staticmethod
+    def _row_reasons(row: int, features: List[Feature]) -> List[Reason]:
+        reasons = []
+        for mask, weight, reason in features:
+            if mask[row]:
+                code, values = reason(row) if callable(reason) else reason
+                reasons.append((code, weight, values))
+        return reasons
+    
+    PROJECT_DISPLAY_FIELDS = ('id', 'title', 'type', 'stage', 'what_are_they_looking_for', 'additional_info', 'slug')
+
+    def search_projects(self, processed_query: Dict, limit: Optional[int] = None) -> List[Dict]:
         """Search for projects based on processed query"""
-        queryset = Project.objects.all()
+        matches, _ = self.top_projects(processed_query, limit)
+        return self.hydrate_projects(matches)
+
+    def score_projects(self, processed_query: Dict) -> List[SearchMatch]:
+        """Score every project at once over the column snapshot, best matches first"""
+        return self.top_projects(processed_query)[0]
+
+    def top_projects(self, processed_query: Dict, limit: Optional[int] = None) -> Tuple[List[SearchMatch], int]:
+        """The best limit project matches and how many projects matched in all"""
+        snapshot = get_project_snapshot()
+        features = self._project_features(snapshot, processed_query)
+        scores = self._sum_features(len(snapshot), features)
+        return self._collect_matches(snapshot.ids, scores, np.ones(len(snapshot), dtype=bool), features, limit)
+
+    def hydrate_projects(self, matches: List[SearchMatch], explain: bool = False) -> List[Dict]:
+        """Load display fields and founder names for the given matches"""
+        projects = Project.objects.only(*self.PROJECT_DISPLAY_FIELDS).prefetch_related(
+            Prefetch('founders', queryset=NetworkMember.objects.only('id', 'first_name', 'last_name'))
+        ).in_bulk([match.id for match in matches])
         results = []
         
-        for project in queryset:
-            score, reasons = self._score_project(project, processed_query)
-            
-            if score > 0:
-                results.append({
-                    'type': 'project',
-                    'data': {
-                        'id': project.id,
-                        'title': project.title,
-                        'type': project.type,
-                        'stage': project.stage,
-                        'what_are_they_looking_for': project.what_are_they_looking_for,
-                        'additional_info': project.additional_info,
-                        'slug': project.slug,
-                        'founders': [{'first_name': f.first_name, 'last_name': f.last_name} for f in project.founders.all()]
-                    },
-                    'relevance_score': score,
-                    'match_reason': ', '.join(reasons)
-                })
+        for match in matches:
+            project = projects.get(match.id)
+            if project is None:
+                continue
+            results.append(self._result('project', {
+                'id': project.id,
+                'title': project.title,
+                'type': project.type,
+                'stage': project.stage,
+                'what_are_they_looking_for': project.what_are_they_looking_for,
+                'additional_info': project.additional_info,
+                'slug': project.slug,
+                'founders': [{'first_name': f.first_name, 'last_name': f.last_name} for f in project.founders.all()]
+            }, match, explain))
         
-        # Sort by relevance score
-        results.sort(key=lambda x: x['relevance_score'], reverse=True)
         return results
     
-    def _score_project(self, project: Project, processed_query: Dict) -> Tuple[float, List[str]]:
-        """Score a project based on how well it matches the query"""
-        score = 0
-        reasons = []
+    def _project_features(self, snapshot: ProjectSnapshot, processed_query: Dict) -> List[Feature]:
+        """Match masks for how well each project matches the query"""
+        features = []
         
         # Score based on skills needed
         if processed_query.get('skills'):
-            project_description = f"{project.what_are_they_looking_for or ''} {project.additional_info or ''}".lower()
             for skill in processed_query['skills']:
-                if skill.lower() in project_description:
-                    score += 0.3
-                    reasons.append(f"Looking for {skill} skills")
+                features.append((snapshot.description.contains(skill), 0.3, ('project_skill', (skill,))))
         
         # Score based on project type
-        if 'startup' in processed_query['processed'] and project.type == 'ST':
-            score += 0.3
-            reasons.append("Startup project")
+        if 'startup' in processed_query['processed']:
+            features.append((snapshot.type_is(Project.PROJECT_STARTUP), 0.3, ('startup', ())))
         
-        if 'nonprofit' in processed_query['processed'] and project.type == 'NP':
-            score += 0.3
-            reasons.append("Nonprofit project")
+        if 'nonprofit' in processed_query['processed']:
+            features.append((snapshot.type_is(Project.PROJECT_NON_PROFIT), 0.3, ('nonprofit', ())))
         
         # Score based on text search
-        search_text = f"{project.title} {project.what_are_they_looking_for or ''} {project.additional_info or ''}".lower()
-        if processed_query['processed'] in search_text:
-            score += 0.2
-            reasons.append("Text match")
+        features.append((snapshot.search_text.contains(processed_query['processed']), 0.2, ('text', ())))
         
-        return score, reasons
+        return features
     
-    def search_organizations(self, processed_query: Dict) -> List[Dict]:
+    ORGANIZATION_SCORING_FIELDS = ('id', 'name', 'description')
+    ORGANIZATION_DISPLAY_FIELDS = ('id', 'name', 'type', 'description', 'website', 'slug')
+
+    def search_organizations(self, processed_query: Dict, limit: Optional[int] = None) -> List[Dict]:
         """Search for organizations based on processed query"""
-        queryset = Organization.objects.all()
-        results = []
+        matches, _ = self.top_organizations(processed_query, limit)
+        return self.hydrate_organizations(matches)
+
+    def top_organizations(self, processed_query: Dict, limit: Optional[int] = None) -> Tuple[List[SearchMatch], int]:
+        """The best limit organization matches and how many organizations matched in all"""
+        matches = self.score_organizations(processed_query)
+        return matches[:limit], len(matches)
+
+    def score_organizations(self, processed_query: Dict) -> List[SearchMatch]:
+        """Score organizations from lean column tuples, best matches first"""
+        queryset = Organization.objects.values_list(*self.ORGANIZATION_SCORING_FIELDS, named=True)
+        matches = []
         
         for org in queryset:
             score, reasons = self._score_organization(org, processed_query)
             
             if score > 0:
-                results.append({
-                    'type': 'organization',
-                    'data': {
-                        'id': org.id,
-                        'name': org.name,
-                        'type': org.type,
-                        'description': org.description,
-                        'website': org.website,
-                        'slug': org.slug
-                    },
-                    'relevance_score': score,
-                    'match_reason': ', '.join(reasons)
-                })
+                matches.append(SearchMatch(org.id, score, reasons))
         
         # Sort by relevance score
-        results.sort(key=lambda x: x['relevance_score'], reverse=True)
-        return results
+        matches.sort(key=attrgetter('score'), reverse=True)
+        return matches
+
+    def hydrate_organizations(self, matches: List[SearchMatch], explain: bool = False) -> List[Dict]:
+        """Load display fields for the given matches in a single query"""
+        rows = {
+            row['id']: row
+            for row in Organization.objects.filter(
+                id__in=[match.id for match in matches]
+            ).values(*self.ORGANIZATION_DISPLAY_FIELDS)
+        }
+        return [self._result('organization', rows[match.id], match, explain) for match in matches if match.id in rows]
     
-    def _score_organization(self, org: Organization, processed_query: Dict) -> Tuple[float, List[str]]:
+    def _score_organization(self, org: Organization, processed_query: Dict) -> Tuple[float, List[Reason]]:
         """Score an organization based on how well it matches the query"""
         score = 0
         reasons = []
@@ -524,13 +791,13 @@ class IntelligentMatchingService:
             for company in processed_query['companies']:
                 if company.lower() in org_name or company.lower() in org_description:
                     score += 0.8
-                    reasons.append(f"Matches {company}")
+                    reasons.append(('organization', 0.8, (company,)))
         
         # Score based on text search
         search_text = f"{org.name} {org.description or ''}".lower()
         if processed_query['processed'] in search_text:
             score += 0.2
-            reasons.append("Text match")
+            reasons.append(('text', 0.2, ()))
         
         return score, reasons
     
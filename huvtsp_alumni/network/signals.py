@@ -0,0 +1,90 @@
+from django.db.models.signals import pre_save, post_save, post_delete, m2m_changed
+from django.utils import timezone
+
+from .models import (
+    NetworkMember, Organization, Experience, SocialLink,
+    Project, ProjectLink, Resources, ChangeLog
+)
+from .geo import geocode
+
+
+# Models recorded in the change log, by change log entity; their change
+# versions are read from it. Writes through queryset.update() and
+# bulk_create() bypass these signals and must log their changes themselves.
+CHANGE_LOG_ENTITIES = {
+    NetworkMember: ChangeLog.ENTITY_MEMBER,
+    Experience: ChangeLog.ENTITY_EXPERIENCE,
+    SocialLink: ChangeLog.ENTITY_SOCIAL_LINK,
+    Project: ChangeLog.ENTITY_PROJECT,
+    Organization: ChangeLog.ENTITY_ORGANIZATION,
+    ProjectLink: ChangeLog.ENTITY_PROJECT_LINK,
+    Resources: ChangeLog.ENTITY_RESOURCE,
+}
+
+def touch_experience_member(sender, instance, **kwargs):
+    # Member cards embed their experiences, so their row version moves with them
+    NetworkMember.objects.filter(pk=instance.network_member_id).update(updated_at=timezone.now())
+
+
+def touch_social_link_member(sender, instance, **kwargs):
+    NetworkMember.objects.filter(pk=instance.network_member_id).update(updated_at=timezone.now())
+
+
+def touch_organization_members(sender, instance, **kwargs):
+    # Experiences on member cards show the organization's name and type
+    NetworkMember.objects.filter(experiences__organization=instance).update(updated_at=timezone.now())
+
+
+def geocode_member(sender, instance, **kwargs):
+    # Writes through queryset.update() skip this; run geocode_members after them
+    instance.place, instance.latitude, instance.longitude = geocode(instance.location)
+
+
+def log_save(sender, instance, **kwargs):
+    ChangeLog.objects.create(
+        entity=CHANGE_LOG_ENTITIES[sender], object_id=instance.pk, action=ChangeLog.ACTION_UPSERT
+    )
+
+
+def log_delete(sender, instance, **kwargs):
+    ChangeLog.objects.create(
+        entity=CHANGE_LOG_ENTITIES[sender], object_id=instance.pk, action=ChangeLog.ACTION_DELETE
+    )
+
+
+def log_project_founders(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action not in ('post_add', 'post_remove', 'post_clear'):
+            return
+        project_ids = [instance.pk]
+    # From the member side, instance is a member and pk_set holds project ids;
+    # a clear only says which projects are affected before it happens
+    elif action in ('post_add', 'post_remove'):
+        project_ids = pk_set
+    elif action == 'pre_clear':
+        project_ids = list(instance.project_set.values_list('id', flat=True))
+    else:
+        return
+    ChangeLog.objects.bulk_create([
+        ChangeLog(entity=ChangeLog.ENTITY_PROJECT, object_id=project_id, action=ChangeLog.ACTION_UPSERT)
+        for project_id in project_ids
+    ])
+
+
+pre_save.connect(geocode_member, sender=NetworkMember, dispatch_uid='geocode-member')
+
+for model in CHANGE_LOG_ENTITIES:
+    post_save.connect(log_save, sender=model, dispatch_uid=f'change-log-save-{model._meta.label_lower}')
+    post_delete.connect(log_delete, sender=model, dispatch_uid=f'change-log-delete-{model._meta.label_lower}')
+
+for model, touch in (
+    (Experience, touch_experience_member),
+    (SocialLink, touch_social_link_member),
+):
+    post_save.connect(touch, sender=model, dispatch_uid=f'touch-member-save-{model._meta.label_lower}')
+    post_delete.connect(touch, sender=model, dispatch_uid=f'touch-member-delete-{model._meta.label_lower}')
+post_save.connect(touch_organization_members, sender=Organization, dispatch_uid='touch-member-save-organization')
+
+m2m_changed.connect(
+    log_project_founders, sender=Project.founders.through, dispatch_uid='change-log-project-founders'
+)
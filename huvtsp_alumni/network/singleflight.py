@@ -0,0 +1,145 @@
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+import hashlib
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+class _Flight:
+    __slots__ = ('done', 'result', 'error', 'started')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.started = time.monotonic()
+
+
+class SingleFlight:
+    """Collapse concurrent identical computations into one.
+
+    The first caller for a key leads and runs the computation; callers
+    arriving while it is in flight wait for it instead of starting their
+    own. ``do`` hands waiting callers the leader's result (or exception).
+    ``begin`` only makes them wait, for work whose result lands somewhere
+    else: page cache misses are coalesced by letting the leader fill the
+    cache and serving the rest from it.
+
+    With the ``SINGLE_FLIGHT_SHARED_LOCK`` setting, leaders also take a
+    lock in the shared cache, so identical requests on other workers wait
+    too and ``do`` results are handed over through the cache. Waiting is
+    bounded by ``WAIT_TIMEOUT``, after which callers compute for themselves.
+    """
+
+    WAIT_TIMEOUT = 10
+    LOCK_TIMEOUT = 30
+    RESULT_TIMEOUT = 30
+    POLL_INTERVAL = 0.05
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, _Flight] = {}
+
+    def _claim(self, key: Hashable) -> Tuple[_Flight, bool]:
+        with self._lock:
+            flight = self._flights.get(key)
+            # A leader that never finished is taken over rather than waited on forever
+            if flight is None or time.monotonic() - flight.started > self.LOCK_TIMEOUT:
+                flight = self._flights[key] = _Flight()
+                return flight, True
+            return flight, False
+
+    def _land(self, key: Hashable, flight: _Flight):
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        flight.done.set()
+
+    def do(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return compute(), sharing one call between concurrent callers with the same key"""
+        flight, leader = self._claim(key)
+        if not leader:
+            if not flight.done.wait(self.WAIT_TIMEOUT):
+                return compute()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            lock = self._acquire_shared(key)
+            if lock is False:
+                flight.result = self._wait_shared_result(key, compute)
+            else:
+                try:
+                    flight.result = compute()
+                    if lock is not None:
+                        cache.set(self._cache_key('result', key), flight.result, self.RESULT_TIMEOUT)
+                finally:
+                    self._release_shared(key, lock)
+            return flight.result
+        except BaseException as error:
+            flight.error = error
+            raise
+        finally:
+            self._land(key, flight)
+
+    def begin(self, key: Hashable) -> Optional[Callable[[], None]]:
+        """Wait for an in-flight computation of key, or claim it.
+
+        Returns None once another caller's computation is done, or a finish
+        callback when this caller leads; the leader must call it as soon as
+        its result is available to the others.
+        """
+        flight, leader = self._claim(key)
+        if not leader:
+            flight.done.wait(self.WAIT_TIMEOUT)
+            return None
+
+        lock = self._acquire_shared(key)
+        if lock is False:
+            self._wait_shared(key)
+            self._land(key, flight)
+            return None
+
+        def finish():
+            self._release_shared(key, lock)
+            self._land(key, flight)
+        return finish
+
+    def _cache_key(self, kind: str, key: Hashable) -> str:
+        return f"singleflight:{kind}:{hashlib.sha256(repr(key).encode('utf-8')).hexdigest()}"
+
+    def _acquire_shared(self, key: Hashable):
+        """Take the cross-worker lock: its token, False if held elsewhere, None if disabled"""
+        if not getattr(settings, 'SINGLE_FLIGHT_SHARED_LOCK', False):
+            return None
+        token = uuid.uuid4().hex
+        return token if cache.add(self._cache_key('lock', key), token, self.LOCK_TIMEOUT) else False
+
+    def _release_shared(self, key: Hashable, token: Optional[str]):
+        if token is None:
+            return
+        lock_key = self._cache_key('lock', key)
+        if cache.get(lock_key) == token:
+            cache.delete(lock_key)
+
+    def _wait_shared(self, key: Hashable):
+        lock_key = self._cache_key('lock', key)
+        deadline = time.monotonic() + self.WAIT_TIMEOUT
+        while time.monotonic() < deadline and cache.get(lock_key) is not None:
+            time.sleep(self.POLL_INTERVAL)
+
+    def _wait_shared_result(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        self._wait_shared(key)
+        result = cache.get(self._cache_key('result', key))
+        return result if result is not None else compute()
+
+
+_single_flight = SingleFlight()
+
+
+def get_single_flight() -> SingleFlight:
+    return _single_flight
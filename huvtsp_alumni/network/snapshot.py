@@ -0,0 +1,677 @@
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Callable, List, Dict, Tuple, Iterable, Optional
+from datetime import timedelta
+import copy
+import os
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Func, OuterRef, Subquery
+from django.utils import timezone
+
+from .geo import GridIndex, Place, get_gazetteer
+from .mapped import MappedFile, write_mapped
+from .models import ChangeLog, NetworkMember, Project
+from .versions import get_version
+
+
+class TextColumn:
+    """Lower-cased strings packed into one byte buffer for vectorised substring search.
+
+    Rows are UTF-8 encoded and joined with NUL separators, so a single
+    ``find`` scan over the buffer tests every row at C speed; hit offsets
+    are mapped back to row numbers with a binary search over the row start
+    offsets. The buffer is a bytes object, or the memory map of a shared
+    snapshot with the column between ``base`` and ``end``.
+    """
+    __slots__ = ('text', 'starts', 'base', 'end')
+
+    SEPARATOR = b'\x00'
+
+    def __init__(self, values: Iterable[Optional[str]], lower: bool = True):
+        parts = [((value or '').lower() if lower else (value or '')).encode('utf-8') for value in values]
+        self.text = self.SEPARATOR.join(parts)
+        lengths = np.fromiter((len(part) + 1 for part in parts), dtype=np.int64, count=len(parts))
+        self.starts = np.cumsum(lengths) - lengths
+        self.base = 0
+        self.end = len(self.text)
+
+    @classmethod
+    def attach(cls, buffer, base: int, length: int, starts: np.ndarray) -> 'TextColumn':
+        """A column over length bytes of buffer starting at base"""
+        column = cls.__new__(cls)
+        column.text = buffer
+        column.starts = starts
+        column.base = base
+        column.end = base + length
+        return column
+
+    @classmethod
+    def take(cls, columns: List['TextColumn'], rows: np.ndarray) -> 'TextColumn':
+        """A column of the given rows of columns, numbered through each column in turn.
+
+        Rows are copied with one gather over the buffers, not row by row.
+        """
+        buffers, offsets, lengths = [], [], []
+        position = 0
+        for column in columns:
+            text = np.frombuffer(column.text, dtype=np.uint8, count=column.end - column.base, offset=column.base)
+            ends = np.append(column.starts[1:] - 1, len(text)) if len(column) else column.starts
+            buffers += [text, np.frombuffer(cls.SEPARATOR, dtype=np.uint8)]
+            offsets.append(column.starts + position)
+            lengths.append(ends - column.starts)
+            position += len(text) + 1
+
+        # Each row is copied with the separator that follows it in the source
+        offsets = np.concatenate(offsets)[rows]
+        spans = np.concatenate(lengths)[rows] + 1
+        starts = np.cumsum(spans) - spans
+        gather = np.arange(spans.sum()) - np.repeat(starts - offsets, spans)
+
+        column = cls.__new__(cls)
+        column.text = np.concatenate(buffers)[gather][:-1].tobytes()
+        column.starts = starts
+        column.base = 0
+        column.end = len(column.text)
+        return column
+
+    def __len__(self):
+        return len(self.starts)
+
+    def slice(self, start: int, stop: int) -> 'TextColumn':
+        """A column of rows start to stop sharing this column's buffer"""
+        length = self.end - self.base
+        first = int(self.starts[start]) if start < len(self) else length
+        last = int(self.starts[stop]) - 1 if stop < len(self) else length
+        return TextColumn.attach(self.text, self.base + first, max(last - first, 0), self.starts[start:stop] - first)
+
+    def __getitem__(self, row: int) -> str:
+        start = self.base + int(self.starts[row])
+        stop = self.base + int(self.starts[row + 1]) - 1 if row + 1 < len(self.starts) else self.end
+        return self.text[start:stop].decode('utf-8')
+
+    def contains(self, term: str) -> np.ndarray:
+        """Boolean mask of the rows containing term"""
+        term = term.lower().encode('utf-8')
+        if not term:
+            return np.ones(len(self), dtype=bool)
+
+        mask = np.zeros(len(self), dtype=bool)
+        text, starts, base, end = self.text, self.starts, self.base, self.end
+        position = text.find(term, base, end)
+        while position != -1:
+            row = int(np.searchsorted(starts, position - base, side='right')) - 1
+            mask[row] = True
+            # Skip the rest of this row; one hit is enough
+            if row + 1 >= len(starts):
+                break
+            position = text.find(term, base + int(starts[row + 1]), end)
+        return mask
+
+
+def intern_codes(values: Iterable[str]) -> Tuple[np.ndarray, List[str]]:
+    """Encode repeated strings as small integer codes plus a label table"""
+    labels: List[str] = []
+    index: Dict[str, int] = {}
+    codes = []
+    for value in values:
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(labels)
+            labels.append(value)
+        codes.append(code)
+    dtype = np.uint16 if len(labels) <= np.iinfo(np.uint16).max else np.uint32
+    return np.array(codes, dtype=dtype), labels
+
+
+# Bumped whenever the layout of snapshot files changes; files in another format are rebuilt
+SNAPSHOT_FORMAT = 4
+
+
+def latest_change() -> int:
+    """Id of the newest change log entry, the watermark of data read after it"""
+    return ChangeLog.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+
+# Seconds a gap in the change log ids may still be filled by a transaction
+# that has not committed yet; an older gap was rolled back
+GAP_TIMEOUT = 10
+# Entries below a watermark that are checked for open gaps
+GAP_WINDOW = 1000
+
+
+def settled_change(latest: int, visible: Optional[int] = None) -> int:
+    """The id up to which every change log entry is visible, at most latest.
+
+    Ids are taken before commit, so an entry below latest can become
+    visible after data was read at it. The result stays before the lowest
+    gap among the last ``GAP_WINDOW`` ids whose next entry is younger than
+    ``GAP_TIMEOUT`` seconds, so a watermark taken from it still covers the
+    entry that fills the gap. ``visible`` is how many of those ids have an
+    entry, when already counted; if all do there is no gap to look for.
+    """
+    if visible is not None and visible == min(latest, GAP_WINDOW):
+        return latest
+    oldest_open = timezone.now() - timedelta(seconds=GAP_TIMEOUT)
+    entries = ChangeLog.objects.filter(id__gt=latest - GAP_WINDOW, id__lte=latest).order_by('id')
+    previous = None
+    for entry_id, created_at in entries.values_list('id', 'created_at'):
+        if previous is not None and entry_id != previous + 1 and created_at > oldest_open:
+            return previous
+        previous = entry_id
+    return latest
+
+
+class ColumnSnapshot(ABC):
+    """Base for column snapshots that can be shared between processes through a mapped file.
+
+    ``ARRAYS`` name numpy attributes, ``LABELS`` JSON-serializable ones and
+    ``TEXT_COLUMNS`` ``TextColumn`` attributes; together they must hold
+    everything the snapshot reads. ``CODES`` maps code arrays to the label
+    lists they index.
+
+    ``watermark`` is the newest change log entry when the rows were read,
+    held before any gap that may still fill (see ``settled_change``), so an
+    old snapshot can be brought up to date by re-reading only the rows
+    changed after it.
+    """
+
+    MODEL = None
+    ENTITY = ''
+    FIELDS: Tuple[str, ...] = ()
+    ARRAYS: Tuple[str, ...] = ()
+    LABELS: Tuple[str, ...] = ()
+    TEXT_COLUMNS: Tuple[str, ...] = ()
+    CODES: Dict[str, str] = {}
+
+    # Past this many changed rows a full rebuild is as cheap as a replay
+    MAX_REPLAY_ROWS = 500
+
+    ids: np.ndarray
+    version: int
+    watermark: int
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def read_rows(cls, ids: Optional[List[int]] = None) -> Tuple[List[tuple], int]:
+        """Rows of FIELDS in id order, all of them or just ids, and their watermark.
+
+        The watermark comes from the same statement as the rows, so they
+        agree on which changes are included, and is then held before open
+        gaps.
+        """
+        queryset = cls.MODEL.objects.order_by('id').annotate(
+            watermark=Subquery(ChangeLog.objects.order_by('-id').values('id')[:1]),
+            visible=Subquery(
+                ChangeLog.objects.filter(id__gt=OuterRef('watermark') - GAP_WINDOW).order_by()
+                .annotate(count=Func('id', function='COUNT')).values('count')
+            ),
+        )
+        if ids is not None:
+            queryset = queryset.filter(id__in=ids)
+        rows = list(queryset.values_list(*cls.FIELDS, 'watermark', 'visible'))
+        if not rows:
+            return [], settled_change(latest_change())
+        return [row[:-2] for row in rows], settled_change(rows[0][-2] or 0, rows[0][-1])
+
+    @abstractmethod
+    def from_rows(self, rows: List[tuple], watermark: int, version: int) -> 'ColumnSnapshot':
+        """A snapshot like this one over other rows"""
+
+    def rows_view(self, start: int, stop: int) -> 'ColumnSnapshot':
+        """Rows start to stop as a snapshot of their own, without copying, kept for reuse"""
+        views = self.__dict__.setdefault('_views', {})
+        view = views.get((start, stop))
+        if view is None:
+            view = self.__class__.__new__(self.__class__)
+            view.version, view.watermark = self.version, self.watermark
+            for name in self.ARRAYS:
+                setattr(view, name, getattr(self, name)[start:stop])
+            for name in self.LABELS:
+                setattr(view, name, getattr(self, name))
+            for name in self.TEXT_COLUMNS:
+                setattr(view, name, getattr(self, name).slice(start, stop))
+            views[(start, stop)] = view
+        return view
+
+    def replay(self, version: int) -> 'ColumnSnapshot':
+        """This snapshot brought up to date by re-reading only the rows changed since its watermark"""
+        latest = latest_change()
+        watermark = settled_change(latest)
+        changed = list(
+            ChangeLog.objects.filter(entity=self.ENTITY, id__gt=self.watermark, id__lte=latest)
+            .values_list('object_id', flat=True).distinct()
+        )
+        if not changed:
+            current = copy.copy(self)
+            current.version, current.watermark = version, watermark
+            # Row views carry the version they were taken at
+            current.__dict__.pop('_views', None)
+            return current
+        if len(changed) > self.MAX_REPLAY_ROWS:
+            return self.from_rows(*self.read_rows(), version=version)
+        # Changed ids missing from the table were deleted. The rows may be
+        # newer than watermark; changes after it are then replayed again.
+        # That includes those past an open gap, read here already.
+        rows, _ = self.read_rows(changed)
+        return self.merge(self.from_rows(rows, watermark, version), changed)
+
+    def merge(self, patch: 'ColumnSnapshot', replaced_ids: List[int]) -> 'ColumnSnapshot':
+        """This snapshot with the rows of replaced_ids swapped for patch's rows, in id order"""
+        keep = np.flatnonzero(~np.isin(self.ids, np.asarray(replaced_ids, dtype=np.int64)))
+        order = np.argsort(np.concatenate([self.ids[keep], patch.ids]), kind='stable')
+        # Rows of the merged snapshot, numbered through this snapshot's rows then patch's
+        rows = np.concatenate([keep, len(self) + np.arange(len(patch))])[order]
+
+        def combined(name):
+            return np.concatenate([getattr(self, name), getattr(patch, name)])
+
+        merged = self.__class__.__new__(self.__class__)
+        merged.version, merged.watermark = patch.version, patch.watermark
+        for name in self.LABELS:
+            setattr(merged, name, getattr(patch, name))
+        for name in self.ARRAYS:
+            if name not in self.CODES:
+                setattr(merged, name, combined(name)[rows])
+        for name, labels in self.CODES.items():
+            values = np.concatenate([
+                np.array(getattr(self, labels), dtype=object)[getattr(self, name)],
+                np.array(getattr(patch, labels), dtype=object)[getattr(patch, name)],
+            ])
+            codes, merged_labels = intern_codes(values[rows].tolist())
+            setattr(merged, name, codes)
+            setattr(merged, labels, merged_labels)
+        for name in self.TEXT_COLUMNS:
+            setattr(merged, name, TextColumn.take([getattr(self, name), getattr(patch, name)], rows))
+        return merged
+
+    def to_arrays(self) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+        arrays = {name: getattr(self, name) for name in self.ARRAYS}
+        for name in self.TEXT_COLUMNS:
+            column = getattr(self, name)
+            arrays[f'{name}.text'] = np.frombuffer(column.text, dtype=np.uint8, count=column.end - column.base, offset=column.base)
+            arrays[f'{name}.starts'] = column.starts
+        meta = {
+            'format': SNAPSHOT_FORMAT, 'version': self.version, 'watermark': self.watermark,
+            **{name: getattr(self, name) for name in self.LABELS},
+        }
+        return arrays, meta
+
+    @classmethod
+    def attach(cls, mapped: MappedFile) -> 'ColumnSnapshot':
+        """A snapshot reading straight from a mapped file written from to_arrays()"""
+        snapshot = cls.__new__(cls)
+        snapshot.version = mapped.meta['version']
+        snapshot.watermark = mapped.meta['watermark']
+        for name in cls.ARRAYS:
+            setattr(snapshot, name, mapped.arrays[name])
+        for name in cls.LABELS:
+            setattr(snapshot, name, mapped.meta[name])
+        for name in cls.TEXT_COLUMNS:
+            text = f'{name}.text'
+            setattr(snapshot, name, TextColumn.attach(
+                mapped.buffer, mapped.offsets[text], mapped.arrays[text].nbytes, mapped.arrays[f'{name}.starts']
+            ))
+        return snapshot
+
+
+class MemberSnapshot(ColumnSnapshot):
+    """Read-only column-wise copy of the member table used for scoring"""
+
+    MODEL = NetworkMember
+    ENTITY = ChangeLog.ENTITY_MEMBER
+    FIELDS = (
+        'id', 'first_name', 'last_name', 'region', 'session', 'pod', 'location', 'skills', 'additional_info',
+        'place', 'latitude', 'longitude',
+    )
+
+    ARRAYS = (
+        'ids', 'region_codes', 'session_codes', 'pod_codes', 'place_codes', 'skill_bits', 'latitudes', 'longitudes',
+    )
+    LABELS = ('region_labels', 'session_labels', 'pod_labels', 'place_labels', 'skill_vocabulary')
+    TEXT_COLUMNS = ('location', 'location_labels', 'skills', 'additional_info', 'search_text')
+    CODES = {
+        'region_codes': 'region_labels', 'session_codes': 'session_labels', 'pod_codes': 'pod_labels',
+        'place_codes': 'place_labels',
+    }
+
+    def __init__(self, rows: List[tuple], skill_vocabulary: List[str], version: int, watermark: int = 0):
+        self.version = version
+        self.watermark = watermark
+        columns = list(zip(*rows)) if rows else [()] * len(self.FIELDS)
+        (ids, first_names, last_names, regions, sessions, pods,
+         locations, skills, additional_info, places, latitudes, longitudes) = columns
+
+        self.ids = np.array(ids, dtype=np.int64)
+        # NaN for members whose location is not in the gazetteer
+        self.latitudes = np.array(latitudes, dtype=np.float64)
+        self.longitudes = np.array(longitudes, dtype=np.float64)
+        self.region_codes, self.region_labels = intern_codes(regions)
+        self.session_codes, self.session_labels = intern_codes(sessions)
+        self.pod_codes, self.pod_labels = intern_codes(pods)
+        self.place_codes, self.place_labels = intern_codes(places)
+        # Original-case locations, only read when rendering match reasons
+        self.location_labels = TextColumn(locations, lower=False)
+
+        self.location = TextColumn(locations)
+        self.skills = TextColumn(skills)
+        self.additional_info = TextColumn(additional_info)
+        self.search_text = TextColumn(
+            f"{first} {last} {member_skills or ''} {info or ''}"
+            for first, last, member_skills, info in zip(first_names, last_names, skills, additional_info)
+        )
+
+        # One bit per (member, vocabulary phrase found in their skills)
+        self.skill_vocabulary = {term: position for position, term in enumerate(skill_vocabulary)}
+        bits = np.zeros((len(self.ids), len(skill_vocabulary)), dtype=bool)
+        for term, position in self.skill_vocabulary.items():
+            bits[:, position] = self.skills.contains(term)
+        self.skill_bits = np.packbits(bits, axis=1)
+
+    @classmethod
+    def build(cls, skill_vocabulary: List[str], version: int) -> 'MemberSnapshot':
+        rows, watermark = cls.read_rows()
+        return cls(rows, skill_vocabulary, version, watermark)
+
+    def from_rows(self, rows: List[tuple], watermark: int, version: int) -> 'MemberSnapshot':
+        return MemberSnapshot(rows, list(self.skill_vocabulary), version, watermark)
+
+    def skills_contain(self, term: str) -> np.ndarray:
+        """Boolean mask of members whose skills contain term"""
+        term = term.lower()
+        position = self.skill_vocabulary.get(term)
+        if position is None:
+            return self.skills.contains(term)
+        return ((self.skill_bits[:, position >> 3] >> (7 - (position & 7))) & 1).astype(bool)
+
+    def pods_contain(self, term: str) -> np.ndarray:
+        """Boolean mask of members whose pod contains term, tested once per distinct pod"""
+        term = term.lower()
+        matching = [code for code, label in enumerate(self.pod_labels) if term in (label or '').lower()]
+        return np.isin(self.pod_codes, matching)
+
+    def in_area(self, area: Place) -> np.ndarray:
+        """Boolean mask of members placed in a state or country, tested once per distinct place"""
+        within = set(get_gazetteer().labels_within(area))
+        return np.isin(self.place_codes, [code for code, label in enumerate(self.place_labels) if label in within])
+
+    @property
+    def geo_index(self) -> GridIndex:
+        """Grid index over the members' coordinates, built on first use"""
+        index = getattr(self, '_geo_index', None)
+        if index is None:
+            index = self._geo_index = GridIndex(
+                self.latitudes, self.longitudes, getattr(settings, 'GEO_CELL_DEGREES', 0.5)
+            )
+        return index
+
+    def distances(self, latitude: float, longitude: float, radius_km: float) -> np.ndarray:
+        """Each member's distance in km from the point, inf beyond radius_km or without coordinates"""
+        distances = np.full(len(self), np.inf)
+        rows, within = self.geo_index.within(latitude, longitude, radius_km)
+        distances[rows] = within
+        return distances
+
+    def filter_mask(self, filters: Dict = None) -> np.ndarray:
+        """Boolean mask of members matching the region/session/pod filters and the near place"""
+        mask = np.ones(len(self), dtype=bool)
+        if filters:
+            for field, codes, labels in (
+                ('region', self.region_codes, self.region_labels),
+                ('session', self.session_codes, self.session_labels),
+                ('pod', self.pod_codes, self.pod_labels),
+            ):
+                if filters.get(field):
+                    if filters[field] in labels:
+                        mask &= codes == labels.index(filters[field])
+                    else:
+                        mask[:] = False
+            if filters.get('near'):
+                mask &= self.near_mask(filters['near'])
+        return mask
+
+    def near_mask(self, near: List) -> np.ndarray:
+        """Boolean mask of members matching near_params: in its area if it has one, else in its circle"""
+        latitude, longitude, radius_km, area = near
+        place = get_gazetteer().place(area) if area else None
+        if place is not None:
+            return self.in_area(place)
+        return self.distances(latitude, longitude, radius_km) <= radius_km
+
+
+class ProjectSnapshot(ColumnSnapshot):
+    """Read-only column-wise copy of the project table used for scoring"""
+
+    MODEL = Project
+    ENTITY = ChangeLog.ENTITY_PROJECT
+    FIELDS = ('id', 'title', 'type', 'what_are_they_looking_for', 'additional_info')
+
+    ARRAYS = ('ids', 'type_codes')
+    LABELS = ('type_labels',)
+    TEXT_COLUMNS = ('description', 'search_text')
+    CODES = {'type_codes': 'type_labels'}
+
+    def __init__(self, rows: List[tuple], version: int, watermark: int = 0):
+        self.version = version
+        self.watermark = watermark
+        columns = list(zip(*rows)) if rows else [()] * len(self.FIELDS)
+        ids, titles, types, looking_for, additional_info = columns
+
+        self.ids = np.array(ids, dtype=np.int64)
+        self.type_codes, self.type_labels = intern_codes(types)
+        self.description = TextColumn(
+            f"{wanted or ''} {info or ''}" for wanted, info in zip(looking_for, additional_info)
+        )
+        self.search_text = TextColumn(
+            f"{title} {wanted or ''} {info or ''}"
+            for title, wanted, info in zip(titles, looking_for, additional_info)
+        )
+
+    @classmethod
+    def build(cls, version: int) -> 'ProjectSnapshot':
+        rows, watermark = cls.read_rows()
+        return cls(rows, version, watermark)
+
+    def from_rows(self, rows: List[tuple], watermark: int, version: int) -> 'ProjectSnapshot':
+        return ProjectSnapshot(rows, version, watermark)
+
+    def type_is(self, project_type: str) -> np.ndarray:
+        if project_type not in self.type_labels:
+            return np.zeros(len(self), dtype=bool)
+        return self.type_codes == self.type_labels.index(project_type)
+
+
+def shared_snapshot_dir() -> Optional[Path]:
+    """Directory snapshots are shared through, or None to keep them per process"""
+    directory = getattr(settings, 'SEARCH_SNAPSHOT_DIR', None)
+    return Path(directory) if directory else None
+
+
+def current_generation(directory: Path, name: str) -> Optional[int]:
+    try:
+        return int((directory / f'{name}.current').read_text())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def publish_snapshot(directory: Path, name: str, snapshot: ColumnSnapshot) -> int:
+    """Write snapshot as the next generation of name and point readers at it.
+
+    The generation file is complete before the pointer file is atomically
+    replaced, so readers see either the old generation or the new one.
+    Older generations are removed; processes still mapping them keep
+    reading them until they attach to the new one.
+    """
+    generation = (current_generation(directory, name) or 0) + 1
+    write_mapped(directory / f'{name}.{generation}.snap', *snapshot.to_arrays())
+
+    pointer = directory / f'{name}.current'
+    temporary = pointer.with_name(f'.{pointer.name}.{os.getpid()}.tmp')
+    temporary.write_text(str(generation))
+    os.replace(temporary, pointer)
+
+    for path in directory.glob(f'{name}.*.snap'):
+        older = path.name[len(name) + 1:-len('.snap')]
+        if older.isdigit() and int(older) < generation - 1:
+            path.unlink(missing_ok=True)
+    return generation
+
+
+def attach_snapshot(directory: Path, name: str) -> Optional[MappedFile]:
+    """Map the current generation of name, if one has been published"""
+    generation = current_generation(directory, name)
+    if generation is None:
+        return None
+    try:
+        return MappedFile(directory / f'{name}.{generation}.snap')
+    except FileNotFoundError:
+        # Replaced between reading the pointer and opening the file
+        return None
+
+
+# How long a worker waits for another process to publish a snapshot before building its own
+SHARED_BUILD_WAIT = 5
+SHARED_BUILD_LOCK_TIMEOUT = 60
+SHARED_POLL_INTERVAL = 0.05
+
+
+def load_shared_snapshot(name: str, snapshot_class, version: int,
+                         build: Callable[[], ColumnSnapshot],
+                         matches: Callable[[MappedFile], bool] = lambda mapped: True) -> ColumnSnapshot:
+    """The snapshot for version, attached from the shared directory when possible.
+
+    Without ``SEARCH_SNAPSHOT_DIR`` this just builds it. Otherwise a
+    published generation at the right version is mapped read-only. When
+    the published one is older, one process takes a build lock in the
+    shared cache, replays the changes since its watermark (or builds from
+    scratch if nothing usable is published) and publishes the result,
+    while the others wait for it to appear.
+    """
+    directory = shared_snapshot_dir()
+    if directory is None:
+        return build()
+
+    def published() -> Optional[ColumnSnapshot]:
+        mapped = attach_snapshot(directory, name)
+        if mapped is not None and mapped.meta.get('format') == SNAPSHOT_FORMAT and matches(mapped):
+            return snapshot_class.attach(mapped)
+        return None
+
+    def bring_up_to_date(stale: Optional[ColumnSnapshot]) -> ColumnSnapshot:
+        return stale.replay(version) if stale is not None else build()
+
+    snapshot = published()
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+
+    lock_key = f'snapshot-build:{name}:{version}'
+    if cache.add(lock_key, os.getpid(), SHARED_BUILD_LOCK_TIMEOUT):
+        try:
+            snapshot = bring_up_to_date(snapshot)
+            publish_snapshot(directory, name, snapshot)
+            return snapshot
+        finally:
+            cache.delete(lock_key)
+
+    stale = snapshot
+    deadline = time.monotonic() + SHARED_BUILD_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(SHARED_POLL_INTERVAL)
+        snapshot = published()
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+    return bring_up_to_date(stale)
+
+
+def publish_stale_snapshots(skill_vocabulary: List[str]) -> List[Tuple[str, int, int, str, float]]:
+    """Publish new generations of the snapshots whose data changed since they were published.
+
+    Published snapshots are brought up to date by replaying their changes
+    when possible. Returns (name, generation, rows, how, milliseconds) for
+    each snapshot published.
+    """
+    directory = shared_snapshot_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    published = []
+    for name, snapshot_class, model, build in (
+        ('members', MemberSnapshot, NetworkMember, lambda version: MemberSnapshot.build(skill_vocabulary, version)),
+        ('projects', ProjectSnapshot, Project, lambda version: ProjectSnapshot.build(version)),
+    ):
+        version = get_version(model)
+        mapped = attach_snapshot(directory, name)
+        if mapped is not None and mapped.meta['version'] == version:
+            continue
+        start = time.perf_counter()
+        if (mapped is not None and mapped.meta.get('format') == SNAPSHOT_FORMAT
+                and list(mapped.meta.get('skill_vocabulary', skill_vocabulary)) == list(skill_vocabulary)):
+            snapshot = snapshot_class.attach(mapped).replay(version)
+            how = f"replayed changes since {mapped.meta['watermark']}"
+        else:
+            snapshot = build(version)
+            how = 'built'
+        generation = publish_snapshot(directory, name, snapshot)
+        published.append((name, generation, len(snapshot), how, (time.perf_counter() - start) * 1000))
+    return published
+
+
+_lock = threading.Lock()
+_member_snapshot: Optional[MemberSnapshot] = None
+_project_snapshot: Optional[ProjectSnapshot] = None
+
+
+def get_member_snapshot(skill_vocabulary: List[str]) -> MemberSnapshot:
+    """Return the process-wide member snapshot, rebuilding or reattaching it if members changed"""
+    global _member_snapshot
+    version = get_version(NetworkMember)
+    snapshot = _member_snapshot
+    if snapshot is None or snapshot.version != version:
+        with _lock:
+            snapshot = _member_snapshot
+            if snapshot is None or snapshot.version != version:
+                # Built from the version read before loading, so a write
+                # during the build triggers another rebuild next time
+                snapshot = _member_snapshot = load_shared_snapshot(
+                    'members', MemberSnapshot, version,
+                    lambda: MemberSnapshot.build(skill_vocabulary, version),
+                    lambda mapped: list(mapped.meta['skill_vocabulary']) == list(skill_vocabulary),
+                )
+    return snapshot
+
+
+def get_project_snapshot() -> ProjectSnapshot:
+    """Return the process-wide project snapshot, rebuilding or reattaching it if projects changed"""
+    global _project_snapshot
+    version = get_version(Project)
+    snapshot = _project_snapshot
+    if snapshot is None or snapshot.version != version:
+        with _lock:
+            snapshot = _project_snapshot
+            if snapshot is None or snapshot.version != version:
+                snapshot = _project_snapshot = load_shared_snapshot(
+                    'projects', ProjectSnapshot, version, lambda: ProjectSnapshot.build(version)
+                )
+    return snapshot
+
+
+def refresh_snapshots(entities: Iterable[str]):
+    """Replay recent changes into this process's snapshots of entities.
+
+    Called by the outbox consumer, so the next search finds the snapshot
+    current instead of rebuilding it. Shared snapshots are left to the
+    worker or builder that publishes the next generation.
+    """
+    global _member_snapshot, _project_snapshot
+    if shared_snapshot_dir() is not None:
+        return
+    entities = set(entities)
+    with _lock:
+        if ChangeLog.ENTITY_MEMBER in entities and _member_snapshot is not None:
+            _member_snapshot = _member_snapshot.replay(get_version(NetworkMember))
+        if ChangeLog.ENTITY_PROJECT in entities and _project_snapshot is not None:
+            _project_snapshot = _project_snapshot.replay(get_version(Project))
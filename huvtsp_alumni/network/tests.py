@@ -1,9 +1,55 @@
 from django.test import TestCase
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import RequestFactory, override_settings
+from django.http import HttpResponse
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APITestCase
 from rest_framework import status
-from .models import NetworkMember, Organization, Project
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.renderers import JSONRenderer
+from rest_framework.serializers import ListSerializer
+from django.core.management import call_command
+from unittest.mock import Mock, patch
+from io import StringIO
+from datetime import date, timedelta
+import threading
+import numpy as np
+import time
+from pathlib import Path
+import json
+import gzip
+import shutil
+import tempfile
+from .models import NetworkMember, Organization, Experience, Project, SearchTracking, ChangeLog, OutboxCheckpoint, Job, Resources, SocialLink
 from .services import IntelligentMatchingService
+from .typeahead import RangeMinimum, TypeaheadIndex
+from . import snapshot as snapshot_module
+from .snapshot import (
+    MemberSnapshot, TextColumn, current_generation, get_member_snapshot, get_project_snapshot, latest_change,
+    publish_snapshot,
+)
+from .keywords import KeywordAutomaton, get_keyword_automaton
+from .outbox import OutboxConsumer, apply_to_worker, sync_embedding_indexes
+from .jobs import TASKS, JobWorker, enqueue
+from .geo import GridIndex, get_gazetteer, haversine_km
+from .versions import get_last_modified, get_version, get_versions
+from .parallel import ShardedScorer, get_sharded_scorer
+from .views import ChangeFeedViewSet
+from .bundles import BundleExporter
+from .renderers import FastJSONRenderer
+from .fragments import FragmentCache, get_fragment_cache
+from .singleflight import SingleFlight
+from .admission import AdmissionController
+from .middleware import ReplicaRoutingMiddleware
+from .pooling import pool_metrics
+from .ann import IVFIndex, batch_updates, get_embedding_index, index_path, normalize, update_embeddings
+from .embedding_store import EmbeddingStore
+from .query_embeddings import QueryEmbeddingCache, QueryEmbeddingStore, get_query_embedding_cache
+from .routers import PrimaryReplicaRouter, get_read_database, reset_read_database, set_read_database
+from .serializers import NetworkMemberSerializer
 
 
 class IntelligentMatchingServiceTest(TestCase):
@@ -152,6 +198,38 @@ class IntelligentMatchingServiceTest(TestCase):
         self.assertIsNotNone(startup_result)
         self.assertGreater(startup_result['relevance_score'], 0)
     
+    def test_search_projects_prefetches_founders(self):
+        """Test founders are loaded with one prefetch rather than per project"""
+        self.startup_project.founders.add(self.designer, self.developer)
+        Project.objects.create(
+            title="Marketing Hub",
+            type="ST",
+            stage="J",
+            what_are_they_looking_for="Looking for marketing help for our startup.",
+            slug="marketing-hub"
+        ).founders.add(self.marketer)
+        processed_query = self.matching_service.process_query("need marketing for a startup")
+        
+        # The change version, scoring, hydration and the founders prefetch
+        with self.assertNumQueries(4):
+            results = self.matching_service.search_projects(processed_query)
+        
+        self.assertEqual(len(results), 2)
+        dashboard = next(r for r in results if r['data']['title'] == 'Founder Dashboard')
+        self.assertCountEqual(
+            [f['first_name'] for f in dashboard['data']['founders']], ['Alex', 'James']
+        )
+    
+    def test_search_members_limit(self):
+        """Test only the top results are hydrated when a limit is given"""
+        processed_query = self.matching_service.process_query("looking for marketing people")
+        all_results = self.matching_service.search_members(processed_query)
+        top_results = self.matching_service.search_members(processed_query, limit=1)
+        
+        self.assertGreater(len(all_results), 1)
+        self.assertEqual(top_results, all_results[:1])
+        self.assertNotIn('avatar', top_results[0]['data'])
+    
     def test_search_organizations_fintech(self):
         """Test searching for fintech organizations"""
         query = "Is anyone in FinTech Nexus?"
@@ -173,11 +251,1670 @@ class IntelligentMatchingServiceTest(TestCase):
         self.assertTrue(any('graphic design' in suggestion.lower() for suggestion in suggestions))
 
 
+class MemberSnapshotTest(TestCase):
+    """Test cases for the column-wise member snapshot"""
+    
+    def setUp(self):
+        """Set up test data"""
+        self.designer = NetworkMember.objects.create(
+            first_name="Alex",
+            last_name="Chen",
+            skills="Graphic Design, UI/UX",
+            location="San Francisco, CA",
+            region="NA",
+            pod="Stripe",
+            session="S1",
+            email="alex.chen@example.com"
+        )
+        self.service = IntelligentMatchingService()
+    
+    def test_text_column_contains(self):
+        """Test substring search never matches across row boundaries"""
+        column = TextColumn(["Boston, MA", None, "Toronto", "bos"])
+        
+        self.assertEqual(column.contains("bos").tolist(), [True, False, False, True])
+        self.assertEqual(column.contains("ma").tolist(), [True, False, False, False])
+        self.assertEqual(column.contains("a\x00t").tolist(), [False, False, False, False])
+    
+    def test_empty_text_column(self):
+        """Test a column over no rows has no rows"""
+        column = TextColumn([])
+        self.assertEqual(len(column), 0)
+        self.assertEqual(len(column.contains('design')), 0)
+    
+    def test_text_column_slice(self):
+        """Test a slice of a column holds just its rows and searches only them"""
+        column = TextColumn(["Boston, MA", None, "Toronto", "bos"])
+        
+        middle = column.slice(1, 3)
+        self.assertEqual([middle[row] for row in range(len(middle))], ["", "toronto"])
+        self.assertEqual(middle.contains("bos").tolist(), [False, False])
+        self.assertEqual(column.slice(2, 4).contains("bos").tolist(), [False, True])
+        self.assertEqual(len(column.slice(4, 4)), 0)
+    
+    def test_skill_bitmap_matches_substring_search(self):
+        """Test vocabulary bits agree with a plain substring search"""
+        snapshot = get_member_snapshot(self.service.SKILL_VOCABULARY)
+        
+        for term in ['design', 'graphic design', 'ui/ux', 'logo', 'python']:
+            self.assertEqual(
+                snapshot.skills_contain(term).tolist(), snapshot.skills.contains(term).tolist()
+            )
+        self.assertTrue(snapshot.skills_contain('graphic design')[0])
+    
+    def test_rebuilt_after_member_changes(self):
+        """Test saving a member invalidates the snapshot"""
+        processed_query = self.service.process_query("looking for python people")
+        self.assertEqual(self.service.search_members(processed_query), [])
+        
+        self.designer.skills = "Python"
+        self.designer.save()
+        
+        results = self.service.search_members(processed_query)
+        self.assertEqual([r['data']['first_name'] for r in results], ['Alex'])
+        self.assertEqual(results[0]['match_reason'], "Has python skills")
+
+
+
+class SharedSnapshotTest(TestCase):
+    """Test cases for snapshots shared between workers through SEARCH_SNAPSHOT_DIR"""
+    
+    def setUp(self):
+        """Set up test data"""
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        NetworkMember.objects.create(
+            first_name="Alex", last_name="Chen", skills="Graphic Design, Python",
+            location="Boston, MA", region="NA", pod="Stripe", session="S1", email="alex.chen@example.com"
+        )
+        Project.objects.create(
+            title="Design Studio", type="ST", stage="J", slug="design-studio",
+            what_are_they_looking_for="Looking for brand designers"
+        )
+        self.service = IntelligentMatchingService()
+        cache.clear()
+        self.forget_snapshots()
+        self.addCleanup(self.forget_snapshots)
+    
+    def forget_snapshots(self):
+        """Drop this process's snapshots, as a freshly started worker would have none"""
+        snapshot_module._member_snapshot = None
+        snapshot_module._project_snapshot = None
+    
+    def test_worker_attaches_published_snapshot(self):
+        """Test a second worker maps the published generation and gets the same results"""
+        processed_query = self.service.process_query("looking for design people")
+        with override_settings(SEARCH_SNAPSHOT_DIR=str(self.directory)):
+            built = self.service.search_members(processed_query)
+            self.assertEqual(current_generation(self.directory, 'members'), 1)
+            
+            self.forget_snapshots()
+            attached = get_member_snapshot(self.service.SKILL_VOCABULARY)
+            self.assertFalse(attached.ids.flags.owndata or attached.ids.flags.writeable)
+            self.assertEqual(self.service.search_members(processed_query), built)
+            self.assertEqual(current_generation(self.directory, 'members'), 1)
+    
+    def test_changes_publish_new_generation(self):
+        """Test a write publishes the next generation and older ones are removed"""
+        with override_settings(SEARCH_SNAPSHOT_DIR=str(self.directory)):
+            for expected in range(1, 4):
+                get_project_snapshot()
+                self.assertEqual(current_generation(self.directory, 'projects'), expected)
+                Project.objects.create(title=f"Project {expected}", type="ST", stage="J", slug=f"project-{expected}")
+            self.assertEqual(
+                sorted(path.name for path in self.directory.glob('projects.*.snap')),
+                ['projects.2.snap', 'projects.3.snap']
+            )
+    
+    def test_build_command(self):
+        """Test the builder command publishes only when the data changed"""
+        with override_settings(SEARCH_SNAPSHOT_DIR=str(self.directory)):
+            output = StringIO()
+            call_command('build_search_snapshots', stdout=output)
+            self.assertIn('members: generation 1', output.getvalue())
+            self.assertIn('projects: generation 1', output.getvalue())
+            
+            output = StringIO()
+            call_command('build_search_snapshots', stdout=output)
+            self.assertEqual(output.getvalue(), '')
+            
+            self.forget_snapshots()
+            self.assertEqual(len(get_member_snapshot(self.service.SKILL_VOCABULARY)), 1)
+            self.assertEqual(current_generation(self.directory, 'members'), 1)
+    
+    def test_restart_replays_changes_since_watermark(self):
+        """Test a restarted worker updates the persisted snapshot with only the later changes"""
+        processed_query = self.service.process_query("looking for python people")
+        with override_settings(SEARCH_SNAPSHOT_DIR=str(self.directory)):
+            get_member_snapshot(self.service.SKILL_VOCABULARY)
+            
+            NetworkMember.objects.create(
+                first_name="Sarah", last_name="Kim", skills="Python, Django", location="Toronto",
+                region="NA", pod="Zoom", session="S2", email="sarah.kim@example.com"
+            )
+            NetworkMember.objects.filter(first_name="Alex").get().delete()
+            # A restart: the cache and this process's snapshots are gone
+            cache.clear()
+            self.forget_snapshots()
+            
+            replayed = get_member_snapshot(self.service.SKILL_VOCABULARY)
+            built = MemberSnapshot.build(self.service.SKILL_VOCABULARY, replayed.version)
+            self.assertEqual(current_generation(self.directory, 'members'), 2)
+            self.assertEqual(replayed.watermark, built.watermark)
+            for name in MemberSnapshot.ARRAYS:
+                np.testing.assert_array_equal(getattr(replayed, name), getattr(built, name))
+            for name in MemberSnapshot.LABELS:
+                self.assertEqual(getattr(replayed, name), getattr(built, name))
+            for name in MemberSnapshot.TEXT_COLUMNS:
+                self.assertEqual(
+                    [getattr(replayed, name)[row] for row in range(len(replayed))],
+                    [getattr(built, name)[row] for row in range(len(built))]
+                )
+            results = self.service.search_members(processed_query)
+            self.assertEqual([r['data']['first_name'] for r in results], ['Sarah'])
+    
+    def test_replay_covers_changes_committed_out_of_order(self):
+        """Test a change whose id is below the watermark but committed later is still replayed"""
+        # The id of a transaction still open while later changes commit
+        gap = ChangeLog.objects.create(entity=ChangeLog.ENTITY_MEMBER, object_id=0).id
+        ChangeLog.objects.filter(id=gap).delete()
+        NetworkMember.objects.create(
+            first_name="Sarah", last_name="Kim", skills="Python", region="NA", pod="Zoom", session="S2",
+            email="sarah.kim@example.com"
+        )
+        snapshot = MemberSnapshot.build(self.service.SKILL_VOCABULARY, 1)
+        self.assertEqual(snapshot.watermark, gap - 1)
+        
+        # The open transaction commits its member and change log entry
+        late = NetworkMember.objects.bulk_create([NetworkMember(
+            first_name="Lee", last_name="Park", region="NA", pod="Zoom", session="S2", email="lee.park@example.com"
+        )])[0]
+        ChangeLog.objects.create(id=gap, entity=ChangeLog.ENTITY_MEMBER, object_id=late.id)
+        replayed = snapshot.replay(2)
+        self.assertIn(late.id, replayed.ids.tolist())
+        self.assertEqual(replayed.watermark, latest_change())
+
+
+class KeywordAutomatonTest(TestCase):
+    """Test cases for the keyword automaton behind query processing"""
+    
+    def setUp(self):
+        """Set up test data"""
+        self.keywords = IntelligentMatchingService.QUERY_KEYWORDS
+        self.automaton = KeywordAutomaton(self.keywords)
+    
+    def test_matches_substring_search(self):
+        """Test the automaton finds exactly the keywords a substring search finds"""
+        queries = [
+            "anyone in boston rn?",
+            "who is interning at rove miles in new york city",
+            "looking for a react native developer from türkiye",
+            "graphic designers for a nonprofit dashboard",
+            "",
+            "nothing to see here",
+        ]
+        for query in queries:
+            self.assertEqual(
+                self.automaton.matches(query), {keyword for keyword in self.keywords if keyword in query}
+            )
+        self.assertEqual(KeywordAutomaton(['', 'ab']).matches('xyz'), {''})
+    
+    def test_persisted_automaton(self):
+        """Test the automaton is saved once and mapped by later processes"""
+        directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        with override_settings(SEARCH_SNAPSHOT_DIR=str(directory)), \
+                patch('network.keywords._automaton', None):
+            get_keyword_automaton(self.keywords)
+            self.assertTrue((directory / 'keywords.snap').exists())
+        
+        loaded = KeywordAutomaton.load(directory / 'keywords.snap')
+        self.assertEqual(loaded.keywords, self.keywords)
+        self.assertFalse(loaded.transitions.flags.writeable)
+        self.assertEqual(loaded.matches("python folks in toronto"), {'python', 'toronto'})
+
+
+class OutboxTest(APITestCase):
+    """Test cases for the change log outbox and its consumers"""
+    
+    def setUp(self):
+        """Set up test data"""
+        self.member = NetworkMember.objects.create(
+            first_name="Alex", last_name="Chen", skills="Graphic Design", location="Boston, MA",
+            region="NA", pod="Stripe", session="S1", email="alex.chen@example.com"
+        )
+        self.applied = []
+    
+    def record(self, changes):
+        self.applied.append((dict(changes.upserted), dict(changes.deleted)))
+    
+    def test_change_log_commits_with_the_change(self):
+        """Test a save whose change log entry fails is rolled back too"""
+        entries = ChangeLog.objects.count()
+        with patch('network.signals.ChangeLog.objects.create', side_effect=RuntimeError), \
+                self.assertRaises(RuntimeError):
+            NetworkMember.objects.create(
+                first_name="Sarah", last_name="Kim", region="NA", pod="Zoom", session="S2",
+                email="sarah.kim@example.com"
+            )
+        self.assertFalse(NetworkMember.objects.filter(email="sarah.kim@example.com").exists())
+        self.assertEqual(ChangeLog.objects.count(), entries)
+    
+    def test_durable_consumer_resumes_from_checkpoint(self):
+        """Test changes are applied once in order and the checkpoint survives a restart"""
+        consumer = OutboxConsumer('test', self.record, durable=True)
+        consumer.poll()
+        self.applied.clear()
+        
+        sarah = NetworkMember.objects.create(
+            first_name="Sarah", last_name="Kim", region="NA", pod="Zoom", session="S2",
+            email="sarah.kim@example.com"
+        )
+        sarah_id = sarah.id
+        self.member.skills = "Python"
+        self.member.save()
+        sarah.delete()
+        
+        self.assertEqual(consumer.poll(), 3)
+        self.assertEqual(self.applied, [({'members': {self.member.id}}, {'members': {sarah_id}})])
+        self.assertEqual(OutboxCheckpoint.objects.get(name='test').position, ChangeLog.objects.last().id)
+        
+        restarted = OutboxConsumer('test', self.record, durable=True)
+        self.assertEqual(restarted.poll(), 0)
+        
+        response = self.client.get('/api/stats/outbox/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['checkpoints'][0]['position'], response.data['latest'])
+    
+    def test_checkpoint_waits_at_gap(self):
+        """Test the checkpoint stays before an entry that is not visible yet, until the gap times out"""
+        consumer = OutboxConsumer('test', self.record)
+        first = ChangeLog.objects.create(entity='members', object_id=self.member.id, action='upsert')
+        missing = ChangeLog.objects.create(entity='members', object_id=self.member.id, action='upsert')
+        last = ChangeLog.objects.create(entity='members', object_id=self.member.id, action='upsert')
+        # As if missing's transaction had not committed yet
+        missing.delete()
+        
+        consumer.poll()
+        self.assertEqual(consumer.position, first.id)
+        consumer.poll()
+        self.assertEqual(consumer.position, first.id)
+        self.assertEqual(len(self.applied), 2)
+        
+        with patch.object(OutboxConsumer, 'GAP_TIMEOUT', 0):
+            consumer.poll()
+        self.assertEqual(consumer.position, last.id)
+    
+    def test_worker_replays_snapshot(self):
+        """Test the worker consumer updates the search snapshot without a rebuild"""
+        self.addCleanup(setattr, snapshot_module, '_member_snapshot', None)
+        vocabulary = IntelligentMatchingService.SKILL_VOCABULARY
+        get_member_snapshot(vocabulary)
+        consumer = OutboxConsumer('worker', apply_to_worker)
+        
+        sarah = NetworkMember.objects.create(
+            first_name="Sarah", last_name="Kim", skills="Python", region="NA", pod="Zoom", session="S2",
+            email="sarah.kim@example.com"
+        )
+        consumer.poll()
+        with patch.object(MemberSnapshot, 'build', side_effect=AssertionError('rebuilt')):
+            snapshot = get_member_snapshot(vocabulary)
+        self.assertEqual(snapshot.ids.tolist(), [self.member.id, sarah.id])
+        self.assertTrue(snapshot.skills_contain('python')[1])
+
+class JobQueueTest(TestCase):
+    """Test cases for the background job queue"""
+    
+    def setUp(self):
+        """Register test tasks"""
+        self.calls = []
+        tasks = patch.dict(TASKS, {'test.record': self.record, 'test.broken': self.broken})
+        tasks.start()
+        self.addCleanup(tasks.stop)
+        self.worker = JobWorker('test-worker')
+    
+    def record(self, context, name):
+        self.calls.append(name)
+        context.progress(1, 2, 'halfway')
+        return {'name': name}
+    
+    def broken(self, context):
+        raise RuntimeError('boom')
+    
+    def test_identical_pending_jobs_are_deduplicated(self):
+        """Test queueing an identical job returns the waiting one, moved up to the higher priority"""
+        job = enqueue('test.record', name='a')
+        duplicate = enqueue('test.record', priority=Job.PRIORITY_HIGH, name='a')
+        other = enqueue('test.record', name='b')
+        
+        self.assertEqual(duplicate.id, job.id)
+        self.assertEqual(duplicate.priority, Job.PRIORITY_HIGH)
+        self.assertNotEqual(other.id, job.id)
+        self.assertEqual(Job.objects.count(), 2)
+        with self.assertRaises(ValueError):
+            enqueue('test.missing')
+    
+    def test_worker_runs_highest_priority_first(self):
+        """Test jobs run by priority and record their result, progress and duration"""
+        enqueue('test.record', priority=Job.PRIORITY_LOW, name='low')
+        enqueue('test.record', priority=Job.PRIORITY_HIGH, name='high')
+        enqueue('test.record', name='later', run_after=timezone.now() + timedelta(hours=1))
+        
+        self.worker.run(0, once=True)
+        self.assertEqual(self.calls, ['high', 'low'])
+        
+        job = Job.objects.get(args={'name': 'high'})
+        self.assertEqual(job.status, Job.STATUS_SUCCEEDED)
+        self.assertEqual(job.result, {'name': 'high'})
+        self.assertEqual(job.progress, 1.0)
+        self.assertEqual(job.progress_message, 'halfway')
+        self.assertEqual(job.worker, 'test-worker')
+        self.assertGreaterEqual(job.duration.total_seconds(), 0)
+        self.assertEqual(Job.objects.get(args={'name': 'later'}).status, Job.STATUS_PENDING)
+    
+    def test_failed_job_retries_with_backoff(self):
+        """Test a failing job is retried with a growing delay until it runs out of attempts"""
+        job = enqueue('test.broken')
+        
+        with self.assertLogs('network.jobs', 'ERROR'):
+            self.worker.run_one()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_PENDING)
+        self.assertIn('boom', job.last_error)
+        first_delay = job.run_after - job.finished_at
+        self.assertEqual(first_delay.total_seconds(), JobWorker.RETRY_BACKOFF)
+        self.assertIsNone(self.worker.run_one())
+        
+        for _ in range(2):
+            Job.objects.filter(id=job.id).update(run_after=timezone.now())
+            with self.assertLogs('network.jobs', 'ERROR'):
+                self.worker.run_one()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_FAILED)
+        self.assertEqual(job.attempts, 3)
+        self.assertEqual(self.worker.failed, 3)
+    
+    def test_stale_running_job_is_retried(self):
+        """Test a job left running by a worker that stopped sending heartbeats is queued again"""
+        job = enqueue('test.record', name='a')
+        self.worker.claim()
+        Job.objects.filter(id=job.id).update(heartbeat_at=timezone.now() - timedelta(hours=1))
+        
+        self.assertEqual(JobWorker('other').requeue_stale(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_PENDING)
+        self.assertIn('test-worker', job.last_error)
+    
+    def test_admin_lists_jobs(self):
+        """Test the admin job list shows queued jobs"""
+        enqueue('test.record', name='a')
+        admin = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(admin)
+        
+        response = self.client.get('/admin/network/job/')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'test.record')
+
+class GeoSearchTest(APITestCase):
+    """Test cases for gazetteer locations and near= searches"""
+    
+    def setUp(self):
+        """Set up members in and around Boston and elsewhere"""
+        self.addCleanup(setattr, snapshot_module, '_member_snapshot', None)
+        self.members = {}
+        for index, location in enumerate(["Boston, MA", "Cambridge, MA", "San Francisco, CA", "Mars"]):
+            self.members[location] = NetworkMember.objects.create(
+                first_name=f"Member{index}", last_name="Geo", skills="Python", location=location,
+                region="NA", pod="Stripe", session="S1", email=f"geo{index}@example.com"
+            )
+    
+    def member_ids(self, *locations):
+        return {self.members[location].id for location in locations}
+    
+    def test_locations_resolve_to_places(self):
+        """Test saving a member stores the gazetteer place and coordinates of its location"""
+        cambridge = NetworkMember.objects.get(id=self.members["Cambridge, MA"].id)
+        self.assertEqual(cambridge.place, "Cambridge, MA, United States")
+        self.assertAlmostEqual(cambridge.latitude, 42.3736)
+        self.assertEqual(NetworkMember.objects.get(id=self.members["Mars"].id).place, "")
+        
+        gazetteer = get_gazetteer()
+        self.assertEqual(gazetteer.resolve("Cambridge, England").country, "United Kingdom")
+        self.assertEqual(gazetteer.resolve("Greater Boston Area").name, "Boston")
+        self.assertIsNone(gazetteer.resolve("Working on it"))
+    
+    def test_grid_index_matches_full_scan(self):
+        """Test radius queries over the grid find exactly the points a full distance scan does"""
+        rng = np.random.default_rng(0)
+        latitudes, longitudes = rng.uniform(-85, 85, 5000), rng.uniform(-180, 180, 5000)
+        latitudes[::10] = np.nan
+        index = GridIndex(latitudes, longitudes, cell_degrees=1.0)
+        
+        for latitude, longitude, radius in [(42.36, -71.06, 500), (0, 179.5, 800), (84, 0, 1500), (10, 10, 1)]:
+            rows, distances = index.within(latitude, longitude, radius)
+            expected = np.flatnonzero(haversine_km(latitude, longitude, latitudes, longitudes) <= radius)
+            self.assertEqual(rows.tolist(), expected.tolist())
+            self.assertTrue((distances <= radius).all())
+    
+    def test_list_near_place(self):
+        """Test the member list keeps members within the radius of near="""
+        response = self.client.get('/api/members/', {'near': 'boston'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual({row['id'] for row in response.data['results']}, self.member_ids("Boston, MA", "Cambridge, MA"))
+        
+        response = self.client.get('/api/members/', {'near': '42.3601,-71.0589', 'radius_km': '1'})
+        self.assertEqual({row['id'] for row in response.data['results']}, self.member_ids("Boston, MA"))
+        
+        response = self.client.get('/api/members/', {'near': 'atlantis'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_smart_search_finds_nearby_members(self):
+        """Test a place in the query matches members near it, and near= filters the results"""
+        response = self.client.get('/api/search/search/', {'q': 'anyone near boston'})
+        results = {result['data']['id']: result['match_reason'] for result in response.data['results']}
+        
+        self.assertLessEqual(self.member_ids("Boston, MA", "Cambridge, MA"), set(results))
+        self.assertNotIn(self.members["Mars"].id, results)
+        self.assertIn("Located in boston", results[self.members["Boston, MA"].id])
+        self.assertIn("Near Boston (4 km)", results[self.members["Cambridge, MA"].id])
+        
+        response = self.client.get('/api/search/search/', {'q': 'python', 'near': 'san francisco'})
+        self.assertEqual([result['data']['id'] for result in response.data['results']],
+                         [self.members["San Francisco, CA"].id])
+    
+    def test_named_state_or_country_beats_same_named_city(self):
+        """Test a city is taken from the state or country the location also names"""
+        gazetteer = get_gazetteer()
+        self.assertEqual(gazetteer.resolve("London, Ontario, Canada").label, "London, ON, Canada")
+        self.assertEqual(gazetteer.resolve("Paris, Texas").label, "Paris, TX, United States")
+        self.assertEqual(gazetteer.resolve("London").country, "United Kingdom")
+        self.assertEqual(gazetteer.resolve("Paris").country, "France")
+        # Two-letter codes support a place but do not rule others out
+        self.assertEqual(gazetteer.resolve("Toronto, CA").label, "Toronto, ON, Canada")
+    
+    def test_countries_match_members_placed_in_them(self):
+        """Test a country in the query or near= matches members in it rather than within its radius"""
+        for index, location in enumerate(["Toronto", "Seattle, WA", "Denver, CO"]):
+            self.members[location] = NetworkMember.objects.create(
+                first_name=f"Member{index}", last_name="Area", skills="Python", location=location,
+                region="NA", pod="Stripe", session="S1", email=f"area{index}@example.com"
+            )
+        
+        response = self.client.get('/api/search/search/', {'q': 'anyone in canada'})
+        results = {result['data']['id']: result['match_reason'] for result in response.data['results']}
+        self.assertIn(self.members["Toronto"].id, results)
+        self.assertIn("In Canada", results[self.members["Toronto"].id])
+        self.assertFalse(self.member_ids("Seattle, WA", "Denver, CO") & set(results))
+        
+        response = self.client.get('/api/members/', {'near': 'california'})
+        self.assertEqual({row['id'] for row in response.data['results']}, self.member_ids("San Francisco, CA"))
+        response = self.client.get('/api/members/', {'near': 'united states'})
+        self.assertNotIn(self.members["Toronto"].id, {row['id'] for row in response.data['results']})
+
+
+class ShardedSearchTest(TestCase):
+    """Test cases for member searches scored in parallel shards"""
+    
+    def setUp(self):
+        """Set up members with tied and distinct scores spread over the snapshot"""
+        self.addCleanup(setattr, snapshot_module, '_member_snapshot', None)
+        for index in range(23):
+            NetworkMember.objects.create(
+                first_name=f"Member{index}", last_name="Shard",
+                skills="Python, Design" if index % 3 else "Python",
+                location="Boston, MA" if index % 4 else "Toronto",
+                region="NA", pod="Stripe", session="S1", email=f"shard{index}@example.com"
+            )
+        self.service = IntelligentMatchingService()
+        self.snapshot = get_member_snapshot(self.service.SKILL_VOCABULARY)
+        self.processed_query = self.service.process_query("python designers in boston")
+    
+    def ranking(self, matches):
+        return [(match.id, match.score, match.reasons) for match in matches]
+    
+    def test_shards_rank_like_one_process(self):
+        """Test merged shard results equal scoring the whole snapshot, in both pool modes"""
+        expected, expected_total = self.service.score_member_rows(self.snapshot, self.processed_query, None, 10)
+        # Pool processes map the published snapshot
+        directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        publish_snapshot(directory, 'members', self.snapshot)
+        
+        for mode in ShardedScorer.MODES:
+            scorer = ShardedScorer(workers=3, mode=mode, min_rows=0, timeout=60)
+            self.addCleanup(scorer.close)
+            with override_settings(SEARCH_SNAPSHOT_DIR=str(directory)):
+                matches, total = scorer.score_members(self.snapshot, self.processed_query, None, 10)
+            self.assertEqual(self.ranking(matches), self.ranking(expected))
+            self.assertEqual(total, expected_total)
+            self.assertEqual(scorer.metrics()['sharded'], 1)
+    
+    def test_slow_shards_fall_back_to_one_process(self):
+        """Test a search whose shards time out, or that has no published snapshot, is scored in the request"""
+        expected, _ = self.service.score_member_rows(self.snapshot, self.processed_query, None, 10)
+        release = threading.Event()
+        self.addCleanup(release.set)
+        score_member_rows = IntelligentMatchingService.score_member_rows
+        
+        def stuck_in_shards(service, *args):
+            if threading.current_thread().name.startswith('search-shard'):
+                release.wait()
+            return score_member_rows(service, *args)
+        
+        scorer = ShardedScorer(workers=2, mode='thread', min_rows=0, timeout=0.05)
+        self.addCleanup(scorer.close)
+        with patch.object(IntelligentMatchingService, 'score_member_rows', stuck_in_shards), \
+                self.assertLogs('network.parallel', 'WARNING'):
+            matches, _ = scorer.score_members(self.snapshot, self.processed_query, None, 10)
+        self.assertEqual(self.ranking(matches), self.ranking(expected))
+        self.assertEqual((scorer.metrics()['timeouts'], scorer.metrics()['fallbacks']), (1, 1))
+        
+        scorer = ShardedScorer(workers=2, mode='process', min_rows=0)
+        matches, _ = scorer.score_members(self.snapshot, self.processed_query, None, 10)
+        self.assertEqual(self.ranking(matches), self.ranking(expected))
+        self.assertEqual(scorer.metrics()['fallbacks'], 1)
+    
+    def test_small_snapshots_stay_in_process(self):
+        """Test searches under the row threshold are not sharded"""
+        scorer = ShardedScorer(workers=4, mode='thread', min_rows=1000)
+        self.assertFalse(scorer.should_shard(len(self.snapshot)))
+        self.assertFalse(ShardedScorer(workers=1, min_rows=0).should_shard(len(self.snapshot)))
+        self.assertEqual(scorer.shards(10), [(0, 2), (2, 5), (5, 7), (7, 10)])
+        
+        with override_settings(SEARCH_PARALLEL_WORKERS=2, SEARCH_PARALLEL_MODE='thread', SEARCH_PARALLEL_MIN_ROWS=0):
+            with patch('network.parallel._scorer', None):
+                matches, total = self.service.top_members(self.processed_query, limit=5)
+                scorer = get_sharded_scorer()
+                scorer.close()
+                self.assertEqual(scorer.metrics()['sharded'], 1)
+        self.assertEqual(len(matches), 5)
+        self.assertEqual(total, len(self.service.score_members(self.processed_query)))
+
+
+class TypeaheadIndexTest(TestCase):
+    """Test cases for the typeahead prefix index"""
+    
+    def setUp(self):
+        """Set up test data"""
+        NetworkMember.objects.create(
+            first_name="Sarah",
+            last_name="Johnson",
+            skills="Marketing, Brand Strategy",
+            location="Boston, MA",
+            region="NA",
+            pod="Zoom",
+            session="S1",
+            email="sarah.johnson@example.com"
+        )
+        for results_count in [3, 0, 2]:
+            SearchTracking.objects.create(
+                search_type=SearchTracking.SEARCH_TYPE_SMART,
+                query="Anyone in Boston rn?",
+                results_count=results_count
+            )
+        SearchTracking.objects.create(
+            search_type=SearchTracking.SEARCH_TYPE_SMART,
+            query="brand designers",
+            results_count=0
+        )
+        self.index = TypeaheadIndex()
+    
+    def test_prefix_matches_any_word(self):
+        """Test prefixes match the start of any word in an entry"""
+        self.assertEqual(self.index.suggest("bos"), ["Anyone in Boston rn?"])
+        self.assertEqual(self.index.suggest("john"), ["Sarah Johnson"])
+        self.assertEqual(self.index.suggest("zo"), ["Zoom"])
+    
+    def test_ranked_by_weight(self):
+        """Test popular, successful searches rank above directory entries"""
+        self.assertEqual(
+            self.index.suggest("b"),
+            ["Anyone in Boston rn?", "brand designers", "Brand Strategy"]
+        )
+    
+    def test_incremental_history_merge(self):
+        """Test new searches are merged into existing weights on rebuild"""
+        self.index.refresh(force=True)
+        for _ in range(5):
+            SearchTracking.objects.create(
+                search_type=SearchTracking.SEARCH_TYPE_SMART,
+                query="brand designers",
+                results_count=1
+            )
+        self.index.refresh(force=True)
+        
+        self.assertEqual(self.index.suggest("b")[0], "brand designers")
+    
+    def test_ranks_whole_prefix_range(self):
+        """Test the best entry is found however many keys share the prefix"""
+        SearchTracking.objects.bulk_create([
+            SearchTracking(search_type=SearchTracking.SEARCH_TYPE_SMART, query=f"a{index:04d}", results_count=0)
+            for index in range(3000)
+        ] + [
+            SearchTracking(search_type=SearchTracking.SEARCH_TYPE_SMART, query="azure experts", results_count=1)
+            for _ in range(5)
+        ])
+        self.assertEqual(self.index.suggest("a", limit=2), ["azure experts", "Anyone in Boston rn?"])
+        
+        rng = np.random.default_rng(0)
+        values = rng.integers(0, 50, 1000)
+        minimum = RangeMinimum(values)
+        for start, stop in [(0, 1000), (10, 11), (123, 877), (500, 500)]:
+            self.assertEqual(minimum.smallest(start, stop, 5), sorted(set(values[start:stop].tolist()))[:5])
+    
+    def test_stale_index_rebuilt_in_background(self):
+        """Test lookups keep serving the current index while a rebuild runs"""
+        self.assertEqual(self.index.suggest("bos"), ["Anyone in Boston rn?"])
+        self.index.invalidate()
+        with patch.object(TypeaheadIndex, '_build') as build:
+            self.assertEqual(self.index.suggest("bos"), ["Anyone in Boston rn?"])
+            # The background rebuild releases the lock when it is done
+            with self.index._lock:
+                build.assert_called_once_with()
+
+
+class MemberFacetsAPITest(APITestCase):
+    """Test cases for the member facet counts endpoints"""
+    
+    def setUp(self):
+        """Set up test data"""
+        for index, (region, session, pod) in enumerate([
+            ("NA", "S1", "Stripe"), ("NA", "S2", "Zoom"), ("EU", "S1", "Stripe"), ("AS", "S1", "Zoom"),
+        ]):
+            NetworkMember.objects.create(
+                first_name=f"Member{index}",
+                last_name="Test",
+                skills="Marketing" if index < 3 else "Python",
+                region=region,
+                pod=pod,
+                session=session,
+                internship="Rove",
+                email=f"member{index}@example.com"
+            )
+    
+    def test_facets_without_filters(self):
+        """Test facets count every member when nothing is selected"""
+        response = self.client.get('/api/members/facets/')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total'], 4)
+        self.assertEqual(response.data['region'], [
+            {'region': 'AS', 'count': 1}, {'region': 'EU', 'count': 1}, {'region': 'NA', 'count': 2},
+        ])
+        self.assertEqual(response.data['internship'], [{'internship': 'Rove', 'count': 4}])
+    
+    def test_facets_are_filter_aware(self):
+        """Test each facet is counted against the other active filters"""
+        response = self.client.get('/api/members/facets/', {'region': 'NA', 'pod': 'Stripe'})
+        
+        self.assertEqual(response.data['total'], 1)
+        # Regions of Stripe members, and pods of North American members
+        self.assertEqual(response.data['region'], [{'region': 'EU', 'count': 1}, {'region': 'NA', 'count': 1}])
+        self.assertEqual(response.data['pod'], [{'pod': 'Stripe', 'count': 1}, {'pod': 'Zoom', 'count': 1}])
+        self.assertEqual(response.data['session'], [{'session': 'S1', 'count': 1}])
+    
+    def test_smart_search_facets(self):
+        """Test facets are computed over a smart search result set"""
+        response = self.client.get('/api/search/facets/', {'q': 'marketing', 'region': 'NA'})
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total'], 2)
+        self.assertEqual(response.data['region'], [{'region': 'EU', 'count': 1}, {'region': 'NA', 'count': 2}])
+
+
+class ChangeVersionTest(TestCase):
+    """Test cases for table change versions read from the change log"""
+    
+    def test_versions_follow_the_change_log(self):
+        """Test writes from any process change the version, whatever the cache holds"""
+        version = get_version(NetworkMember)
+        member = NetworkMember.objects.create(
+            first_name="Alex", last_name="Chen", region="NA", pod="Stripe", session="S1", email="alex@example.com"
+        )
+        created = get_version(NetworkMember)
+        self.assertNotEqual(created, version)
+        
+        # Another worker never saw this process's cache
+        cache.clear()
+        self.assertEqual(get_version(NetworkMember), created)
+        
+        member.delete()
+        self.assertNotEqual(get_version(NetworkMember), created)
+        self.assertEqual(get_versions([Resources])[Resources], '0.0')
+    
+    def test_late_commit_of_lower_id_changes_version(self):
+        """Test an entry that becomes visible after a higher one still moves the version"""
+        entries = [
+            ChangeLog.objects.create(entity=ChangeLog.ENTITY_MEMBER, object_id=object_id, action=ChangeLog.ACTION_UPSERT)
+            for object_id in (1, 2)
+        ]
+        # The first entry's transaction has not committed yet
+        entries[0].delete()
+        version = get_version(NetworkMember)
+        
+        ChangeLog.objects.create(
+            id=entries[0].id, entity=ChangeLog.ENTITY_MEMBER, object_id=1, action=ChangeLog.ACTION_UPSERT
+        )
+        self.assertNotEqual(get_version(NetworkMember), version)
+
+
+class ConditionalGetAPITest(APITestCase):
+    """Test cases for ETag / Last-Modified revalidation"""
+    
+    def setUp(self):
+        """Set up test data"""
+        self.member = NetworkMember.objects.create(
+            first_name="Test",
+            last_name="User",
+            region="NA",
+            pod="Stripe",
+            session="S1",
+            email="test@example.com"
+        )
+    
+    def test_list_not_modified(self):
+        """Test a matching If-None-Match is answered with 304"""
+        response = self.client.get('/api/members/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+        
+        response = self.client.get('/api/members/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+    
+    def test_detail_modified_after_write(self):
+        """Test saving a member changes the ETag and refreshes cached pages"""
+        url = f'/api/members/{self.member.id}/'
+        etag = self.client.get(url)['ETag']
+        list_etag = self.client.get('/api/members/')['ETag']
+        
+        self.member.first_name = "Renamed"
+        self.member.save()
+        
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data['first_name'], "Renamed")
+        
+        response = self.client.get('/api/members/', HTTP_IF_NONE_MATCH=list_etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['first_name'], "Renamed")
+    
+    def test_project_founders_change_etag(self):
+        """Test adding a founder changes the project ETag"""
+        project = Project.objects.create(title="Dashboard", type="ST", stage="J", slug="dashboard")
+        etag = self.client.get('/api/projects/dashboard/')['ETag']
+        
+        project.founders.add(self.member)
+        
+        response = self.client.get('/api/projects/dashboard/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+    
+    def test_last_modified_follows_deletes(self):
+        """Test Last-Modified moves with deletes and covers tables without updated_at"""
+        link = SocialLink.objects.create(link="https://example.com", network_member=self.member)
+        created = ChangeLog.objects.latest('id')
+        self.assertEqual(get_last_modified([SocialLink]), created.created_at)
+        
+        link.delete()
+        deleted = ChangeLog.objects.latest('id')
+        self.assertEqual(deleted.action, ChangeLog.ACTION_DELETE)
+        self.assertEqual(get_last_modified([SocialLink, NetworkMember]), deleted.created_at)
+        self.assertIsNone(get_last_modified([Resources]))
+    
+    def test_search_analytics_not_conditional(self):
+        """Test stats actions over untracked models get no validators"""
+        response = self.client.get('/api/stats/search_analytics/')
+        self.assertNotIn('ETag', response)
+
+
+class ChangeFeedAPITest(APITestCase):
+    """Test cases for the delta-sync change feed"""
+    
+    def setUp(self):
+        """Set up test data"""
+        self.member = NetworkMember.objects.create(
+            first_name="Test",
+            last_name="User",
+            region="NA",
+            pod="Stripe",
+            session="S1",
+            email="test@example.com"
+        )
+        self.organization = Organization.objects.create(name="Rove", slug="rove")
+    
+    def test_full_sync_from_zero(self):
+        """Test syncing from the start returns every logged row"""
+        response = self.client.get('/api/changes/')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data['has_more'])
+        self.assertEqual([m['id'] for m in response.data['changes']['members']], [self.member.id])
+        self.assertEqual([o['name'] for o in response.data['changes']['organizations']], ['Rove'])
+    
+    def test_incremental_sync_with_tombstones(self):
+        """Test a later sync returns only changed rows and deletions"""
+        cursor = self.client.get('/api/changes/').data['cursor']
+        
+        project = Project.objects.create(title="Dashboard", type="ST", stage="J", slug="dashboard")
+        project.founders.add(self.member)
+        organization_id = self.organization.id
+        self.organization.delete()
+        
+        response = self.client.get('/api/changes/', {'since': cursor})
+        
+        self.assertEqual(response.data['changes']['members'], [])
+        self.assertEqual(len(response.data['changes']['projects']), 1)
+        self.assertEqual(response.data['changes']['projects'][0]['founders'], [self.member.id])
+        self.assertEqual(response.data['deleted']['organizations'], [organization_id])
+        self.assertGreater(response.data['cursor'], cursor)
+        
+        response = self.client.get('/api/changes/', {'since': response.data['cursor']})
+        self.assertEqual(response.data['changes']['projects'], [])
+        self.assertEqual(response.data['deleted']['organizations'], [])
+    
+    def test_paged_sync(self):
+        """Test has_more is set when more changes than a page are pending"""
+        with patch.object(ChangeFeedViewSet, 'PAGE_SIZE', 1):
+            response = self.client.get('/api/changes/')
+        
+        self.assertTrue(response.data['has_more'])
+        self.assertEqual([m['id'] for m in response.data['changes']['members']], [self.member.id])
+        self.assertEqual(response.data['changes']['organizations'], [])
+        
+        with patch.object(ChangeFeedViewSet, 'PAGE_SIZE', 1):
+            response = self.client.get('/api/changes/', {'since': response.data['cursor']})
+        
+        self.assertFalse(response.data['has_more'])
+        self.assertEqual([o['name'] for o in response.data['changes']['organizations']], ['Rove'])
+    
+    def test_cursor_held_before_recent_gap(self):
+        """Test the cursor does not pass an id that may still commit, until the gap is old"""
+        cursor = self.client.get('/api/changes/').data['cursor']
+        # An entry whose id was taken by a transaction that has not committed yet
+        gap = ChangeLog.objects.create(entity=ChangeLog.ENTITY_ORGANIZATION, object_id=self.organization.id).id
+        ChangeLog.objects.filter(id=gap).delete()
+        self.member.save()
+        
+        response = self.client.get('/api/changes/', {'since': cursor})
+        self.assertEqual([m['id'] for m in response.data['changes']['members']], [self.member.id])
+        self.assertEqual(response.data['cursor'], cursor)
+        
+        ChangeLog.objects.filter(id__gt=cursor).update(created_at=timezone.now() - timedelta(minutes=1))
+        response = self.client.get('/api/changes/', {'since': cursor})
+        self.assertGreater(response.data['cursor'], gap)
+    
+    def test_invalid_cursor(self):
+        """Test a non-numeric cursor is rejected"""
+        response = self.client.get('/api/changes/', {'since': 'yesterday'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class SparseFieldsetAPITest(APITestCase):
+    """Test cases for the fields and expand query parameters"""
+    
+    def setUp(self):
+        """Set up test data"""
+        self.member = NetworkMember.objects.create(
+            first_name="Test",
+            last_name="User",
+            skills="Product Design",
+            region="NA",
+            pod="Stripe",
+            session="S1",
+            email="test@example.com"
+        )
+        self.project = Project.objects.create(title="Dashboard", type="ST", stage="J", slug="dashboard")
+        self.project.founders.add(self.member)
+    
+    def test_default_output_unchanged(self):
+        """Test responses without the parameters keep every field"""
+        response = self.client.get(f'/api/projects/{self.project.slug}/')
+        self.assertEqual(response.data['founders'][0]['first_name'], "Test")
+        self.assertIn('project_links', response.data)
+        self.assertEqual(response.data['founders_count'], 1)
+    
+    def test_fields_selects_columns(self):
+        """Test only the requested fields are sent and loaded"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/members/', {'fields': 'id,first_name'})
+        
+        self.assertEqual(response.data['results'], [{'id': self.member.id, 'first_name': "Test"}])
+        member_query = next(q['sql'] for q in queries if 'FROM "network_networkmember"' in q['sql'] and 'LIMIT' in q['sql'])
+        self.assertIn('"first_name"', member_query)
+        self.assertNotIn('"skills"', member_query)
+        # experiences_count was not asked for, so experiences are not prefetched
+        self.assertFalse(any('"network_experience"."id"' in q['sql'] for q in queries))
+    
+    def test_nested_fields(self):
+        """Test dotted field names reach into nested serializers"""
+        response = self.client.get(
+            f'/api/projects/{self.project.slug}/', {'fields': 'title,founders.first_name,founders_count'}
+        )
+        self.assertEqual(response.data, {
+            'title': "Dashboard",
+            'founders': [{'first_name': "Test"}],
+            'founders_count': 1,
+        })
+    
+    def test_expand_collapses_other_relations(self):
+        """Test relations not listed in expand are sent as ids"""
+        url = f'/api/projects/{self.project.slug}/'
+        
+        response = self.client.get(url, {'expand': ''})
+        self.assertEqual(response.data['founders'], [self.member.id])
+        self.assertEqual(response.data['project_links'], [])
+        
+        response = self.client.get(url, {'expand': 'founders'})
+        self.assertEqual(response.data['founders'][0]['first_name'], "Test")
+        self.assertEqual(response.data['founders'][0]['experiences'], [])
+    
+    def test_sparse_request_runs_fewer_queries(self):
+        """Test collapsing relations skips the nested prefetches"""
+        url = f'/api/projects/{self.project.slug}/'
+        with CaptureQueriesContext(connection) as full:
+            self.client.get(url)
+        with CaptureQueriesContext(connection) as sparse:
+            self.client.get(url, {'fields': 'id,title,founders', 'expand': ''})
+        
+        self.assertLess(len(sparse), len(full))
+        self.assertFalse(any('JOIN "network_networkmember"' in q['sql'] for q in full if 'network_sociallink' in q['sql']))
+    
+    def test_writes_ignore_fields(self):
+        """Test fields does not drop fields from a write or its response"""
+        response = self.client.patch(
+            f'/api/members/{self.member.id}/?fields=id&expand=', {'first_name': "Changed"}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['first_name'], "Changed")
+        self.assertEqual(NetworkMember.objects.get(id=self.member.id).first_name, "Changed")
+
+
+class FastListParityTest(APITestCase):
+    """Test cases comparing the fast list path with the list serializers"""
+    
+    def setUp(self):
+        """Set up test data"""
+        self.member = NetworkMember.objects.create(
+            first_name="Zoë",
+            last_name="Ng\u2028",
+            skills="Design",
+            location=None,
+            region="NA",
+            pod="Stripe",
+            session="S1",
+            email="zoe@example.com"
+        )
+        self.other = NetworkMember.objects.create(
+            first_name="Test",
+            last_name="User",
+            region="XX",
+            pod="Ramp",
+            session="S2",
+            internship="Ramp",
+            email="test@example.com"
+        )
+        organization = Organization.objects.create(name="Rove", slug="rove", type="CO")
+        Organization.objects.create(name="Nexus", slug="nexus")
+        for member in (self.member, self.other):
+            Experience.objects.create(
+                network_member=member, organization=organization,
+                experience_type="IN", start_date=date(2024, 6, 1)
+            )
+        project = Project.objects.create(
+            title="Dashboard", type="ST", stage="J", slug="dashboard", logo="logo/dashboard.png"
+        )
+        project.founders.add(self.member, self.other)
+        Project.objects.create(title="Atlas", type="NP", stage="I", slug="atlas")
+    
+    def assertParity(self, url, params=None):
+        with self.settings(FAST_LIST_RENDERING=False):
+            cache.clear()
+            expected = self.client.get(url, params)
+        cache.clear()
+        with patch.object(ListSerializer, 'to_representation') as to_representation:
+            response = self.client.get(url, params)
+        
+        to_representation.assert_not_called()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content, expected.content)
+    
+    def test_member_list(self):
+        """Test member list pages match, with filters, search and ordering"""
+        self.assertParity('/api/members/')
+        self.assertParity('/api/members/', {'region': 'NA'})
+        self.assertParity('/api/members/', {'search': 'test', 'ordering': '-session'})
+        with patch.object(PageNumberPagination, 'page_size', 1):
+            self.assertParity('/api/members/', {'page': 2})
+    
+    def test_project_list(self):
+        """Test project lists match, including logo URLs and founder counts"""
+        self.assertParity('/api/projects/')
+        self.assertParity('/api/projects/', {'type': 'NP'})
+    
+    def test_organization_list(self):
+        """Test organization lists match, including empty choice fields"""
+        self.assertParity('/api/organizations/')
+    
+    def test_sparse_fields(self):
+        """Test the fast path honours the fields parameter"""
+        self.assertParity('/api/members/', {'fields': 'first_name,experiences_count'})
+    
+    def test_renderer_matches_json_renderer(self):
+        """Test the fast renderer writes the same bytes as JSONRenderer"""
+        data = {
+            'text': "Zoë \u2028 \u2029 \x00 \"quoted\"",
+            'number': 0.7000000000000001,
+            'created_at': timezone.now(),
+            'day': date(2024, 6, 1),
+            'values': (1, None, True),
+            2: 'non-string key',
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+
+class FragmentCacheTest(APITestCase):
+    """Test cases for the serialized member card cache"""
+    
+    def setUp(self):
+        """Set up test data"""
+        self.member = NetworkMember.objects.create(
+            first_name="Test",
+            last_name="User",
+            region="NA",
+            pod="Stripe",
+            session="S1",
+            email="test@example.com"
+        )
+        self.organization = Organization.objects.create(name="Rove", slug="rove", type="CO")
+        self.project = Project.objects.create(title="Dashboard", type="ST", stage="J", slug="dashboard")
+        self.project.founders.add(self.member)
+        get_fragment_cache().clear()
+    
+    def get_founders(self):
+        with patch.object(
+            NetworkMemberSerializer, 'to_representation', autospec=True,
+            side_effect=NetworkMemberSerializer.to_representation
+        ) as to_representation:
+            founders = self.client.get(f'/api/projects/{self.project.slug}/').data['founders']
+        return founders, to_representation.call_count
+    
+    def test_lru_eviction(self):
+        """Test the least recently used fragment is evicted first"""
+        fragments = FragmentCache(max_entries=2)
+        fragments.set_many({'a': 1, 'b': 2})
+        fragments.get_many(['a'])
+        fragments.set_many({'c': 3})
+        
+        self.assertEqual(fragments.get_many(['a', 'b', 'c']), {'a': 1, 'c': 3})
+    
+    def test_unchanged_member_is_reused(self):
+        """Test a member card is serialized once while the member is unchanged"""
+        first, serialized = self.get_founders()
+        self.assertEqual(serialized, 1)
+        
+        second, serialized = self.get_founders()
+        self.assertEqual(serialized, 0)
+        self.assertEqual(second, first)
+    
+    def test_nested_changes_invalidate_card(self):
+        """Test new experiences and organization renames reach cached cards"""
+        self.get_founders()
+        Experience.objects.create(
+            network_member=self.member, organization=self.organization,
+            experience_type="IN", start_date=date(2024, 6, 1)
+        )
+        founders, serialized = self.get_founders()
+        self.assertEqual(serialized, 1)
+        self.assertEqual(founders[0]['experiences'][0]['organization_name'], "Rove")
+        
+        self.organization.name = "Rove Labs"
+        self.organization.save()
+        founders, serialized = self.get_founders()
+        self.assertEqual(founders[0]['experiences'][0]['organization_name'], "Rove Labs")
+    
+    def test_sparse_requests_bypass_cache(self):
+        """Test fields requests are not served from or stored in the cache"""
+        response = self.client.get(f'/api/projects/{self.project.slug}/', {'fields': 'founders.first_name'})
+        self.assertEqual(response.data['founders'], [{'first_name': "Test"}])
+        self.assertEqual(len(get_fragment_cache()), 0)
+
+
+class SingleFlightTest(TestCase):
+    """Test cases for coalescing identical concurrent computations"""
+    
+    def setUp(self):
+        """Set up a fresh coalescer"""
+        self.flight = SingleFlight()
+        self.flight.WAIT_TIMEOUT = 5
+    
+    def run_concurrently(self, count, target):
+        threads = [threading.Thread(target=target) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        return threads
+    
+    def test_concurrent_callers_share_one_call(self):
+        """Test callers arriving mid-flight get the leader's result"""
+        release = threading.Event()
+        calls, results = [], []
+        
+        def compute():
+            calls.append(1)
+            release.wait(5)
+            return ['result']
+        
+        threads = self.run_concurrently(5, lambda: results.append(self.flight.do('key', compute)))
+        time.sleep(0.1)
+        release.set()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [['result']] * 5)
+        # Once landed, the next call computes again
+        self.assertEqual(self.flight.do('key', lambda: 'fresh'), 'fresh')
+    
+    def test_leader_error_is_shared(self):
+        """Test waiting callers see the leader's exception"""
+        started = threading.Event()
+        errors = []
+        
+        def fail():
+            started.set()
+            time.sleep(0.1)
+            raise ValueError("boom")
+        
+        def call():
+            try:
+                self.flight.do('key', fail)
+            except ValueError as error:
+                errors.append(error)
+        
+        leader = self.run_concurrently(1, call)[0]
+        started.wait(5)
+        call()
+        leader.join()
+        self.assertEqual(len(errors), 2)
+    
+    def test_begin_waits_for_finish(self):
+        """Test followers of begin() return only after the leader finishes"""
+        finish = self.flight.begin('page')
+        followed = []
+        follower = self.run_concurrently(1, lambda: followed.append(self.flight.begin('page')))[0]
+        time.sleep(0.1)
+        self.assertEqual(followed, [])
+        
+        finish()
+        follower.join()
+        self.assertEqual(followed, [None])
+    
+    @override_settings(SINGLE_FLIGHT_SHARED_LOCK=True)
+    def test_shared_lock_hands_over_result(self):
+        """Test a result computed on another worker is read from the cache"""
+        cache.clear()
+        key = ('search', 'boston')
+        cache.set(self.flight._cache_key('lock', key), 'other-worker')
+        
+        def other_worker():
+            time.sleep(0.1)
+            cache.set(self.flight._cache_key('result', key), ['shared'])
+            cache.delete(self.flight._cache_key('lock', key))
+        
+        worker = self.run_concurrently(1, other_worker)[0]
+        self.assertEqual(self.flight.do(key, lambda: ['local']), ['shared'])
+        worker.join()
+
+
+class AdmissionControlTest(APITestCase):
+    """Test cases for smart search admission control and load shedding"""
+    
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.member = NetworkMember.objects.create(
+            first_name="Test",
+            last_name="User",
+            skills="Graphic Design, Marketing",
+            location="Boston, MA",
+            region="NA",
+            pod="Stripe",
+            session="S1",
+            email="test@example.com"
+        )
+        self.saturated = AdmissionController(max_in_flight=0, max_queue=0)
+    
+    def search(self, **params):
+        return self.client.get('/api/search/search/', {'q': 'graphic design', **params})
+    
+    def test_limits_in_flight_and_queue(self):
+        """Test searches beyond the slots wait in the queue or are rejected"""
+        controller = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout=5)
+        self.assertTrue(controller.acquire())
+        
+        release = threading.Timer(0.1, controller.release)
+        release.start()
+        self.assertTrue(controller.acquire())
+        release.join()
+        
+        controller.queue_timeout = 0.01
+        self.assertFalse(controller.acquire())
+        metrics = controller.metrics()
+        self.assertEqual((metrics['in_flight'], metrics['admitted'], metrics['rejected']), (1, 2, 1))
+    
+    def test_degraded_serves_cached_results(self):
+        """Test an overloaded search reuses the last full result"""
+        full = self.search().json()
+        
+        with patch('network.views.get_admission_controller', return_value=self.saturated):
+            response = self.search()
+        
+        self.assertEqual(response.data['degraded'], 'cached')
+        self.assertEqual(response.data['results'], full['results'])
+    
+    def test_degraded_keyword_results(self):
+        """Test an overloaded search without a cached result gets keyword matches"""
+        with patch('network.views.get_admission_controller', return_value=self.saturated):
+            response = self.search()
+            stream = b''.join(self.search(stream='ndjson').streaming_content)
+        
+        self.assertEqual(response.data['degraded'], 'keyword')
+        self.assertEqual(response.data['results'][0]['data']['id'], self.member.id)
+        self.assertEqual(response.data['results'][0]['match_reason'], "Text match")
+        done = json.loads(stream.decode().splitlines()[-1])
+        self.assertEqual(done['degraded'], 'keyword')
+    
+    @override_settings(SMART_SEARCH_DEGRADE=False, SMART_SEARCH_RETRY_AFTER=3)
+    def test_rejected_without_degraded_mode(self):
+        """Test overloaded searches are rejected fast with Retry-After"""
+        with patch('network.views.get_admission_controller', return_value=self.saturated):
+            response = self.search()
+        
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response['Retry-After'], '3')
+    
+    @override_settings(SMART_SEARCH_BURST=2, SMART_SEARCH_RATE=0.01)
+    def test_per_client_token_bucket(self):
+        """Test a client spending its burst is throttled until tokens refill"""
+        self.assertEqual(self.search().status_code, status.HTTP_200_OK)
+        self.assertEqual(self.search().status_code, status.HTTP_200_OK)
+        
+        response = self.search()
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', response)
+        # Other endpoints are not throttled
+        self.assertEqual(self.client.get('/api/search/suggestions/', {'q': 'des'}).status_code, status.HTTP_200_OK)
+    
+    def test_metrics_endpoint(self):
+        """Test the limits and counters are exposed"""
+        response = self.client.get('/api/stats/admission/')
+        for key in ('in_flight', 'queue_length', 'max_in_flight', 'rejected', 'throttled', 'degraded_cached'):
+            self.assertIn(key, response.data)
+
+
+class ReplicaRoutingTest(TestCase):
+    """Test cases for routing reads to the read replica"""
+    
+    def setUp(self):
+        """Set up the middleware with a configured replica"""
+        cache.clear()
+        self.factory = RequestFactory()
+        self.router = PrimaryReplicaRouter()
+        patcher = patch('network.middleware.get_replica_alias', return_value='replica')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def route(self, request, status_code=200):
+        """Run a request through the middleware and return (read database, response)"""
+        seen = []
+        
+        def get_response(request):
+            seen.append(get_read_database())
+            return HttpResponse(status=status_code)
+        
+        response = ReplicaRoutingMiddleware(get_response)(request)
+        return seen[0], response
+    
+    def test_safe_api_requests_read_replica(self):
+        """Test API reads use the replica and other requests the primary"""
+        self.assertEqual(self.route(self.factory.get('/api/search/search/'))[0], 'replica')
+        self.assertIsNone(self.route(self.factory.post('/api/members/'))[0])
+        self.assertIsNone(self.route(self.factory.get('/admin/'))[0])
+        self.assertIsNone(get_read_database())
+    
+    def test_client_pinned_after_write(self):
+        """Test a client reads its own writes from the primary"""
+        database, response = self.route(self.factory.post('/api/members/'), status_code=201)
+        self.assertIn(ReplicaRoutingMiddleware.PIN_COOKIE, response.cookies)
+        
+        request = self.factory.get('/api/members/')
+        request.COOKIES[ReplicaRoutingMiddleware.PIN_COOKIE] = '1'
+        self.assertIsNone(self.route(request)[0])
+        
+        _, response = self.route(self.factory.post('/api/members/'), status_code=400)
+        self.assertNotIn(ReplicaRoutingMiddleware.PIN_COOKIE, response.cookies)
+    
+    def test_directory_writes_pin_everyone_briefly(self):
+        """Test recent directory writes send every client to the primary"""
+        self.router.db_for_write(SearchTracking)
+        self.router.db_for_write(OutboxCheckpoint)
+        self.router.db_for_write(Job)
+        self.assertEqual(self.route(self.factory.get('/api/members/'))[0], 'replica')
+        
+        self.router.db_for_write(NetworkMember)
+        self.assertIsNone(self.route(self.factory.get('/api/members/'))[0])
+        
+        with override_settings(REPLICA_LAG_SECONDS=0):
+            self.assertEqual(self.route(self.factory.get('/api/members/'))[0], 'replica')
+    
+    def test_write_pins_rest_of_request(self):
+        """Test reads after a write in the same request go to the primary"""
+        token = set_read_database('replica')
+        try:
+            self.assertEqual(self.router.db_for_read(NetworkMember), 'replica')
+            self.assertEqual(self.router.db_for_write(SearchTracking), 'default')
+            self.assertEqual(self.router.db_for_read(NetworkMember), 'default')
+        finally:
+            reset_read_database(token)
+
+
+class ConnectionPoolingTest(APITestCase):
+    """Test cases for connection persistence, pool metrics and the connection benchmark"""
+    
+    def test_connections_endpoint(self):
+        """Test each database reports how it keeps its connections"""
+        response = self.client.get('/api/stats/connections/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        default = response.data['default']
+        self.assertFalse(default['pooled'])
+        self.assertIsNone(default['pool'])
+        for key in ('vendor', 'conn_max_age', 'health_checks', 'connected'):
+            self.assertIn(key, default)
+    
+    def test_pool_metrics(self):
+        """Test pool stats are turned into utilization and wait figures"""
+        pool = Mock(min_size=2, max_size=10, max_lifetime=1800.0)
+        pool.get_stats.return_value = {
+            'pool_min': 2, 'pool_max': 10, 'pool_size': 4, 'pool_available': 1,
+            'requests_waiting': 2, 'requests_num': 8, 'requests_wait_ms': 40, 'requests_timeouts': 1,
+        }
+        metrics = pool_metrics(pool)
+        self.assertEqual(metrics['in_use'], 3)
+        self.assertEqual(metrics['utilization'], 0.3)
+        self.assertEqual(metrics['requests_waiting'], 2)
+        self.assertEqual(metrics['wait_ms_avg'], 5.0)
+        self.assertEqual(metrics['requests_errors'], 1)
+    
+    def test_benchmark_restores_settings(self):
+        """Test the benchmark times each mode and leaves the connection settings as it found them"""
+        before = dict(connection.settings_dict)
+        out = StringIO()
+        call_command('bench_connections', '--requests', '3', stdout=out)
+        self.assertIn('fresh connections', out.getvalue())
+        self.assertIn('persistent', out.getvalue())
+        self.assertEqual(dict(connection.settings_dict), before)
+
+
+class EmbeddingIndexTest(TestCase):
+    """Test cases for the IVF embedding index"""
+    
+    def setUp(self):
+        """Set up clustered random vectors"""
+        rng = np.random.default_rng(0)
+        centers = rng.normal(size=(8, 32))
+        self.vectors = normalize(centers[rng.integers(8, size=2000)] + rng.normal(scale=0.8, size=(2000, 32)))
+        self.queries = normalize(self.vectors[:50] + rng.normal(scale=0.05, size=(50, 32)))
+        self.index = IVFIndex(n_probe=8)
+        self.index.add_many(range(2000), self.vectors)
+        
+        self.index_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.index_dir)
+    
+    def recall(self, **search_options):
+        hits = 0
+        for query in self.queries:
+            expected = {object_id for object_id, _ in self.index.search(query, 10, exact=True)}
+            hits += len(expected & {object_id for object_id, _ in self.index.search(query, 10, **search_options)})
+        return hits / (10 * len(self.queries))
+    
+    def test_recall_against_exact_search(self):
+        """Test the index trains itself and more probes approach exact results"""
+        self.assertIsNotNone(self.index.centroids)
+        self.assertEqual(self.recall(n_probe=len(self.index.centroids)), 1.0)
+        self.assertGreaterEqual(self.recall(), 0.9)
+        self.assertLessEqual(self.recall(n_probe=1), self.recall(n_probe=8))
+    
+    def test_insert_remove_and_persist(self):
+        """Test incremental updates survive a save and reload"""
+        self.index.add(5000, self.queries[0])
+        self.assertEqual(self.index.search(self.queries[0], 1)[0][0], 5000)
+        self.assertTrue(self.index.remove(3))
+        self.assertFalse(self.index.remove(3))
+        self.index.add(7, -self.vectors[7])
+        
+        path = Path(self.index_dir) / 'index.npz'
+        self.index.save(path)
+        loaded = IVFIndex.load(path)
+        self.assertEqual(len(loaded), 2000)
+        self.assertNotIn(3, loaded)
+        self.assertIsNotNone(loaded.store)
+        for query in self.queries[:5]:
+            found, expected = loaded.search(query, 5), self.index.search(query, 5)
+            self.assertEqual([object_id for object_id, _ in found], [object_id for object_id, _ in expected])
+            self.assertAlmostEqual(found[0][1], expected[0][1], places=5)
+        
+        loaded.remove(5000)
+        self.assertIsNone(loaded.store)
+        self.assertEqual(len(loaded), 1999)
+        self.assertAlmostEqual(loaded.search(-self.vectors[7], 1)[0][1], 1.0, places=5)
+    
+    def test_quantized_store(self):
+        """Test stores map quantized vectors by id from a single file"""
+        path = Path(self.index_dir) / 'store.emb'
+        ids = np.arange(2000)[::-1] * 3
+        for precision, tolerance in (('int8', 0.02), ('float16', 0.001)):
+            EmbeddingStore.write(path, ids, self.vectors, precision=precision, keep_full=False)
+            store = EmbeddingStore.open(path)
+            self.assertFalse(store.codes.flags.owndata or store.codes.flags.writeable)
+            self.assertIsNone(store.full)
+            self.assertEqual(store.codes.dtype, np.dtype(precision))
+            
+            rows = store.rows([ids[0], ids[10], 1])
+            self.assertEqual(rows[2], -1)
+            np.testing.assert_allclose(store.decode(rows[:2]), self.vectors[[0, 10]], atol=tolerance)
+            np.testing.assert_allclose(
+                store.scores(self.queries[0], rows[:2]), self.vectors[[0, 10]] @ self.queries[0], atol=tolerance * 5
+            )
+        self.assertLess(path.stat().st_size, self.vectors.nbytes * 0.6)
+    
+    def test_index_updates_stay_off_the_model(self):
+        """Test vectors are written through the index API and deletes are pruned by the outbox consumer"""
+        with override_settings(EMBEDDING_INDEX_DIR=self.index_dir):
+            member = NetworkMember.objects.create(
+                first_name="Test", last_name="User", region="NA", pod="Stripe", session="S1"
+            )
+            changes = ChangeLog.objects.count()
+            
+            with batch_updates():
+                update_embeddings('member', [member.pk], [self.vectors[0]])
+                self.assertFalse(index_path('member').exists())
+            self.assertTrue(index_path('member').exists())
+            self.assertIn(member.pk, IVFIndex.load(index_path('member')))
+            self.assertEqual(ChangeLog.objects.count(), changes)
+            
+            member_id = member.pk
+            member.delete()
+            self.assertIn(member_id, get_embedding_index('member'))
+            OutboxConsumer('embedding-indexes', sync_embedding_indexes, durable=True).poll()
+            self.assertNotIn(member_id, get_embedding_index('member'))
+            self.assertNotIn(member_id, IVFIndex.load(index_path('member')))
+    
+    def test_saved_members_are_embedded_by_a_job(self):
+        """Test saving a member queues one embed job that adds it to the index"""
+        consumer = OutboxConsumer('embedding-indexes', sync_embedding_indexes, durable=True)
+        with override_settings(EMBEDDING_INDEX_DIR=self.index_dir), \
+                patch('network.query_embeddings.fetch_embedding', return_value=self.vectors[0]) as fetch:
+            member = NetworkMember.objects.create(
+                first_name="Test", last_name="User", region="NA", pod="Stripe", session="S1", skills="python"
+            )
+            member.save()
+            consumer.poll()
+            self.assertNotIn(member.pk, get_embedding_index('member'))
+            self.assertEqual(Job.objects.filter(task='embed_profile').count(), 1)
+            
+            JobWorker().run(0, once=True)
+            self.assertIn(member.pk, get_embedding_index('member'))
+            self.assertEqual(get_embedding_index('member').search(self.vectors[0], 1)[0][0], member.pk)
+            fetch.assert_called_once()
+
+
+class QueryEmbeddingCacheTest(APITestCase):
+    """Test cases for the two-level query embedding cache"""
+    
+    def setUp(self):
+        """Set up a disk store and a fake embeddings API"""
+        cache.clear()
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.store = QueryEmbeddingStore(self.directory / 'queries.sqlite3')
+        self.calls = []
+    
+    def fetch(self, text, model):
+        self.calls.append((text, model))
+        return np.full(8, len(text), dtype=np.float32)
+    
+    def test_memory_then_disk_then_remote(self):
+        """Test lookups hit memory, then disk, and only call the API once per query"""
+        first = QueryEmbeddingCache(self.store, fetch=self.fetch)
+        vector = first.get('  Python   Developer ')
+        self.assertIs(first.get('python developer'), vector)
+        self.assertEqual(self.calls, [('python developer', 'text-embedding-3-small')])
+        
+        second = QueryEmbeddingCache(QueryEmbeddingStore(self.directory / 'queries.sqlite3'), fetch=self.fetch)
+        np.testing.assert_array_equal(second.get('Python developer'), vector)
+        second.get('python developer', model='other-model')
+        self.assertEqual(len(self.calls), 2)
+        
+        metrics = first.metrics()
+        self.assertEqual((metrics['memory_hits'], metrics['disk_hits'], metrics['misses']), (1, 0, 1))
+        self.assertEqual(second.metrics()['disk_hits'], 1)
+        self.assertEqual(second.metrics()['hit_rate'], 0.5)
+    
+    def test_prewarm_from_search_history(self):
+        """Test the shared cache starts with the top historical queries in memory"""
+        for query in ['designers in boston'] * 3 + ['fintech founders']:
+            SearchTracking.objects.create(search_type=SearchTracking.SEARCH_TYPE_SMART, query=query)
+        QueryEmbeddingCache(self.store, fetch=self.fetch).warm(['designers in boston'], fetch_missing=True)
+        
+        with override_settings(QUERY_EMBEDDING_CACHE_PATH=self.directory / 'queries.sqlite3', QUERY_EMBEDDING_PREWARM=1), \
+                patch('network.query_embeddings._cache', None):
+            shared = get_query_embedding_cache()
+            self.assertEqual(len(shared), 1)
+            shared.get('Designers in Boston')
+            self.assertEqual(shared.metrics()['memory_hits'], 1)
+    
+    def test_semantic_search(self):
+        """Test semantic search ranks members by embedding similarity"""
+        near = NetworkMember.objects.create(first_name="Near", last_name="Member", region="NA", pod="Stripe", session="S1",
+                                     email="near@example.com")
+        far = NetworkMember.objects.create(first_name="Far", last_name="Member", region="NA", pod="Stripe", session="S1",
+                                    email="far@example.com")
+        
+        def fetch(text, model):
+            return np.array([1.0, 0.1, 0.0], dtype=np.float32)
+        
+        with override_settings(EMBEDDING_INDEX_DIR=str(self.directory)), \
+                patch('network.query_embeddings._cache', QueryEmbeddingCache(self.store, fetch=fetch)):
+            update_embeddings('member', [near.id, far.id], [[1.0, 0.0, 0.0], [0.0, 0.0, 1.0]])
+            
+            response = self.client.get('/api/search/semantic/', {'q': 'anyone like near?'})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual([result['id'] for result in response.data['results']], [near.id, far.id])
+            self.assertGreater(response.data['results'][0]['similarity'], 0.99)
+            
+            self.client.get('/api/search/semantic/', {'q': 'Anyone like near?'})
+            metrics = self.client.get('/api/stats/query_embeddings/').data
+            self.assertEqual((metrics['misses'], metrics['memory_hits']), (1, 1))
+
+
+class BundleExporterTest(TestCase):
+    """Test cases for the static JSON bundle export"""
+    
+    def setUp(self):
+        """Set up test data"""
+        self.member = NetworkMember.objects.create(
+            first_name="Test",
+            last_name="User",
+            region="NA",
+            pod="Stripe",
+            session="S1",
+            email="test@example.com"
+        )
+        self.output_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.output_dir)
+        self.exporter = BundleExporter(self.output_dir)
+    
+    def read_bundle(self, name):
+        filename = self.exporter.read_manifest()['bundles'][name]
+        return json.loads(gzip.decompress((self.output_dir / f"{filename}.gz").read_bytes()))
+    
+    def test_export_matches_list_api(self):
+        """Test bundles hold the same member cards as the list API"""
+        self.exporter.export()
+        
+        api_cards = self.client.get('/api/members/').json()['results']
+        self.assertEqual(self.read_bundle('members'), api_cards)
+        self.assertEqual(self.read_bundle('members-pod-stripe')['results'], api_cards)
+        self.assertEqual(self.read_bundle('members-region-na')['region'], 'NA')
+    
+    def test_incremental_export(self):
+        """Test unchanged data is skipped and only changed bundles are rewritten"""
+        self.exporter.export()
+        self.assertFalse(self.exporter.export()['rebuilt'])
+        
+        Project.objects.create(title="Dashboard", type="ST", stage="J", slug="dashboard")
+        summary = self.exporter.export()
+        
+        self.assertTrue(summary['rebuilt'])
+        self.assertEqual(len(summary['written']), 1)
+        self.assertTrue(summary['written'][0].startswith('projects.'))
+        self.assertEqual(self.read_bundle('projects')[0]['title'], "Dashboard")
+    
+    def test_pods_that_slugify_alike_keep_their_own_shards(self):
+        """Test distinct pods with the same slug are written to separate shards"""
+        NetworkMember.objects.create(first_name="Other", last_name="User", region="NA", pod="stripe", session="S1")
+        manifest = self.exporter.export()['manifest']
+        
+        names = manifest['shards']['pod']
+        self.assertEqual(names['Stripe'], 'members-pod-stripe')
+        self.assertNotEqual(names['stripe'], names['Stripe'])
+        for pod, name in names.items():
+            self.assertEqual(self.read_bundle(name)['pod'], pod)
+            self.assertEqual(len(self.read_bundle(name)['results']), 1)
+    
+    def test_change_committed_out_of_order_is_exported(self):
+        """Test a change whose id is below the cursor but committed later still triggers an export"""
+        # The id of a transaction still open while the export runs
+        gap = ChangeLog.objects.create(entity=ChangeLog.ENTITY_PROJECT, object_id=0).id
+        ChangeLog.objects.filter(id=gap).delete()
+        NetworkMember.objects.create(first_name="Sarah", last_name="Kim", region="NA", pod="Zoom", session="S2")
+        self.assertEqual(self.exporter.export()['manifest']['cursor'], gap - 1)
+        
+        # The open transaction commits its project and change log entry
+        project = Project.objects.bulk_create([Project(title="Dashboard", type="ST", stage="J", slug="dashboard")])[0]
+        ChangeLog.objects.create(id=gap, entity=ChangeLog.ENTITY_PROJECT, object_id=project.id)
+        self.assertTrue(self.exporter.export()['rebuilt'])
+        self.assertEqual(self.read_bundle('projects')[0]['title'], "Dashboard")
+
+
 class IntelligentSearchAPITest(APITestCase):
     """Test cases for the intelligent search API endpoints"""
     
     def setUp(self):
         """Set up test data"""
+        # Start every test with a full search token bucket
+        cache.clear()
+        
         # Create test network member
         self.member = NetworkMember.objects.create(
             first_name="Test",
@@ -209,6 +1946,61 @@ class IntelligentSearchAPITest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn('error', response.data)
     
+    def test_search_endpoint_explain(self):
+        """Test explain mode returns each result's feature breakdown and stage timings"""
+        url = '/api/search/search/'
+        response = self.client.get(url, {'q': 'graphic design', 'explain': '1'})
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        member = response.data['results'][0]
+        self.assertEqual(member['data']['first_name'], 'Test')
+        self.assertEqual(
+            [feature['reason'] for feature in member['explain']], member['match_reason'].split(', ')
+        )
+        self.assertAlmostEqual(sum(feature['score'] for feature in member['explain']), member['relevance_score'])
+        self.assertEqual(response.data['explain']['timings']['member']['matched'], 1)
+        self.assertIn('parse_ms', response.data['explain']['timings'])
+        self.assertFalse(SearchTracking.objects.exists())
+        
+        plain = self.client.get(url, {'q': 'graphic design'})
+        self.assertNotIn('explain', plain.data)
+        self.assertNotIn('explain', plain.data['results'][0])
+    
+    def test_search_endpoint_ndjson_stream(self):
+        """Test the streaming NDJSON mode of the search API endpoint"""
+        url = '/api/search/search/'
+        response = self.client.get(url, {'q': 'graphic design', 'stream': 'ndjson'})
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        events = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        
+        self.assertEqual(events[0]['event'], 'query')
+        self.assertEqual(events[1]['event'], 'results')
+        self.assertEqual(events[1]['type'], 'member')
+        self.assertEqual(events[1]['results'][0]['data']['first_name'], 'Test')
+        self.assertEqual(events[-2]['event'], 'suggestions')
+        self.assertEqual(events[-1]['event'], 'done')
+        self.assertEqual(events[-1]['total'], sum(e['count'] for e in events if e['event'] == 'results'))
+    
+    def test_search_endpoint_sse_stream(self):
+        """Test the server-sent events mode of the search API endpoint"""
+        url = '/api/search/search/'
+        response = self.client.get(url, {'q': 'graphic design', 'stream': 'sse'})
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        body = b''.join(response.streaming_content).decode()
+        self.assertTrue(body.startswith('event: query\ndata: '))
+        self.assertIn('event: done\n', body)
+    
+    def test_search_endpoint_unknown_stream_format(self):
+        """Test the search API endpoint rejects unknown stream formats"""
+        url = '/api/search/search/'
+        response = self.client.get(url, {'q': 'graphic design', 'stream': 'xml'})
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
     def test_suggestions_endpoint(self):
         """Test the suggestions API endpoint"""
         url = '/api/search/suggestions/'
@@ -0,0 +1,249 @@
+from typing import List, Dict, Optional, Tuple
+from bisect import bisect_left, bisect_right
+from collections import Counter
+import heapq
+import logging
+import threading
+import time
+
+import numpy as np
+from django.db import connection
+from django.db.models import Count, Q
+from .models import NetworkMember, Organization, SearchTracking
+
+
+logger = logging.getLogger(__name__)
+
+
+class RangeMinimum:
+    """Sparse table answering "position of the smallest value in values[start:stop]" in O(1).
+
+    Level j holds, for every position, where the minimum of the 2**j
+    values starting there is; any range is covered by two such windows.
+    """
+
+    def __init__(self, values: np.ndarray):
+        self.values = values
+        self.levels = [np.arange(len(values), dtype=np.int32)]
+        while (2 << (len(self.levels) - 1)) <= len(values):
+            previous, half = self.levels[-1], 1 << (len(self.levels) - 1)
+            left, right = previous[:-half], previous[half:]
+            self.levels.append(np.where(values[left] <= values[right], left, right))
+
+    def argmin(self, start: int, stop: int) -> int:
+        level = (stop - start).bit_length() - 1
+        left, right = self.levels[level][start], self.levels[level][stop - (1 << level)]
+        return int(left if self.values[left] <= self.values[right] else right)
+
+    def smallest(self, start: int, stop: int, limit: int) -> List[int]:
+        """The limit smallest distinct values in values[start:stop], in increasing order.
+
+        Pops the minimum of a range and pushes the ranges either side of it,
+        so the cost depends on limit (and repeated values), not the range.
+        """
+        found: List[int] = []
+        ranges = []
+
+        def push(start: int, stop: int):
+            if start < stop:
+                position = self.argmin(start, stop)
+                heapq.heappush(ranges, (int(self.values[position]), position, start, stop))
+
+        push(start, stop)
+        while ranges and len(found) < limit:
+            value, position, start, stop = heapq.heappop(ranges)
+            if not found or found[-1] != value:
+                found.append(value)
+            push(start, position)
+            push(position + 1, stop)
+        return found
+
+
+class TypeaheadIndex:
+    """In-memory prefix index for search-as-you-type suggestions.
+
+    Entries come from popular smart-search history plus member names,
+    organization names, skills and pods. Each entry is indexed under its
+    full text and under every word inside it, so "bos" finds
+    "Anyone in Boston rn?". Keys live in one sorted array and entries are
+    numbered by weight, so a lookup is two bisects plus a top-k of the
+    smallest entry numbers over the whole matching range.
+
+    The first lookup builds the index, and concurrent ones wait for it.
+    Later rebuilds run in a background thread while lookups keep using
+    the current index.
+    """
+
+    # Rebuild at most this often; new search history is merged incrementally
+    REBUILD_INTERVAL = 5 * 60
+    # Bounds on memory: entries kept, and index keys per entry
+    MAX_ENTRIES = 5000
+    MAX_KEYS_PER_ENTRY = 8
+
+    # Source weights; a search that returned results counts double
+    SEARCH_WEIGHT = 1.0
+    SUCCESSFUL_SEARCH_WEIGHT = 1.0
+    NAME_WEIGHT = 0.5
+    SKILL_WEIGHT = 0.5
+    POD_WEIGHT = 0.5
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (sorted keys, range minimum over the entry id per key, (label, weight) per entry by weight)
+        self._snapshot: Optional[Tuple[List[str], RangeMinimum, List[Tuple[str, float]]]] = None
+        self._built_at = None
+        self._stale = False
+        # Aggregated search history, merged from rows newer than the last seen id
+        self._search_weights: Counter = Counter()
+        self._search_labels: Dict[str, str] = {}
+        self._last_search_id = 0
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return ' '.join(text.lower().split())
+
+    def suggest(self, prefix: str, limit: int = 5) -> List[str]:
+        """Return the highest weighted entries with a word starting with prefix"""
+        self.refresh()
+        prefix = self.normalize(prefix)
+        if not prefix:
+            return []
+
+        # Read a consistent snapshot; rebuilds swap these in one assignment
+        keys, entry_ids, entries = self._snapshot
+        start = bisect_left(keys, prefix)
+        end = bisect_right(keys, prefix + '\uffff')
+        # Entries are numbered heaviest first, so the best are the smallest numbers
+        return [entries[entry_id][0] for entry_id in entry_ids.smallest(start, end, limit)]
+
+    def refresh(self, force: bool = False):
+        """Build the index if there is none, or rebuild it when force is set, in this thread.
+
+        An index older than REBUILD_INTERVAL, or invalidated, is rebuilt in
+        a background thread instead, unless a rebuild is already running.
+        """
+        if force or self._snapshot is None:
+            with self._lock:
+                if force or self._snapshot is None:
+                    self._build()
+            return
+        if not self._stale and time.monotonic() - self._built_at < self.REBUILD_INTERVAL:
+            return
+        if not self._lock.acquire(blocking=False):
+            # Another thread is rebuilding; keep serving the current index
+            return
+        try:
+            threading.Thread(target=self._rebuild, name='typeahead-rebuild', daemon=True).start()
+        except Exception:
+            self._lock.release()
+            raise
+
+    def _rebuild(self):
+        """Rebuild on a background thread that holds the lock, then release it"""
+        try:
+            self._build()
+        except Exception:
+            logger.exception('Typeahead rebuild failed; serving the previous index')
+        finally:
+            self._lock.release()
+            # The thread ends here, so its connection would otherwise stay open
+            connection.close()
+
+    def invalidate(self):
+        """Rebuild after the next lookup instead of waiting out REBUILD_INTERVAL"""
+        self._stale = True
+
+    def _merge_search_history(self):
+        """Fold smart searches recorded since the last rebuild into the weights"""
+        history = SearchTracking.objects.filter(
+            id__gt=self._last_search_id,
+            search_type=SearchTracking.SEARCH_TYPE_SMART,
+        ).exclude(query__isnull=True).exclude(query='')
+
+        last_id = history.order_by('-id').values_list('id', flat=True).first()
+        if last_id is None:
+            return
+
+        grouped = history.filter(id__lte=last_id).values('query').annotate(
+            searches=Count('id'),
+            successful=Count('id', filter=Q(results_count__gt=0)),
+        )
+        for row in grouped:
+            key = self.normalize(row['query'])
+            self._search_weights[key] += (
+                row['searches'] * self.SEARCH_WEIGHT
+                + row['successful'] * self.SUCCESSFUL_SEARCH_WEIGHT
+            )
+            self._search_labels.setdefault(key, row['query'].strip())
+        self._last_search_id = last_id
+
+        # Keep the history aggregate bounded as well
+        if len(self._search_weights) > self.MAX_ENTRIES:
+            self._search_weights = Counter(dict(self._search_weights.most_common(self.MAX_ENTRIES)))
+            self._search_labels = {
+                key: self._search_labels[key] for key in self._search_weights
+            }
+
+    def _collect_entries(self) -> Dict[str, Tuple[str, float]]:
+        entries: Dict[str, Tuple[str, float]] = {}
+
+        def add(label: str, weight: float):
+            label = label.strip()
+            key = self.normalize(label)
+            if not key:
+                return
+            existing = entries.get(key)
+            entries[key] = (existing[0] if existing else label, (existing[1] if existing else 0) + weight)
+
+        for key, weight in self._search_weights.items():
+            add(self._search_labels[key], weight)
+
+        skills = Counter()
+        pods = Counter()
+        for first_name, last_name, member_skills, pod in NetworkMember.objects.values_list(
+            'first_name', 'last_name', 'skills', 'pod'
+        ):
+            add(f"{first_name} {last_name}", self.NAME_WEIGHT)
+            if member_skills:
+                skills.update(skill.strip() for skill in member_skills.split(',') if skill.strip())
+            if pod:
+                pods[pod.strip()] += 1
+
+        for name in Organization.objects.values_list('name', flat=True):
+            add(name, self.NAME_WEIGHT)
+        for skill, count in skills.items():
+            add(skill, count * self.SKILL_WEIGHT)
+        for pod, count in pods.items():
+            add(pod, count * self.POD_WEIGHT)
+
+        return entries
+
+    def _build(self):
+        # Cleared first, so an invalidate() during the build asks for another
+        self._stale = False
+        self._merge_search_history()
+        collected = self._collect_entries()
+        top = heapq.nlargest(self.MAX_ENTRIES, collected.values(), key=lambda entry: entry[1])
+
+        keyed = []
+        for entry_id, (label, weight) in enumerate(top):
+            words = self.normalize(label).split(' ')
+            for position in range(min(len(words), self.MAX_KEYS_PER_ENTRY)):
+                keyed.append((' '.join(words[position:]), entry_id))
+        keyed.sort()
+
+        # Swap the new arrays in together so readers never see a mix
+        entry_ids = RangeMinimum(np.array([entry_id for _, entry_id in keyed], dtype=np.int32))
+        self._snapshot = ([key for key, _ in keyed], entry_ids, top)
+        self._built_at = time.monotonic()
+
+
+_typeahead_index = None
+
+
+def get_typeahead_index() -> TypeaheadIndex:
+    """Return the process-wide typeahead index"""
+    global _typeahead_index
+    if _typeahead_index is None:
+        _typeahead_index = TypeaheadIndex()
+    return _typeahead_index
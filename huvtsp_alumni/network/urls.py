@@ -14,6 +14,7 @@ router.register(r'resources', views.ResourcesViewSet)
 router.register(r'stats', views.NetworkStatsViewSet, basename='stats')
 router.register(r'search', views.IntelligentSearchViewSet, basename='search')
 router.register(r'search-tracking', views.SearchTrackingViewSet)
+router.register(r'changes', views.ChangeFeedViewSet, basename='changes')
 
 # The API URLs are now determined automatically by the router
 urlpatterns = [
@@ -2,28 +2,68 @@ from django.shortcuts import render
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action, api_view
 from rest_framework.response import Response
+from rest_framework.renderers import BrowsableAPIRenderer
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Q, Count
-from django.views.decorators.cache import cache_page
 from django.utils.decorators import method_decorator
+from django.http import StreamingHttpResponse
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.cache import cache
+from django.conf import settings
+from django.utils import timezone
 from .models import (
     NetworkMember, Organization, Experience, SocialLink, 
-    Project, ProjectLink, Resources, SearchTracking
+    Project, ProjectLink, Resources, SearchTracking, ChangeLog, OutboxCheckpoint
 )
 from .serializers import (
     NetworkMemberSerializer, NetworkMemberDetailSerializer, NetworkMemberListSerializer,
     OrganizationSerializer, OrganizationDetailSerializer, OrganizationListSerializer,
     ExperienceSerializer, SocialLinkSerializer, ProjectSerializer, 
     ProjectDetailSerializer, ProjectListSerializer, ProjectLinkSerializer,
-    ResourcesSerializer, SearchTrackingSerializer
+    ResourcesSerializer, SearchTrackingSerializer,
+    NetworkMemberSyncSerializer, ExperienceSyncSerializer, SocialLinkSyncSerializer,
+    ProjectSyncSerializer, OrganizationSyncSerializer
 )
 from .services import IntelligentMatchingService
+from .typeahead import get_typeahead_index
+from .facets import MEMBER_FACETS, compute_member_facets
+from .caching import ConditionalGetMixin, versioned_cache_page, versions_etag
+from .singleflight import get_single_flight
+from .admission import SearchRejected, SmartSearchThrottle, get_admission_controller
+from .pooling import connection_metrics
+from .outbox import OutboxConsumer, get_worker_consumer
+from .snapshot import latest_change
+from .ann import get_embedding_index
+from .query_embeddings import embed_query, get_query_embedding_cache
+from .fieldsets import SparseQuerysetMixin
+from .fastlist import FastListMixin
+from .filters import NearFilter, near_params
+from .renderers import FastJSONRenderer
 
 import openai
+import hashlib
+import json
 import re
+import time
+from datetime import timedelta
 from typing import List, Dict, Any
 
 
+# Models whose changes show up in each viewset's responses, for ETags and page caching
+MEMBER_VERSION_MODELS = (NetworkMember, Experience, Organization, SocialLink)
+ORGANIZATION_VERSION_MODELS = (Organization, Experience, NetworkMember, SocialLink)
+EXPERIENCE_VERSION_MODELS = (Experience, NetworkMember, Organization)
+SOCIAL_LINK_VERSION_MODELS = (SocialLink,)
+PROJECT_VERSION_MODELS = (Project, ProjectLink, NetworkMember, Experience, Organization, SocialLink)
+PROJECT_LINK_VERSION_MODELS = (ProjectLink,)
+RESOURCES_VERSION_MODELS = (Resources,)
+STATS_VERSION_MODELS = (NetworkMember, Organization, Project, Experience, Resources)
+SEARCH_VERSION_MODELS = (NetworkMember, Project, Organization)
+
+# Hot read endpoints; their payloads only carry floats the fast encoder writes like json does
+FAST_RENDERER_CLASSES = [FastJSONRenderer, BrowsableAPIRenderer]
+
+
 def track_search(search_type: str, query: str = "", filters: dict = None, results_count: int = 0):
     """Utility function to track search analytics"""
     try:
@@ -38,10 +78,12 @@ def track_search(search_type: str, query: str = "", filters: dict = None, result
         print(f"Error tracking search: {e}")
 
 
-class NetworkMemberViewSet(viewsets.ModelViewSet):
+class NetworkMemberViewSet(ConditionalGetMixin, SparseQuerysetMixin, FastListMixin, viewsets.ModelViewSet):
     queryset = NetworkMember.objects.all()
     serializer_class = NetworkMemberSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    version_models = MEMBER_VERSION_MODELS
+    renderer_classes = FAST_RENDERER_CLASSES
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter, NearFilter]
     filterset_fields = ['region', 'session', 'pod', 'internship']
     search_fields = ['first_name', 'last_name', 'email', 'skills', 'location']
     ordering_fields = ['first_name', 'last_name', 'region', 'session']
@@ -54,7 +96,7 @@ class NetworkMemberViewSet(viewsets.ModelViewSet):
             return NetworkMemberDetailSerializer
         return NetworkMemberSerializer
 
-    @method_decorator(cache_page(60 * 10))
+    @method_decorator(versioned_cache_page(60 * 10, *MEMBER_VERSION_MODELS))
     def list(self, request, *args, **kwargs):
         """Override list to track filter searches"""
         response = super().list(request, *args, **kwargs)
@@ -67,6 +109,8 @@ class NetworkMemberViewSet(viewsets.ModelViewSet):
             'pod': request.query_params.get('pod', ''),
             'internship': request.query_params.get('internship', ''),
             'ordering': request.query_params.get('ordering', ''),
+            'near': request.query_params.get('near', ''),
+            'radius_km': request.query_params.get('radius_km', ''),
         }
         results_count = response.data.get('count', 0) if hasattr(response.data, 'get') else len(response.data)
         
@@ -79,7 +123,7 @@ class NetworkMemberViewSet(viewsets.ModelViewSet):
         
         return response
     
-    @method_decorator(cache_page(60 * 10))
+    @method_decorator(versioned_cache_page(60 * 10, *MEMBER_VERSION_MODELS))
     @action(detail=False, methods=['get'])
     def by_region(self, request):
         """Get members grouped by region"""
@@ -88,7 +132,7 @@ class NetworkMemberViewSet(viewsets.ModelViewSet):
         ).order_by('region')
         return Response(regions)
 
-    @method_decorator(cache_page(60 * 10))
+    @method_decorator(versioned_cache_page(60 * 10, *MEMBER_VERSION_MODELS))
     @action(detail=False, methods=['get'])
     def by_session(self, request):
         """Get members grouped by session"""
@@ -97,7 +141,16 @@ class NetworkMemberViewSet(viewsets.ModelViewSet):
         ).order_by('session')
         return Response(sessions)
 
-    @method_decorator(cache_page(60 * 10))
+    @method_decorator(versioned_cache_page(60 * 10, *MEMBER_VERSION_MODELS))
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        """Get filter-aware counts for every member facet at once"""
+        # Apply the text search but leave the facet filters to the facet counting
+        queryset = filters.SearchFilter().filter_queryset(request, self.get_queryset(), self)
+        active_filters = {field: request.query_params.get(field, '') for field in MEMBER_FACETS}
+        return Response(compute_member_facets(queryset, active_filters))
+
+    @method_decorator(versioned_cache_page(60 * 10, *MEMBER_VERSION_MODELS))
     @action(detail=True, methods=['get'])
     def experiences(self, request, pk=None):
         """Get all experiences for a specific member"""
@@ -106,7 +159,7 @@ class NetworkMemberViewSet(viewsets.ModelViewSet):
         serializer = ExperienceSerializer(experiences, many=True)
         return Response(serializer.data)
 
-    @method_decorator(cache_page(60 * 10))
+    @method_decorator(versioned_cache_page(60 * 10, *MEMBER_VERSION_MODELS))
     @action(detail=True, methods=['get'])
     def social_links(self, request, pk=None):
         """Get all social links for a specific member"""
@@ -116,9 +169,11 @@ class NetworkMemberViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class OrganizationViewSet(viewsets.ModelViewSet):
+class OrganizationViewSet(ConditionalGetMixin, SparseQuerysetMixin, FastListMixin, viewsets.ModelViewSet):
     queryset = Organization.objects.all()
     serializer_class = OrganizationSerializer
+    version_models = ORGANIZATION_VERSION_MODELS
+    renderer_classes = FAST_RENDERER_CLASSES
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['type']
     search_fields = ['name', 'description']
@@ -149,9 +204,10 @@ class OrganizationViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class ExperienceViewSet(viewsets.ModelViewSet):
+class ExperienceViewSet(ConditionalGetMixin, SparseQuerysetMixin, viewsets.ModelViewSet):
     queryset = Experience.objects.select_related('network_member', 'organization').all()
     serializer_class = ExperienceSerializer
+    version_models = EXPERIENCE_VERSION_MODELS
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['experience_type', 'is_current', 'organization', 'network_member']
     search_fields = ['title', 'description', 'network_member__first_name', 
@@ -175,9 +231,10 @@ class ExperienceViewSet(viewsets.ModelViewSet):
         return Response(types)
 
 
-class SocialLinkViewSet(viewsets.ModelViewSet):
+class SocialLinkViewSet(ConditionalGetMixin, SparseQuerysetMixin, viewsets.ModelViewSet):
     queryset = SocialLink.objects.select_related('network_member').all()
     serializer_class = SocialLinkSerializer
+    version_models = SOCIAL_LINK_VERSION_MODELS
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['platform', 'network_member']
     search_fields = ['title', 'description', 'network_member__first_name', 
@@ -194,9 +251,11 @@ class SocialLinkViewSet(viewsets.ModelViewSet):
         return Response(platforms)
 
 
-class ProjectViewSet(viewsets.ModelViewSet):
+class ProjectViewSet(ConditionalGetMixin, SparseQuerysetMixin, FastListMixin, viewsets.ModelViewSet):
     queryset = Project.objects.prefetch_related('founders', 'project_links').all()
     serializer_class = ProjectSerializer
+    version_models = PROJECT_VERSION_MODELS
+    renderer_classes = FAST_RENDERER_CLASSES
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['type', 'stage']
     search_fields = ['title', 'what_are_they_looking_for', 'additional_info']
@@ -244,9 +303,10 @@ class ProjectViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class ProjectLinkViewSet(viewsets.ModelViewSet):
+class ProjectLinkViewSet(ConditionalGetMixin, SparseQuerysetMixin, viewsets.ModelViewSet):
     queryset = ProjectLink.objects.select_related('project').all()
     serializer_class = ProjectLinkSerializer
+    version_models = PROJECT_LINK_VERSION_MODELS
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['platform', 'project']
     search_fields = ['title', 'project__title']
@@ -262,9 +322,10 @@ class ProjectLinkViewSet(viewsets.ModelViewSet):
         return Response(platforms)
 
 
-class ResourcesViewSet(viewsets.ModelViewSet):
+class ResourcesViewSet(ConditionalGetMixin, SparseQuerysetMixin, viewsets.ModelViewSet):
     queryset = Resources.objects.all()
     serializer_class = ResourcesSerializer
+    version_models = RESOURCES_VERSION_MODELS
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['platform']
     search_fields = ['title', 'description']
@@ -283,14 +344,29 @@ class ResourcesViewSet(viewsets.ModelViewSet):
 # Enhanced search functionality using IntelligentMatchingService
 class IntelligentSearchViewSet(viewsets.ViewSet):
     """ViewSet for intelligent search across all models"""
+    renderer_classes = FAST_RENDERER_CLASSES
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.matching_service = IntelligentMatchingService()
     
-    @action(detail=False, methods=['get'])
-    def search(self, request):
-        """Intelligent search that understands natural language queries"""
+    RESULTS_LIMIT = 20
+    SUGGESTIONS_LIMIT = 5
+    # How long full results are kept to answer the same search when overloaded
+    RESULT_CACHE_TIMEOUT = 60 * 5
+    
+    STREAM_FORMATS = {
+        'ndjson': 'application/x-ndjson',
+        'sse': 'text/event-stream',
+    }
+
+    def get_throttles(self):
+        if self.action in ('search', 'semantic'):
+            return [SmartSearchThrottle()]
+        return super().get_throttles()
+
+    def _parse_search_params(self, request) -> Dict[str, Any]:
+        """Read the smart search query parameters and build the processed query"""
         query = request.query_params.get('q', '')
         intent = request.query_params.get('intent', 'general')
         skills = request.query_params.get('skills', '').split(',') if request.query_params.get('skills') else []
@@ -301,10 +377,7 @@ class IntelligentSearchViewSet(viewsets.ViewSet):
         region = request.query_params.get('region', '')
         session = request.query_params.get('session', '')
         pod = request.query_params.get('pod', '')
-        
-        if not query:
-            return Response({'error': 'Query parameter "q" is required'}, 
-                          status=status.HTTP_400_BAD_REQUEST)
+        near = near_params(request.query_params)
         
         # Process the query using the intelligent matching service
         processed_query = self.matching_service.process_query(query)
@@ -321,55 +394,288 @@ class IntelligentSearchViewSet(viewsets.ViewSet):
         if companies:
             processed_query['companies'].extend(companies)
         
-        # Remove duplicates
-        processed_query['skills'] = list(set(processed_query['skills']))
-        processed_query['locations'] = list(set(processed_query['locations']))
-        processed_query['companies'] = list(set(processed_query['companies']))
+        # Remove duplicates, keeping the order stable so identical searches share a key
+        processed_query['skills'] = list(dict.fromkeys(processed_query['skills']))
+        processed_query['locations'] = list(dict.fromkeys(processed_query['locations']))
+        processed_query['companies'] = list(dict.fromkeys(processed_query['companies']))
+        
+        return {
+            'query': query,
+            'intent': intent,
+            'processed_query': processed_query,
+            'member_filters': {'region': region, 'session': session, 'pod': pod, 'near': near},
+            # Filters recorded with the search analytics
+            'tracking_filters': {
+                'region': region,
+                'session': session,
+                'pod': pod,
+                'intent': intent,
+                'skills': skills,
+                'locations': locations,
+                'companies': companies,
+                'near': request.query_params.get('near', ''),
+                'radius_km': request.query_params.get('radius_km', ''),
+            },
+        }
+    
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """Intelligent search that understands natural language queries"""
+        if not request.query_params.get('q', ''):
+            return Response({'error': 'Query parameter "q" is required'}, 
+                          status=status.HTTP_400_BAD_REQUEST)
+        
+        start = time.perf_counter()
+        params = self._parse_search_params(request)
+        if request.query_params.get('explain', '').lower() in ('1', 'true'):
+            return self._explain_search(params, (time.perf_counter() - start) * 1000)
+        
+        stream_format = request.query_params.get('stream', '')
+        if stream_format:
+            if stream_format not in self.STREAM_FORMATS:
+                return Response({'error': f'Unsupported stream format "{stream_format}"'},
+                              status=status.HTTP_400_BAD_REQUEST)
+            response = StreamingHttpResponse(
+                self._stream_search(params, stream_format),
+                content_type=self.STREAM_FORMATS[stream_format]
+            )
+            response['Cache-Control'] = 'no-cache'
+            response['X-Accel-Buffering'] = 'no'
+            return response
+        
+        # Identical concurrent searches share one run of the pipeline
+        key = self._search_key(params)
+        degraded = None
+        try:
+            results, total, suggestions = get_single_flight().do(key, lambda: self._admitted_search(key, params))
+        except SearchRejected:
+            outcome = self._degraded_search(key, params)
+            if outcome is None:
+                response = Response({'error': 'Smart search is busy, please retry shortly'},
+                                    status=status.HTTP_503_SERVICE_UNAVAILABLE)
+                response['Retry-After'] = str(getattr(settings, 'SMART_SEARCH_RETRY_AFTER', 1))
+                return response
+            results, total, suggestions, degraded = outcome
         
+        # Track the smart search
+        track_search(
+            search_type=SearchTracking.SEARCH_TYPE_SMART,
+            query=params['query'],
+            filters=params['tracking_filters'],
+            results_count=total
+        )
+        
+        data = {
+            'results': results[:self.RESULTS_LIMIT],  # Limit to top 20 results
+            'query': params['query'],
+            'processed_query': params['processed_query'],
+            'suggestions': suggestions,
+            'total': total
+        }
+        if degraded:
+            data['degraded'] = degraded
+        return Response(data)
+    
+    def _search_key(self, params: Dict[str, Any]) -> tuple:
+        """Everything the search results depend on, including the data versions"""
+        processed_query = {key: value for key, value in params['processed_query'].items() if key != 'original'}
+        return (
+            'search',
+            json.dumps(processed_query, sort_keys=True),
+            json.dumps(params['member_filters'], sort_keys=True),
+            params['intent'],
+            params['query'].lower(),
+            versions_etag(SEARCH_VERSION_MODELS),
+        )
+    
+    def _result_cache_key(self, key: tuple) -> str:
+        return f"smart-search-result:{hashlib.sha256(repr(key).encode('utf-8')).hexdigest()}"
+    
+    def _admitted_search(self, key: tuple, params: Dict[str, Any]):
+        """Run the search in an admission slot and keep the result for degraded mode"""
+        with get_admission_controller().admit():
+            outcome = self._run_search(params)
+        cache.set(self._result_cache_key(key), outcome, self.RESULT_CACHE_TIMEOUT)
+        return outcome
+    
+    def _degraded_search(self, key: tuple, params: Dict[str, Any]):
+        """Results for a search turned away by admission control, or None to reject it.
+
+        Serves the last full result for the same search and data versions
+        when there is one, otherwise keyword-only results.
+        """
+        if not getattr(settings, 'SMART_SEARCH_DEGRADE', True):
+            return None
+        controller = get_admission_controller()
+        
+        cached = cache.get(self._result_cache_key(key))
+        if cached is not None:
+            controller.record('degraded_cached')
+            return (*cached, 'cached')
+        
+        controller.record('degraded_keyword')
+        results = []
+        total = 0
+        for entity_type, entity_results, entity_total in self.matching_service.iter_keyword_search(
+            params['processed_query'], params['member_filters'], params['intent'],
+            limit=self.RESULTS_LIMIT
+        ):
+            results.extend(entity_results)
+            total += entity_total
+        suggestions = self.matching_service.get_matching_suggestions(params['query'])
+        return results, total, suggestions, 'keyword'
+    
+    def _run_search(self, params: Dict[str, Any]):
+        """Run the search pipeline; returns (results, total, suggestions)"""
         # Get results based on intent
         results = []
+        total = 0
+        for entity_type, entity_results, entity_total in self.matching_service.iter_search(
+            params['processed_query'], params['member_filters'], params['intent'],
+            limit=self.RESULTS_LIMIT
+        ):
+            results.extend(entity_results)
+            total += entity_total
         
-        if intent in ['find_person', 'skill_based', 'location_based', 'company_based'] or intent == 'general':
-            filters = {'region': region, 'session': session, 'pod': pod}
-            member_results = self.matching_service.search_members(processed_query, filters)
-            results.extend(member_results)
+        # Get search suggestions
+        suggestions = self.matching_service.get_matching_suggestions(params['query'])
+        return results, total, suggestions
+    
+    def _explain_search(self, params: Dict[str, Any], parse_ms: float) -> Response:
+        """Search with each result's per-feature score breakdown and the time each stage took.
+
+        For debugging rankings: bypasses the shared and cached results and
+        is not recorded in the search analytics, but still needs an
+        admission slot.
+        """
+        timings = {'parse_ms': round(parse_ms, 3)}
+        results = []
+        total = 0
+        start = time.perf_counter()
+        try:
+            with get_admission_controller().admit():
+                for entity_type, entity_results, entity_total in self.matching_service.iter_search(
+                    params['processed_query'], params['member_filters'], params['intent'],
+                    limit=self.RESULTS_LIMIT, explain=True, timings=timings
+                ):
+                    results.extend(entity_results)
+                    total += entity_total
+        except SearchRejected:
+            response = Response({'error': 'Smart search is busy, please retry shortly'},
+                                status=status.HTTP_503_SERVICE_UNAVAILABLE)
+            response['Retry-After'] = str(getattr(settings, 'SMART_SEARCH_RETRY_AFTER', 1))
+            return response
+        timings['search_ms'] = round((time.perf_counter() - start) * 1000, 3)
         
-        if intent in ['find_project', 'company_based'] or intent == 'general':
-            project_results = self.matching_service.search_projects(processed_query)
-            results.extend(project_results)
+        return Response({
+            'results': results[:self.RESULTS_LIMIT],
+            'query': params['query'],
+            'processed_query': params['processed_query'],
+            'total': total,
+            'explain': {'timings': timings},
+        })
+    
+    def _stream_search(self, params: Dict[str, Any], stream_format: str):
+        """Generate streamed search events, one per completed pipeline stage.
+
+        Emits a ``query`` event, one ``results`` event per entity search as
+        it completes, then ``suggestions`` and a final ``done`` event with
+        the totals, flagged ``degraded`` when admission control turned the
+        search down.
+        """
+        def encode(event: str, payload: Dict[str, Any]) -> str:
+            data = json.dumps(payload, cls=DjangoJSONEncoder)
+            if stream_format == 'sse':
+                return f"event: {event}\ndata: {data}\n\n"
+            return json.dumps({'event': event, **payload}, cls=DjangoJSONEncoder) + "\n"
         
-        if intent in ['find_organization', 'company_based'] or intent == 'general':
-            org_results = self.matching_service.search_organizations(processed_query)
-            results.extend(org_results)
+        yield encode('query', {
+            'query': params['query'],
+            'processed_query': params['processed_query'],
+        })
         
-        # Get search suggestions
-        suggestions = self.matching_service.get_matching_suggestions(query)
+        # The response has started, so a search turned away falls back to keyword results
+        controller = get_admission_controller()
+        admitted = controller.acquire()
+        search = self.matching_service.iter_search if admitted else self.matching_service.iter_keyword_search
+        if not admitted:
+            controller.record('degraded_keyword')
         
-        # Track the smart search
-        filters = {
-            'region': region,
-            'session': session,
-            'pod': pod,
-            'intent': intent,
-            'skills': skills,
-            'locations': locations,
-            'companies': companies,
-        }
+        total = 0
+        try:
+            for entity_type, entity_results, entity_total in search(
+                params['processed_query'], params['member_filters'], params['intent'],
+                limit=self.RESULTS_LIMIT
+            ):
+                total += entity_total
+                yield encode('results', {
+                    'type': entity_type,
+                    'results': entity_results,
+                    'count': entity_total,
+                })
+        finally:
+            if admitted:
+                controller.release()
+        
+        yield encode('suggestions', {
+            'suggestions': self.matching_service.get_matching_suggestions(params['query']),
+        })
+        
+        track_search(
+            search_type=SearchTracking.SEARCH_TYPE_SMART,
+            query=params['query'],
+            filters=params['tracking_filters'],
+            results_count=total
+        )
+        
+        yield encode('done', {'total': total} if admitted else {'total': total, 'degraded': 'keyword'})
+    
+    @action(detail=False, methods=['get'])
+    def semantic(self, request):
+        """Find members whose profile embeddings are closest to the query"""
+        query = request.query_params.get('q', '')
+        if not query:
+            return Response({'error': 'Query parameter "q" is required'}, 
+                          status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            vector = embed_query(query)
+        except Exception:
+            return Response({'error': 'Query embedding is unavailable, please retry shortly'},
+                          status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        
+        matches = get_embedding_index('member').search(vector, self.RESULTS_LIMIT)
+        members = NetworkMember.objects.in_bulk([member_id for member_id, _ in matches])
+        # Members deleted since the index was saved are skipped
+        found = [(members[member_id], score) for member_id, score in matches if member_id in members]
+        cards = NetworkMemberListSerializer(
+            [member for member, _ in found], many=True, context={'request': request}
+        ).data
+        results = [{**card, 'similarity': round(score, 4)} for card, (_, score) in zip(cards, found)]
         
         track_search(
             search_type=SearchTracking.SEARCH_TYPE_SMART,
             query=query,
-            filters=filters,
+            filters={'mode': 'semantic'},
             results_count=len(results)
         )
+        return Response({'results': results, 'query': query, 'total': len(results)})
+    
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        """Get filter-aware member facet counts for a smart search result set"""
+        if not request.query_params.get('q', ''):
+            return Response({'error': 'Query parameter "q" is required'}, 
+                          status=status.HTTP_400_BAD_REQUEST)
         
-        return Response({
-            'results': results[:20],  # Limit to top 20 results
-            'query': query,
-            'processed_query': processed_query,
-            'suggestions': suggestions,
-            'total': len(results)
-        })
+        params = self._parse_search_params(request)
+        
+        # Score without the facet filters so each facet can count the other choices
+        matches = self.matching_service.score_members(
+            params['processed_query'], {'near': params['member_filters']['near']}
+        )
+        queryset = NetworkMember.objects.filter(id__in=[match.id for match in matches])
+        return Response(compute_member_facets(queryset, params['member_filters']))
     
     @action(detail=False, methods=['get'])
     def suggestions(self, request):
@@ -378,14 +684,27 @@ class IntelligentSearchViewSet(viewsets.ViewSet):
         if not query:
             return Response({'suggestions': []})
         
-        suggestions = self.matching_service.get_matching_suggestions(query)
+        # Typeahead matches from search history and directory data first,
+        # topped up with the curated example queries
+        suggestions = get_typeahead_index().suggest(query, limit=self.SUGGESTIONS_LIMIT)
+        for suggestion in self.matching_service.get_matching_suggestions(query):
+            if len(suggestions) >= self.SUGGESTIONS_LIMIT:
+                break
+            if suggestion not in suggestions:
+                suggestions.append(suggestion)
         return Response({'suggestions': suggestions})
 
 
 # Additional utility views
-class NetworkStatsViewSet(viewsets.ViewSet):
+class NetworkStatsViewSet(ConditionalGetMixin, viewsets.ViewSet):
     """ViewSet for network statistics and analytics"""
     
+    def get_version_models(self, action):
+        # search_analytics reads untracked search history, so it is never conditional
+        if action in ('overview', 'search'):
+            return STATS_VERSION_MODELS
+        return ()
+    
     @action(detail=False, methods=['get'])
     def overview(self, request):
         """Get network overview statistics"""
@@ -435,6 +754,31 @@ class NetworkStatsViewSet(viewsets.ViewSet):
         
         return Response(results)
 
+    @action(detail=False, methods=['get'])
+    def admission(self, request):
+        """Get smart search admission control limits and counters for this worker"""
+        return Response(get_admission_controller().metrics())
+
+    @action(detail=False, methods=['get'])
+    def connections(self, request):
+        """Get database connection persistence and pool metrics for this worker"""
+        return Response(connection_metrics())
+
+    @action(detail=False, methods=['get'])
+    def outbox(self, request):
+        """Get how far this worker and the durable consumers have applied the change log"""
+        consumer = get_worker_consumer()
+        return Response({
+            'latest': latest_change(),
+            'worker': consumer.metrics() if consumer is not None else None,
+            'checkpoints': list(OutboxCheckpoint.objects.order_by('name').values('name', 'position', 'updated_at')),
+        })
+
+    @action(detail=False, methods=['get'])
+    def query_embeddings(self, request):
+        """Get query embedding cache hits, misses and saved latency for this worker"""
+        return Response(get_query_embedding_cache().metrics())
+
     @action(detail=False, methods=['get'])
     def search_analytics(self, request):
         """Get search analytics"""
@@ -474,7 +818,7 @@ class NetworkStatsViewSet(viewsets.ViewSet):
         return Response(analytics)
 
 
-class SearchTrackingViewSet(viewsets.ModelViewSet):
+class SearchTrackingViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
     """ViewSet for search tracking analytics"""
     queryset = SearchTracking.objects.all()
     serializer_class = SearchTrackingSerializer
@@ -499,6 +843,81 @@ class SearchTrackingViewSet(viewsets.ModelViewSet):
         return queryset
 
 
+class ChangeFeedViewSet(viewsets.ViewSet):
+    """Delta-sync feed of directory changes since a client's last sync"""
+    
+    # Log entries read per response; clients keep syncing while has_more is true
+    PAGE_SIZE = 500
+    
+    ENTITIES = {
+        ChangeLog.ENTITY_MEMBER: (NetworkMember.objects.all(), NetworkMemberSyncSerializer),
+        ChangeLog.ENTITY_EXPERIENCE: (Experience.objects.all(), ExperienceSyncSerializer),
+        ChangeLog.ENTITY_SOCIAL_LINK: (SocialLink.objects.all(), SocialLinkSyncSerializer),
+        ChangeLog.ENTITY_PROJECT: (Project.objects.prefetch_related('founders'), ProjectSyncSerializer),
+        ChangeLog.ENTITY_ORGANIZATION: (Organization.objects.all(), OrganizationSyncSerializer),
+    }
+    
+    def list(self, request):
+        """Get rows created, updated or deleted after the ``since`` cursor"""
+        try:
+            since = int(request.query_params.get('since', 0))
+        except ValueError:
+            return Response({'error': 'Query parameter "since" must be an integer cursor'},
+                          status=status.HTTP_400_BAD_REQUEST)
+        
+        entries = list(
+            ChangeLog.objects.filter(id__gt=since).order_by('id')
+            .values_list('id', 'entity', 'action', 'object_id', 'created_at')[:self.PAGE_SIZE + 1]
+        )
+        has_more = len(entries) > self.PAGE_SIZE
+        entries = entries[:self.PAGE_SIZE]
+        cursor = self._cursor(since, entries)
+        # A held cursor resends this page, so clients wait for the next sync instead
+        has_more = has_more and cursor == entries[-1][0]
+        
+        # Only the last change to each row matters
+        latest = {}
+        for entry_id, entity, entry_action, object_id, created_at in entries:
+            latest[(entity, object_id)] = entry_action
+        
+        changes = {entity: [] for entity in self.ENTITIES}
+        deleted = {entity: [] for entity in self.ENTITIES}
+        for entity, (queryset, serializer_class) in self.ENTITIES.items():
+            upserted = [object_id for (row_entity, object_id), entry_action in latest.items()
+                        if row_entity == entity and entry_action == ChangeLog.ACTION_UPSERT]
+            deleted[entity] = sorted(object_id for (row_entity, object_id), entry_action in latest.items()
+                                     if row_entity == entity and entry_action == ChangeLog.ACTION_DELETE)
+            if upserted:
+                objects = queryset.filter(id__in=upserted).order_by('id')
+                changes[entity] = serializer_class(objects, many=True, context={'request': request}).data
+        
+        return Response({
+            'cursor': cursor,
+            'has_more': has_more,
+            'changes': changes,
+            'deleted': deleted,
+        })
+    
+    @staticmethod
+    def _cursor(since: int, entries: List[tuple]) -> int:
+        """The id up to which every entry has been sent.
+        
+        Ids are taken before commit, so a lower id can become visible after
+        a higher one; as in ``OutboxConsumer``, the cursor stays before a gap
+        in the ids until the entry after it is ``GAP_TIMEOUT`` seconds old
+        (a rolled back transaction leaves a gap for good). Entries past the
+        gap are sent again on the next sync. A full sync has no gap before
+        its first entry.
+        """
+        cursor = since
+        oldest_open = timezone.now() - timedelta(seconds=OutboxConsumer.GAP_TIMEOUT)
+        for entry_id, _, _, _, created_at in entries:
+            if cursor and entry_id != cursor + 1 and created_at > oldest_open:
+                break
+            cursor = entry_id
+        return cursor
+
+
 @api_view(['POST'])
 def validate_password(request):
     """Validate HUVTSP alumni password"""